@@ -1,6 +1,23 @@
 import os
+import io
+import time
+import stat
+import zlib
+import struct
+import hashlib
+import random
+import multiprocessing
+import queue
 import shutil
-from PIL import Image
+import argparse
+import csv
+import json
+import uuid
+import threading
+import contextlib
+import concurrent.futures
+import zipfile
+from PIL import Image, ImageChops, ImageColor, ImageDraw, ImageFilter, ImageSequence, features
 import sys
 
 # 支持的格式定义
@@ -15,6 +32,177 @@ SUPPORTED_FORMATS = {
     'bmp': ('BMP', '.bmp')
 }
 
+# 编码预设（按PIL格式给出保存参数）
+# default 与旧版本行为一致：WEBP质量80，JPEG质量95，其余使用Pillow默认值
+# BMP 没有可调的编码参数，各预设均为空
+ENCODER_PRESETS = {
+    'default': {
+        'PNG': {},
+        'WEBP': {'quality': 80},
+        'JPEG': {'quality': 95},
+        'TIFF': {},
+        'BMP': {},
+    },
+    'fastest': {
+        'PNG': {'compress_level': 1},
+        'WEBP': {'quality': 80, 'method': 0},
+        'JPEG': {'quality': 90, 'optimize': False, 'progressive': False, 'subsampling': 2},
+        'TIFF': {'compression': 'raw'},
+        'BMP': {},
+    },
+    'balanced': {
+        'PNG': {'compress_level': 6},
+        'WEBP': {'quality': 80, 'method': 4},
+        'JPEG': {'quality': 90, 'optimize': True, 'progressive': False, 'subsampling': 2},
+        'TIFF': {'compression': 'tiff_lzw'},
+        'BMP': {},
+    },
+    'smallest': {
+        'PNG': {'optimize': True},  # optimize 会强制使用最高压缩级别9
+        'WEBP': {'quality': 75, 'method': 6},
+        'JPEG': {'quality': 85, 'optimize': True, 'progressive': True, 'subsampling': 2},
+        'TIFF': {'compression': 'tiff_adobe_deflate'},
+        'BMP': {},
+    },
+    'lossless': {
+        'PNG': {'optimize': True},
+        'WEBP': {'lossless': True, 'quality': 80, 'method': 4},  # 无损模式下quality表示压缩力度
+        'JPEG': {'quality': 100, 'subsampling': 0},  # JPEG无法无损，使用最高质量并关闭色度抽样
+        'TIFF': {'compression': 'tiff_adobe_deflate'},
+        'BMP': {},
+    },
+}
+
+# 预设说明（用于交互提示）
+PRESET_DESCRIPTIONS = {
+    'default': '默认 (与旧版本一致)',
+    'fastest': '最快编码，文件较大',
+    'balanced': '速度与体积均衡',
+    'smallest': '体积最小，编码较慢',
+    'lossless': '无损/最高质量',
+}
+
+DEFAULT_PRESET = 'default'
+
+# 不支持透明通道的格式及其可直接保存的图片模式
+NO_ALPHA_MODES = {
+    'JPEG': ('RGB', 'L', 'CMYK'),
+    'BMP': ('RGB', 'L', 'P', '1'),
+}
+
+# 透明区域默认填充白色背景
+DEFAULT_BACKGROUND = (255, 255, 255)
+
+# 可保存多帧（多页/动画）的目标格式，其余格式每帧输出一个文件
+MULTI_FRAME_FORMATS = {'PNG', 'WEBP', 'TIFF'}
+
+# 多帧时按动画处理的输入格式（多帧PNG即APNG）；其余多帧输入（如多页TIFF）按独立页面处理
+ANIMATED_SOURCE_FORMATS = {'GIF', 'WEBP', 'PNG'}
+
+# 可作为输入的图片格式（按文件内容识别），GIF只支持读取
+INPUT_FORMATS = {pil_format for pil_format, _ in SUPPORTED_FORMATS.values()} | {'GIF'}
+
+# 文件头特征（魔数）与对应的PIL格式，WEBP需额外检查RIFF容器类型
+MAGIC_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'II*\x00', 'TIFF'),
+    (b'MM\x00*', 'TIFF'),
+    (b'II+\x00', 'TIFF'),  # BigTIFF
+    (b'MM\x00+', 'TIFF'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'BM', 'BMP'),
+]
+
+# 源格式与目标格式相同时的直通方式
+# auto 依次尝试 reflink、copy_file_range/sendfile、普通复制，选用文件系统支持的最低开销方式；
+# hardlink 会让输出与源文件共用同一份数据（修改其一会影响另一个），因此只在显式指定时使用
+PASSTHROUGH_MODES = ('auto', 'reflink', 'hardlink', 'copy_range', 'copy')
+DEFAULT_PASSTHROUGH = 'auto'
+
+# 体积上限模式：JPEG/WEBP搜索质量，PNG搜索调色板颜色数（从多到少）
+# 每轮在当前质量区间内并行试编码若干个质量，逐步缩小区间
+BUDGET_QUALITY_FORMATS = {'JPEG', 'WEBP'}
+BUDGET_QUALITY_RANGE = (5, 100)
+BUDGET_SEARCH_WIDTH = 4
+BUDGET_PALETTE_SIZES = (256, 128, 64, 32, 16, 8, 4, 2)
+
+# 调色板量化：可量化的目标格式与可选的量化器
+# 中位切分/最大覆盖不支持透明通道，带透明通道的图片改用快速八叉树；libimagequant需Pillow编译时启用
+QUANTIZE_FORMATS = {'PNG', 'WEBP'}
+QUANTIZERS = {
+    'mediancut': Image.Quantize.MEDIANCUT,
+    'maxcoverage': Image.Quantize.MAXCOVERAGE,
+    'fastoctree': Image.Quantize.FASTOCTREE,
+    'libimagequant': Image.Quantize.LIBIMAGEQUANT,
+}
+DEFAULT_QUANTIZER = 'mediancut'
+
+# 可直接读取其中图片的压缩包（按扩展名识别），7z需要安装py7zr
+ARCHIVE_EXTENSIONS = {'.zip': 'ZIP', '.7z': '7Z'}
+
+# 内容完全相同的输入只转换一次，其余输出使用硬链接或复制
+DEDUP_MODES = ('hardlink', 'copy')
+DEDUP_CHUNK_SIZE = 1024 * 1024
+
+# 近似重复检测：dHash的边长（哈希位数为其平方）与判定为近似重复的最大汉明距离
+DHASH_SIZE = 8
+NEAR_DUPLICATE_DISTANCE = 5
+
+# 流水线模式默认的预读线程数（编码线程数默认等于CPU核数）
+DEFAULT_PIPELINE_READERS = 2
+
+# 耗时统计的阶段：读取(仅流水线模式预读)、打开(解析文件头)、解码、合成(透明背景/模式转换/调色板)、编码、写出
+# 多帧图片和大图模式的解码与合成穿插在编码过程中，计入编码阶段
+TIMING_STAGES = ('read', 'open', 'decode', 'flatten', 'encode', 'write')
+# 耗时报告的列：体积上限模式下所选的质量/调色板颜色数及是否满足上限（未启用时为空）
+TIMING_REPORT_FIELDS = ('name', 'status', 'input_bytes', 'output_bytes', 'megapixels',
+                        'quality', 'colors', 'budget_met') + TIMING_STAGES + ('total',)
+TIMING_PERCENTILES = (50, 95, 99)
+DEFAULT_REPORT_TOP = 10
+
+# 基准测试：生成的测试图片集（数量、尺寸，formats 限定源格式），结果文件的列
+# 每组图片由固定的随机种子生成，不同版本之间的结果可以直接对比
+BENCH_CORPORA = {
+    'photo': {'count': 6, 'size': (1024, 768)},
+    'flat_ui': {'count': 6, 'size': (800, 600)},
+    'rgba': {'count': 6, 'size': (640, 480)},
+    'palette': {'count': 6, 'size': (640, 480)},
+    'large_tiff': {'count': 1, 'size': (4096, 4096), 'formats': ('tif',)},
+    'icons': {'count': 48, 'size': (32, 32)},
+}
+BENCH_FORMATS = ('png', 'webp', 'jpg', 'tif', 'bmp')  # 每种PIL格式取一个扩展名
+BENCH_COLUMNS = ['corpus', 'source', 'target', 'images', 'megapixels', 'seconds', 'images_per_second',
+                 'mp_per_second', 'peak_rss_mb', 'output_bytes', 'failures']
+DEFAULT_BENCH_FOLDER = "bench_corpus"
+DEFAULT_BENCH_RESULTS = "bench_results.csv"
+
+# 监视模式：扫描间隔、文件保持不变多久视为写入完成（秒），以及转换成功后源文件的处理方式
+DEFAULT_WATCH_INTERVAL = 1.0
+DEFAULT_SETTLE_TIME = 2.0
+WATCH_ACTIONS = ('keep', 'move', 'delete')
+
+# 大图模式：默认内存预算（MB）与未压缩条带每次读取的行数
+DEFAULT_MEMORY_BUDGET_MB = 1024
+LARGE_IMAGE_BAND_ROWS = 256
+
+# 大图模式关闭Pillow解压炸弹保护期间的状态：进行中的大图解码数与原来的像素上限
+_pixel_limit_lock = threading.Lock()
+_pixel_limit_users = 0
+_saved_pixel_limit = None
+
+# 大图模式下可逐条带写出的目标格式
+STREAMING_FORMATS = {'PNG', 'BMP'}
+
+# 可按条带/分块读取的TIFF压缩方式：无压缩、Deflate、PackBits
+# LZW/JPEG等压缩只能由libtiff整图解码，按普通方式处理
+BAND_COMPRESSIONS = {1, 8, 32946, 32773}
+BAND_MODES = ('L', 'LA', 'P', 'RGB', 'RGBA', 'CMYK')
+
+# 逐条带写出PNG时支持的模式及对应的颜色类型
+PNG_COLOR_TYPES = {'L': 0, 'RGB': 2, 'LA': 4, 'RGBA': 6}
+
 def get_storage_option():
     """获取用户选择的存储方式"""
     print("\n请选择存储方式:")
@@ -130,40 +318,1638 @@ def get_target_format():
         else:
             print("不支持的格式，请重新输入！")
 
-def convert_image(input_path, output_path, target_format):
-    """转换单张图片"""
+def get_encoder_preset():
+    """获取用户选择的编码预设"""
+    print("\n可用的编码预设:")
+    for name, description in PRESET_DESCRIPTIONS.items():
+        print(f"  {name}: {description}")
+
+    while True:
+        preset = input(f"请输入编码预设 (直接回车使用 {DEFAULT_PRESET}): ").lower().strip()
+
+        if not preset:
+            return DEFAULT_PRESET
+        if preset in ENCODER_PRESETS:
+            return preset
+        else:
+            print("不支持的预设，请重新输入！")
+
+def get_background_color():
+    """获取透明区域的填充背景色"""
+    while True:
+        value = input("请输入透明区域的背景色 (例如: #ffffff、black，直接回车使用白色): ").strip()
+
+        if not value:
+            return DEFAULT_BACKGROUND
+        try:
+            return parse_background(value)
+        except ValueError:
+            print("无法识别的颜色，请重新输入！")
+
+def get_save_kwargs(target_format, preset=DEFAULT_PRESET):
+    """获取目标格式在指定预设下的保存参数"""
+    pil_format, _ = SUPPORTED_FORMATS[target_format]
+    return dict(ENCODER_PRESETS[preset].get(pil_format, {}))
+
+def parse_background(value):
+    """解析背景色，支持 '#rrggbb'、颜色名称或RGB元组"""
+    if isinstance(value, str):
+        return ImageColor.getrgb(value)[:3]
+    return tuple(value)[:3]
+
+def parse_size(value):
+    """解析字节数，支持 KB/MB 后缀，如 '150KB'、'2MB'、'500000'"""
+    text = str(value).strip().upper().rstrip('B')
+    units = {'K': 1024, 'M': 1024 * 1024}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def flatten_alpha(img, background=DEFAULT_BACKGROUND):
+    """将带透明通道的图片合成到纯色背景上，不带透明信息的图片原样返回"""
+    if img.mode in ('RGBA', 'LA'):
+        # paste 直接以源图的alpha通道作为蒙版，无需拆分通道
+        source = img
+    elif img.mode in ('PA', 'RGBa') or 'transparency' in img.info:
+        # 调色板/透明色键等情况先展开为RGBA
+        source = img.convert('RGBA')
+    else:
+        return img
+
+    # 整个合成只额外分配一张RGB结果图
+    result = Image.new('RGB', img.size, parse_background(background))
+    result.paste(source, mask=source)
+    return result
+
+def prepare_image(img, target_format, background=DEFAULT_BACKGROUND):
+    """按目标格式的要求处理图片模式，返回可直接保存的图片"""
+    pil_format, _ = SUPPORTED_FORMATS[target_format]
+
+    # 处理不支持透明通道的格式
+    if pil_format in NO_ALPHA_MODES:
+        img = flatten_alpha(img, background)
+        if img.mode not in NO_ALPHA_MODES[pil_format]:
+            img = img.convert('RGB')
+    return img
+
+def make_temp_path(output_path):
+    """生成与输出文件同目录的隐藏临时文件路径，保证重命名在同一文件系统内完成"""
+    folder, filename = os.path.split(os.path.abspath(output_path))
+    return os.path.join(folder, f".{filename}.{uuid.uuid4().hex[:8]}.tmp")
+
+@contextlib.contextmanager
+def unlimited_pixels():
+    """大图模式解码期间关闭Pillow的解压炸弹保护，退出时恢复原来的像素上限
+
+    像素数由大图模式的 max_pixels 与内存预算检查把关；多个线程同时处于大图解码时，
+    由最后一个退出的线程恢复上限。
+    """
+    global _pixel_limit_users, _saved_pixel_limit
+    with _pixel_limit_lock:
+        if _pixel_limit_users == 0:
+            _saved_pixel_limit = Image.MAX_IMAGE_PIXELS
+            Image.MAX_IMAGE_PIXELS = None
+        _pixel_limit_users += 1
+    try:
+        yield
+    finally:
+        with _pixel_limit_lock:
+            _pixel_limit_users -= 1
+            if _pixel_limit_users == 0:
+                Image.MAX_IMAGE_PIXELS = _saved_pixel_limit
+
+@contextlib.contextmanager
+def atomic_output(output_path):
+    """以临时文件写出并在成功后重命名，保证输出文件不会处于写了一半的状态"""
+    temp_path = make_temp_path(output_path)
+    try:
+        # 以读写方式打开：多页TIFF等编码器在追加写入时需要回读已写出的内容
+        with open(temp_path, 'x+b') as fp:
+            yield fp
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def save_output(img, output_path, pil_format, save_kwargs, buffers=None):
+    """保存编码结果
+
+    buffers 为列表时只编码到内存，并追加 (输出路径, 数据)，由调用方负责写出；
+    否则经临时文件原子写入磁盘。
+    """
+    if buffers is None:
+        with atomic_output(output_path) as fp:
+            img.save(fp, format=pil_format, **save_kwargs)
+        return
+
+    buffer = io.BytesIO()
+    img.save(buffer, format=pil_format, **save_kwargs)
+    buffers.append((output_path, buffer.getvalue()))
+
+def write_output(data, output_path, buffers=None):
+    """写出已编码的数据（buffers 的含义同 save_output）"""
+    if buffers is None:
+        with atomic_output(output_path) as fp:
+            fp.write(data)
+    else:
+        buffers.append((output_path, data))
+
+def encode_to_bytes(img, pil_format, save_kwargs):
+    """将图片编码到内存并返回编码数据"""
+    buffer = io.BytesIO()
+    img.save(buffer, format=pil_format, **save_kwargs)
+    return buffer.getvalue()
+
+def to_truecolor(img):
+    """转换为RGB或RGBA（有透明信息时），作为调色板处理的输入"""
+    if img.mode in ('RGB', 'RGBA'):
+        return img
+    return img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+def quantize_image(img, colors, dither=False, quantizer=DEFAULT_QUANTIZER):
+    """将图片量化为不超过colors色的调色板图片，保留透明通道
+
+    抖动需要按生成的调色板重新映射像素，Pillow只支持对不透明图片这样做
+    """
+    img = to_truecolor(img)
+    method = QUANTIZERS[quantizer]
+    if img.mode == 'RGBA' and method in (Image.Quantize.MEDIANCUT, Image.Quantize.MAXCOVERAGE):
+        method = Image.Quantize.FASTOCTREE
+    quantized = img.quantize(colors=colors, method=method)
+    if dither and img.mode == 'RGB':
+        quantized = img.quantize(palette=quantized, dither=Image.Dither.FLOYDSTEINBERG)
+    return quantized
+
+def palettize_lossless(img, max_colors):
+    """颜色数不超过max_colors时无损转换为调色板图片，否则返回None"""
+    img = to_truecolor(img)
+    colors = img.getcolors(max_colors)
+    if colors is None:
+        return None
+
+    # 量化器在颜色足够时通常恰好保留每种颜色，校验不通过时再逐像素建立索引
+    method = Image.Quantize.FASTOCTREE if img.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+    palettized = img.quantize(colors=len(colors), method=method)
+    if ImageChops.difference(palettized.convert(img.mode), img).getbbox() is None:
+        return palettized
+
+    palette = [color for _, color in colors]
+    indices = {bytes(color): index for index, color in enumerate(palette)}
+    bands = len(img.getbands())
+    data = img.tobytes()
+    palettized = Image.frombytes('P', img.size, bytes(indices[data[offset:offset + bands]]
+                                                      for offset in range(0, len(data), bands)))
+    palettized.putpalette([value for color in palette for value in color], rawmode=img.mode)
+    return palettized
+
+def reduce_palette(img, palette, dither=False, quantizer=DEFAULT_QUANTIZER, info=None):
+    """调色板输出：颜色数不超过palette时无损转换，否则量化为palette色
+
+    info 为字典时记录调色板颜色数(palette_colors)及是否无损(palette_lossless)
+    """
+    if info is None:
+        info = {}
+    palettized = palettize_lossless(img, palette)
+    info['palette_lossless'] = palettized is not None
+    if palettized is None:
+        palettized = quantize_image(img, palette, dither, quantizer)
+    info['palette_colors'] = len(palettized.getcolors(256))
+    return palettized
+
+def search_quality(img, pil_format, save_kwargs, max_bytes):
+    """搜索编码结果不超过max_bytes的最高质量，返回 (质量, 编码数据)
+
+    每轮在当前区间内均匀取若干质量并行试编码（Pillow编码时释放GIL），
+    根据结果缩小区间；最低质量仍超出上限时返回最低质量的结果。
+    Pillow把保存参数记在图片的 encoderinfo 上，因此每次试编码都使用图片的副本，
+    避免并行的试编码互相覆盖参数。
+    """
+    save_kwargs = dict(save_kwargs)
+    # 无损WEBP的quality表示压缩力度，限制体积时改用有损编码
+    save_kwargs.pop('lossless', None)
+    low, high = BUDGET_QUALITY_RANGE
+    best = None
+    fallback = None
+
+    with concurrent.futures.ThreadPoolExecutor(BUDGET_SEARCH_WIDTH) as executor:
+        while low <= high:
+            count = min(BUDGET_SEARCH_WIDTH, high - low + 1)
+            if count == 1:
+                qualities = [low]
+            else:
+                qualities = sorted({low + (high - low) * i // (count - 1) for i in range(count)})
+            results = executor.map(
+                lambda quality: encode_to_bytes(img.copy(), pil_format, dict(save_kwargs, quality=quality)),
+                qualities)
+            trials = list(zip(qualities, results))
+
+            fitting = [(quality, data) for quality, data in trials if len(data) <= max_bytes]
+            if fitting:
+                best = fitting[-1]
+                low = best[0] + 1
+                larger = [quality for quality, _ in trials if quality > best[0]]
+                high = min(larger) - 1 if larger else high
+            else:
+                if fallback is None or trials[0][0] < fallback[0]:
+                    fallback = trials[0]
+                high = qualities[0] - 1
+
+    return best or fallback
+
+def search_palette(img, save_kwargs, max_bytes):
+    """为PNG选择不超过max_bytes的最大调色板，返回 (颜色数, 编码数据)
+
+    原样编码已满足上限时不做量化，颜色数返回None；
+    各调色板大小并行试编码（各自使用图片的副本，见 search_quality），全部超出上限时返回颜色最少的结果。
+    """
+    data = encode_to_bytes(img.copy(), 'PNG', save_kwargs)
+    if len(data) <= max_bytes:
+        return None, data
+
+    def trial(colors):
+        return encode_to_bytes(quantize_image(img.copy(), colors), 'PNG', save_kwargs)
+
+    with concurrent.futures.ThreadPoolExecutor(BUDGET_SEARCH_WIDTH) as executor:
+        trials = list(zip(BUDGET_PALETTE_SIZES, executor.map(trial, BUDGET_PALETTE_SIZES)))
+    for colors, data in trials:
+        if len(data) <= max_bytes:
+            return colors, data
+    return trials[-1]
+
+def encode_within_budget(img, pil_format, save_kwargs, max_bytes, info):
+    """在体积上限内编码图片并返回编码数据
+
+    在info中记录所选质量(quality)或调色板颜色数(colors)、输出大小(output_bytes)
+    以及是否满足上限(budget_met)；TIFF/BMP没有可调参数，只编码一次。
+    """
+    # 先完成解码，避免多个试编码线程同时从源文件惰性加载
+    img.load()
+    if pil_format in BUDGET_QUALITY_FORMATS:
+        info['quality'], data = search_quality(img, pil_format, save_kwargs, max_bytes)
+    elif pil_format == 'PNG':
+        info['colors'], data = search_palette(img, save_kwargs, max_bytes)
+    else:
+        data = encode_to_bytes(img, pil_format, save_kwargs)
+    info['output_bytes'] = len(data)
+    info['budget_met'] = len(data) <= max_bytes
+    return data
+
+def get_frame_output_path(output_path, index):
+    """生成逐帧输出时第index帧（从1开始）的文件路径"""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}_{index:03d}{ext}"
+
+def is_animation(img):
+    """判断多帧图片是否为动画：GIF/WEBP/APNG，或带有帧时长"""
+    return img.format in ANIMATED_SOURCE_FORMATS or 'duration' in img.info
+
+def read_gif_durations(fp):
+    """读取GIF每帧图形控制扩展中的时长（毫秒），跳过图像数据块而不解码"""
+    header = fp.read(13)
+    if header[:3] != b'GIF':
+        return None
+    if header[10] & 0x80:
+        fp.seek(3 << ((header[10] & 7) + 1), os.SEEK_CUR)
+
+    def skip_sub_blocks():
+        while True:
+            size = fp.read(1)
+            if not size or size == b'\0':
+                return
+            fp.seek(size[0], os.SEEK_CUR)
+
+    durations = []
+    delay = 0
+    while True:
+        introducer = fp.read(1)
+        if introducer == b'!':
+            label = fp.read(1)
+            if label == b'\xf9':
+                block = fp.read(5)
+                delay = struct.unpack('<H', block[2:4])[0] * 10
+            skip_sub_blocks()
+        elif introducer == b',':
+            descriptor = fp.read(9)
+            if len(descriptor) < 9:
+                return None
+            if descriptor[8] & 0x80:
+                fp.seek(3 << ((descriptor[8] & 7) + 1), os.SEEK_CUR)
+            fp.seek(1, os.SEEK_CUR)
+            skip_sub_blocks()
+            durations.append(delay)
+            delay = 0
+        else:
+            # 文件结束符或截断的文件
+            return durations
+
+def read_apng_durations(fp):
+    """读取APNG各fcTL块中的帧时长（毫秒），跳过其他数据块"""
+    if fp.read(8) != b'\x89PNG\r\n\x1a\n':
+        return None
+    durations = []
+    while True:
+        chunk = fp.read(8)
+        if len(chunk) < 8:
+            return durations
+        length, chunk_type = struct.unpack('>I4s', chunk)
+        if chunk_type == b'fcTL':
+            data = fp.read(length)
+            delay_num, delay_den = struct.unpack('>HH', data[20:24])
+            durations.append(delay_num / (delay_den or 100) * 1000)
+            fp.seek(4, os.SEEK_CUR)
+        elif chunk_type == b'IEND':
+            return durations
+        else:
+            fp.seek(length + 4, os.SEEK_CUR)
+
+def read_webp_durations(fp):
+    """读取动画WEBP各ANMF块中的帧时长（毫秒），跳过帧数据"""
+    header = fp.read(12)
+    if header[:4] != b'RIFF' or header[8:] != b'WEBP':
+        return None
+    durations = []
+    while True:
+        chunk = fp.read(8)
+        if len(chunk) < 8:
+            return durations
+        chunk_type, length = struct.unpack('<4sI', chunk)
+        if chunk_type == b'ANMF':
+            data = fp.read(16)
+            durations.append(int.from_bytes(data[12:15], 'little'))
+            fp.seek(length - 16 + (length & 1), os.SEEK_CUR)
+        else:
+            fp.seek(length + (length & 1), os.SEEK_CUR)
+
+FRAME_DURATION_READERS = {
+    'GIF': read_gif_durations,
+    'PNG': read_apng_durations,
+    'WEBP': read_webp_durations,
+}
+
+def read_frame_durations(img):
+    """在编码前一次性读取动画每帧的时长（毫秒）列表
+
+    GIF/APNG/WEBP直接解析文件中的帧头信息，不解码任何像素；
+    其他格式或解析结果与帧数不符时，才逐帧定位读取（需要解码各帧），结束后回到第一帧。
+    """
+    n_frames = getattr(img, 'n_frames', 1)
+    reader = FRAME_DURATION_READERS.get(img.format)
+    fp = getattr(img, 'fp', None)
+    if reader is not None and fp is not None:
+        position = fp.tell()
+        try:
+            fp.seek(0)
+            durations = reader(fp)
+        except (OSError, struct.error, IndexError):
+            durations = None
+        finally:
+            fp.seek(position)
+        if durations is not None and len(durations) == n_frames:
+            return durations
+
+    durations = []
+    for index in range(n_frames):
+        img.seek(index)
+        img.load()
+        durations.append(img.info.get('duration', 0))
+    img.seek(0)
+    return durations
+
+def save_frames(img, output_path, target_format, preset=DEFAULT_PRESET, background=DEFAULT_BACKGROUND,
+                buffers=None):
+    """保存多帧图片的所有帧，返回写出的文件路径列表
+
+    TIFF写入同一个多页文件；动画（见 is_animation）转为WEBP/PNG时写入同一个动画文件，
+    并尽量保留每帧时长（编码前见 read_frame_durations）和循环次数；
+    其余情况（如多页TIFF转PNG）每帧输出一个文件。
+    真正逐帧流式处理的只有逐帧输出和写入磁盘的多页TIFF（一次只解码一帧、写完即释放）；
+    APNG写入器会保留每一帧解码后的副本直到文件写完，WEBP动画编码器保留所有已编码的帧，
+    峰值内存随帧数增长；buffers 不为None时整个输出文件也会驻留内存。
+    """
+    pil_format, _ = SUPPORTED_FORMATS[target_format]
+    save_kwargs = get_save_kwargs(target_format, preset)
+
+    animated = pil_format != 'TIFF' and is_animation(img)
+    if pil_format == 'TIFF' or (pil_format in MULTI_FRAME_FORMATS and animated):
+        if animated:
+            save_kwargs['duration'] = read_frame_durations(img)
+            # GIF未设置循环时只播放一次，对应WEBP/APNG中的循环1次
+            save_kwargs['loop'] = img.info.get('loop', 1)
+        save_kwargs['save_all'] = True
+        save_output(img, output_path, pil_format, save_kwargs, buffers)
+        return [output_path]
+
+    outputs = []
+    for index, frame in enumerate(ImageSequence.Iterator(img), 1):
+        frame_path = get_frame_output_path(output_path, index)
+        save_output(prepare_image(frame, target_format, background), frame_path, pil_format, save_kwargs, buffers)
+        outputs.append(frame_path)
+    return outputs
+
+def convert_image(input_path, output_path, target_format, preset=DEFAULT_PRESET,
+                  background=DEFAULT_BACKGROUND, large_image=False,
+                  memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, max_pixels=None,
+                  multi_frame=True, max_bytes=None, palette=None, dither=False,
+                  quantizer=DEFAULT_QUANTIZER, info=None, buffers=None):
+    """转换单张图片
+
+    input_path 可以是文件路径或已读入内存的文件对象；
+    max_bytes 为单帧图片的体积上限（见 encode_within_budget），多帧图片和大图模式不受限制；
+    palette 为颜色数时，PNG/WEBP单帧图片输出为调色板图片（见 reduce_palette）；
+    info 为字典时，会在其中记录帧数(frames)、尺寸(size)、写出的文件列表(outputs)
+    以及各阶段耗时(timings，见 TIMING_STAGES)；
+    buffers 为列表时只编码到内存而不写盘（见 save_output）
+    """
+    if info is None:
+        info = {}
+    timings = info.setdefault('timings', {})
+    if large_image:
+        return convert_large_image(input_path, output_path, target_format, preset, background,
+                                   memory_budget_mb, max_pixels, multi_frame, info)
+
     try:
-        with Image.open(input_path) as img:
+        start = time.perf_counter()
+        with Image.open(input_path) as source:
+            timings['open'] = time.perf_counter() - start
             pil_format, _ = SUPPORTED_FORMATS[target_format]
-            
-            # 处理RGB转换（对于不支持透明通道的格式）
-            if target_format in ['jpg', 'jpeg', 'jpe', 'bmp'] and img.mode in ('RGBA', 'LA', 'P'):
-                # 创建白色背景的RGB图像
-                if img.mode == 'P' and 'transparency' in img.info:
-                    img = img.convert('RGBA')
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    rgb_img.paste(img, mask=img.split()[-1])
+            info['frames'] = getattr(source, 'n_frames', 1)
+            info['size'] = source.size
+
+            if multi_frame and info['frames'] > 1:
+                start = time.perf_counter()
+                info['outputs'] = save_frames(source, output_path, target_format, preset, background, buffers)
+                timings['encode'] = time.perf_counter() - start
+                return True, None
+
+            start = time.perf_counter()
+            source.load()
+            timings['decode'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            img = prepare_image(source, target_format, background)
+            if img is not source:
+                # 尽早释放解码后的原图，编码时只保留一帧数据
+                source.close()
+
+            if palette and pil_format in QUANTIZE_FORMATS:
+                img = reduce_palette(img, palette, dither, quantizer, info)
+            timings['flatten'] = time.perf_counter() - start
+
+            # 先编码到内存再写出，分别统计编码与写出耗时
+            start = time.perf_counter()
+            save_kwargs = get_save_kwargs(target_format, preset)
+            if max_bytes:
+                data = encode_within_budget(img, pil_format, save_kwargs, max_bytes, info)
+            else:
+                data = encode_to_bytes(img, pil_format, save_kwargs)
+            timings['encode'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            write_output(data, output_path, buffers)
+            timings['write'] = time.perf_counter() - start
+            info['outputs'] = [output_path]
+            return True, None
+
+    except Image.DecompressionBombError as e:
+        return False, f"图片像素数超过安全限制，请使用大图模式转换 ({e})"
+    except Exception as e:
+        return False, str(e)
+
+def estimate_image_bytes(mode, width, height):
+    """估算指定模式和尺寸的图片解码后占用的内存"""
+    if mode == '1':
+        return (width + 7) // 8 * height
+    try:
+        bytes_per_pixel = Image.getmodebands(mode)
+    except (KeyError, ValueError):
+        bytes_per_pixel = 4
+    bytes_per_pixel = {'I;16': 2, 'I': 4, 'F': 4}.get(mode, bytes_per_pixel)
+    return width * height * bytes_per_pixel
+
+def get_tiff_bands(img):
+    """解析TIFF的条带/分块布局，返回 [(起始行, 行数, 存储行数, [(起始列, 宽度, 偏移, 长度), ...]), ...]
+
+    不满足按条带读取条件（压缩方式、位深、预测器、平面配置等）时返回None
+    """
+    if img.format != 'TIFF' or img.mode not in BAND_MODES or getattr(img, 'n_frames', 1) > 1:
+        return None
+
+    tags = img.tag_v2
+    bits = tags.get(258, (8,))
+    if not isinstance(bits, tuple):
+        bits = (bits,)
+    if (tags.get(259, 1) not in BAND_COMPRESSIONS or tags.get(317, 1) != 1
+            or tags.get(284, 1) != 1 or any(b != 8 for b in bits)):
+        return None
+
+    width, height = img.size
+    bands = []
+    if 322 in tags:
+        # 分块TIFF：每一行分块组成一个条带，边缘分块带有填充
+        tile_width, tile_height = tags[322], tags[323]
+        offsets, counts = tags[324], tags[325]
+        across = (width + tile_width - 1) // tile_width
+        for row, y in enumerate(range(0, height, tile_height)):
+            pieces = []
+            for col in range(across):
+                index = row * across + col
+                pieces.append((col * tile_width, tile_width, offsets[index], counts[index]))
+            bands.append((y, min(tile_height, height - y), tile_height, pieces))
+    else:
+        rows_per_strip = min(tags.get(278, height), height)
+        offsets, counts = tags.get(273), tags.get(279)
+        if not offsets or not counts:
+            return None
+        for index, y in enumerate(range(0, height, rows_per_strip)):
+            rows = min(rows_per_strip, height - y)
+            bands.append((y, rows, rows, [(0, width, offsets[index], counts[index])]))
+    return bands
+
+def iter_tiff_bands(img, input_path, bands):
+    """按条带读取并解码TIFF，依次产出 (起始行, 条带图片)
+
+    input_path 可以是文件路径或可随机读取的文件对象
+    """
+    compression = img.tag_v2.get(259, 1)
+    samples = img.tag_v2.get(277, 1)
+    tiled = 322 in img.tag_v2
+    rawmode = img.tile[0][3][0]
+    width = img.size[0]
+    palette = img.getpalette() if img.mode == 'P' else None
+
+    def decode(data, size, decoder='raw'):
+        band = Image.frombytes(img.mode, size, data, decoder, rawmode)
+        if palette:
+            band.putpalette(palette)
+        return band
+
+    if isinstance(input_path, str):
+        source = open(input_path, 'rb')
+    else:
+        source = contextlib.nullcontext(input_path)
+
+    with source as fp:
+        for y, rows, stored_rows, pieces in bands:
+            if compression == 1 and not tiled:
+                # 未压缩条带可以按行任意切分，进一步限制单次读取的数据量
+                _, piece_width, offset, _ = pieces[0]
+                stride = piece_width * samples
+                for start in range(0, rows, LARGE_IMAGE_BAND_ROWS):
+                    count = min(LARGE_IMAGE_BAND_ROWS, rows - start)
+                    fp.seek(offset + start * stride)
+                    yield y + start, decode(fp.read(count * stride), (piece_width, count))
+                continue
+
+            band = Image.new(img.mode, (width, rows)) if len(pieces) > 1 else None
+            for x, piece_width, offset, length in pieces:
+                fp.seek(offset)
+                data = fp.read(length)
+                if compression in (8, 32946):
+                    piece = decode(zlib.decompress(data), (piece_width, stored_rows))
+                elif compression == 32773:
+                    piece = decode(data, (piece_width, stored_rows), 'packbits')
                 else:
-                    rgb_img.paste(img)
-                img = rgb_img
-            
-            # 保存图片
-            save_kwargs = {}
-            if target_format == 'webp':
-                save_kwargs['quality'] = 80  # 默认质量
-            elif target_format in ['jpg', 'jpeg', 'jpe']:
-                save_kwargs['quality'] = 95  # JPEG质量
-            
-            img.save(output_path, format=pil_format, **save_kwargs)
+                    piece = decode(data, (piece_width, stored_rows))
+                if band is None:
+                    # 分块宽度可能大于图片宽度，右侧和底部的填充都要裁掉
+                    if piece_width != width or stored_rows != rows:
+                        piece = piece.crop((0, 0, width, rows))
+                    band = piece
+                else:
+                    band.paste(piece.crop((0, 0, min(piece_width, width - x), rows)), (x, 0))
+            if palette:
+                band.putpalette(palette)
+            yield y, band
+
+def prepare_stream_band(band, pil_format, background, has_transparency):
+    """将条带转换为流式写出所需的模式"""
+    if pil_format == 'BMP':
+        band = flatten_alpha(band, background)
+        return band if band.mode == 'RGB' else band.convert('RGB')
+    if band.mode in PNG_COLOR_TYPES:
+        return band
+    if band.mode == 'P':
+        return band.convert('RGBA' if has_transparency else 'RGB')
+    return band.convert('RGB')
+
+def write_png_chunk(fp, chunk_type, data):
+    """写出一个PNG数据块"""
+    fp.write(struct.pack('>I', len(data)))
+    fp.write(chunk_type)
+    fp.write(data)
+    fp.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+def write_png_stream(output_path, size, bands, compress_level=6):
+    """逐条带写出PNG，整张图片不会同时驻留内存"""
+    width, height = size
+    compressor = zlib.compressobj(compress_level)
+    with atomic_output(output_path) as fp:
+        fp.write(b'\x89PNG\r\n\x1a\n')
+        header_written = False
+        for band in bands:
+            if not header_written:
+                color_type = PNG_COLOR_TYPES[band.mode]
+                write_png_chunk(fp, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+                header_written = True
+            # 每行前加一个滤波类型字节（0表示不滤波）
+            data = band.tobytes()
+            stride = len(data) // band.size[1]
+            rows = b''.join(b'\x00' + data[i:i + stride] for i in range(0, len(data), stride))
+            compressed = compressor.compress(rows)
+            if compressed:
+                write_png_chunk(fp, b'IDAT', compressed)
+        write_png_chunk(fp, b'IDAT', compressor.flush())
+        write_png_chunk(fp, b'IEND', b'')
+
+def write_bmp_stream(output_path, size, bands):
+    """逐条带写出24位BMP（自上而下的行顺序）"""
+    width, height = size
+    row_size = (width * 3 + 3) & ~3
+    image_size = row_size * height
+    if 54 + image_size > 0xFFFFFFFF:
+        raise ValueError("BMP文件大小不能超过4GB，请选择其他目标格式")
+
+    with atomic_output(output_path) as fp:
+        fp.write(struct.pack('<2sIHHI', b'BM', 54 + image_size, 0, 0, 54))
+        # 高度取负值表示像素行自上而下存储，便于按条带顺序写出
+        fp.write(struct.pack('<IiiHHIIiiII', 40, width, -height, 1, 24, 0, image_size, 2835, 2835, 0, 0))
+        for band in bands:
+            fp.write(band.tobytes('raw', 'BGR', row_size))
+
+def convert_large_image(input_path, output_path, target_format, preset=DEFAULT_PRESET,
+                        background=DEFAULT_BACKGROUND, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                        max_pixels=None, multi_frame=True, info=None):
+    """大图模式转换：按条带读写，并在超出内存预算时提前失败"""
+    if info is None:
+        info = {}
+    budget = memory_budget_mb * 1024 * 1024
+    pil_format, _ = SUPPORTED_FORMATS[target_format]
+
+    timings = info.setdefault('timings', {})
+    start = time.perf_counter()
+
+    try:
+        # 像素上限由大图模式自行检查，解码期间关闭Pillow的解压炸弹保护以免直接抛错
+        with unlimited_pixels(), Image.open(input_path) as img:
+            timings['open'] = time.perf_counter() - start
+            start = time.perf_counter()
+            width, height = img.size
+            info['size'] = img.size
+            info['frames'] = getattr(img, 'n_frames', 1)
+            if max_pixels and width * height > max_pixels:
+                return False, f"像素数 {width * height} 超过上限 {max_pixels}，已跳过"
+
+            bands = get_tiff_bands(img) if pil_format in STREAMING_FORMATS else None
+            if bands:
+                # 峰值约为：单个条带的解码数据 + 模式转换结果 + 写出缓冲
+                largest = max(stored_rows for _, _, stored_rows, _ in bands)
+                if img.tag_v2.get(259, 1) == 1 and 322 not in img.tag_v2:
+                    largest = min(largest, LARGE_IMAGE_BAND_ROWS)
+                estimate = estimate_image_bytes(img.mode, width, largest) * 3
+            else:
+                # 整图处理：解码后的原图 + 模式转换结果
+                estimate = estimate_image_bytes(img.mode, width, height) * 2
+
+            if estimate > budget:
+                hint = "" if bands else "（该图片无法按条带读取，需整图解码）"
+                return False, (f"预计峰值内存 {format_size(estimate)} 超过预算 "
+                               f"{format_size(budget)}{hint}")
+
+            if not bands:
+                if multi_frame and info['frames'] > 1:
+                    # 多帧图片逐帧处理，预算按单帧估算
+                    info['outputs'] = save_frames(img, output_path, target_format, preset, background)
+                    timings['encode'] = time.perf_counter() - start
+                    return True, None
+                img.load()
+                prepared = prepare_image(img, target_format, background)
+                if prepared is not img:
+                    img.close()
+                save_output(prepared, output_path, pil_format, get_save_kwargs(target_format, preset))
+                timings['encode'] = time.perf_counter() - start
+                info['outputs'] = [output_path]
+                return True, None
+
+            has_transparency = 'transparency' in img.info
+            stream = (prepare_stream_band(band, pil_format, background, has_transparency)
+                      for _, band in iter_tiff_bands(img, input_path, bands))
+            if pil_format == 'PNG':
+                save_kwargs = get_save_kwargs(target_format, preset)
+                level = 9 if save_kwargs.get('optimize') else save_kwargs.get('compress_level', 6)
+                write_png_stream(output_path, img.size, stream, level)
+            else:
+                write_bmp_stream(output_path, img.size, stream)
+            timings['encode'] = time.perf_counter() - start
+            info['outputs'] = [output_path]
             return True, None
-            
+
     except Exception as e:
         return False, str(e)
 
-def process_images(input_folder, output_folder, target_format):
-    """批量处理图片"""
+def format_size(num_bytes):
+    """将字节数格式化为便于阅读的字符串"""
+    size = float(num_bytes)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(size) < 1024 or unit == 'GB':
+            return f"{int(size)}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+
+def reflink_file(src, dst):
+    """使用写时复制克隆文件（Linux FICLONE，需Btrfs/XFS等文件系统支持）"""
+    import fcntl
+    FICLONE = 0x40049409
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+
+def copy_range_file(src, dst):
+    """在内核中复制文件数据，优先使用copy_file_range，其次使用sendfile"""
+    copy_func = getattr(os, 'copy_file_range', None) or getattr(os, 'sendfile', None)
+    if copy_func is None:
+        raise OSError("当前平台不支持 copy_file_range/sendfile")
+
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        remaining = os.fstat(src_file.fileno()).st_size
+        while remaining > 0:
+            if copy_func is os.sendfile:
+                copied = os.sendfile(dst_file.fileno(), src_file.fileno(), None, remaining)
+            else:
+                copied = copy_func(src_file.fileno(), dst_file.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+def hardlink_file(src, dst):
+    """创建硬链接（需与源文件位于同一文件系统）"""
+    os.link(src, dst)
+
+def passthrough_file(src, dst, mode=DEFAULT_PASSTHROUGH):
+    """将格式相同的源文件直通到输出位置，返回实际使用的方式
+
+    先写到同目录的临时文件再重命名，中断时不会留下不完整的输出；
+    输出位置原有的文件（包括指向源文件的硬链接）只会被替换，不会被截断。
+    """
+    if os.path.abspath(src) == os.path.abspath(dst):
+        raise shutil.SameFileError(f"输入与输出是同一个文件: {src}")
+
+    methods = {
+        'reflink': reflink_file,
+        'hardlink': hardlink_file,
+        'copy_range': copy_range_file,
+    }
+    candidates = ['reflink', 'copy_range'] if mode == 'auto' else [mode]
+    temp_path = make_temp_path(dst)
+
+    try:
+        for method in candidates:
+            if method == 'copy':
+                break
+            try:
+                methods[method](src, temp_path)
+            except (OSError, ImportError):
+                # 清理失败时可能留下的空文件
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                if mode != 'auto':
+                    raise
+                continue
+            if method != 'hardlink':
+                shutil.copystat(src, temp_path)
+            os.replace(temp_path, dst)
+            return method
+
+        shutil.copy2(src, temp_path)
+        os.replace(temp_path, dst)
+        return 'copy'
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def read_7z_member(archive_path, member):
+    """从7z压缩包中读取单个成员到内存，返回文件对象"""
+    import py7zr
+    with py7zr.SevenZipFile(archive_path, 'r') as archive:
+        if hasattr(archive, 'read'):
+            # py7zr 1.0 之前的接口
+            return archive.read(targets=[member])[member]
+        from py7zr.io import BytesIOFactory
+        factory = BytesIOFactory(sys.maxsize)
+        archive.extract(targets=[member], factory=factory)
+    product = factory.get(member)
+    product.seek(0)
+    return io.BytesIO(product.read())
+
+def open_job_source(job):
+    """打开任务的源数据：普通文件直接打开，压缩包成员从压缩包中读取而不解压到磁盘"""
+    if 'member' not in job:
+        return open(job['path'], 'rb')
+    if job['archive_format'] == 'ZIP':
+        # ZIP成员边解压边读取，可随机定位
+        return job['archive'].open(job['member'])
+    return read_7z_member(job['path'], job['member'])
+
+def list_archive_members(archive_path, archive_format, stack):
+    """列出压缩包中的文件成员，返回 (压缩包对象, [(成员路径, 解压后大小), ...])
+
+    ZIP压缩包保持打开直到批次结束（由stack负责关闭）；7z每次读取成员时重新打开
+    """
+    if archive_format == 'ZIP':
+        archive = stack.enter_context(zipfile.ZipFile(archive_path))
+        return archive, [(info.filename, info.file_size) for info in archive.infolist() if not info.is_dir()]
+
+    import py7zr
+    with py7zr.SevenZipFile(archive_path, 'r') as archive:
+        members = [(info.filename, info.uncompressed) for info in archive.list() if not info.is_directory]
+    return None, members
+
+def collect_sources(input_folder, files, stack):
+    """整理输入源，返回 (源列表, 被跳过的文件列表)
+
+    普通文件各自作为一个源；压缩包展开为其中的各个成员，输出位置为
+    输出文件夹/压缩包名/成员原有路径。路径为绝对路径或含 .. 的成员
+    会写出到输出文件夹之外，直接跳过。
+    """
+    sources = []
+    rejected = []
+
+    for filename in files:
+        input_path = os.path.join(input_folder, filename)
+        name_without_ext, file_ext = os.path.splitext(filename)
+        archive_format = ARCHIVE_EXTENSIONS.get(file_ext.lower())
+        if archive_format is None:
+            sources.append({'name': filename, 'path': input_path, 'output_name': name_without_ext})
+            continue
+
+        try:
+            archive, members = list_archive_members(input_path, archive_format, stack)
+        except ImportError:
+            rejected.append((filename, "读取7z压缩包需要安装py7zr: pip install py7zr"))
+            continue
+        except Exception as e:
+            rejected.append((filename, f"无法读取压缩包: {e}"))
+            continue
+
+        for member, size in members:
+            name = f"{filename}/{member}"
+            parts = member.replace('\\', '/').split('/')
+            if member.startswith(('/', '\\')) or any(part == '..' or ':' in part for part in parts):
+                rejected.append((name, "成员路径指向输出文件夹之外"))
+                continue
+            relative_path = os.path.join(name_without_ext, *[part for part in parts if part not in ('', '.')])
+            sources.append({
+                'name': name,
+                'path': input_path,
+                'archive': archive,
+                'archive_format': archive_format,
+                'member': member,
+                'bytes': size,
+                'output_name': os.path.splitext(relative_path)[0],
+            })
+
+    return sources, rejected
+
+def copy_member(job, dst):
+    """将格式相同的压缩包成员原样写出到输出位置"""
+    with open_job_source(job) as src, atomic_output(dst) as fp:
+        shutil.copyfileobj(src, fp)
+
+def is_same_format(source_format, target_format):
+    """判断源图片的PIL格式与目标格式是否相同（jpeg/jpe/jpg 均对应 JPEG）"""
+    return source_format == SUPPORTED_FORMATS[target_format][0]
+
+def sniff_format(header):
+    """根据文件头识别图片的真实格式，无法识别时返回None"""
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    for signature, pil_format in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return pil_format
+    return None
+
+def inspect_source(fp):
+    """读取文件头识别真实格式，并惰性读取尺寸和模式（不解码像素）
+
+    返回 (格式, 宽, 高, 模式)，无法转换时抛出带原因的ValueError
+    """
+    source_format = sniff_format(fp.read(16))
+    if source_format is None:
+        raise ValueError("无法识别的文件格式")
+    if source_format not in INPUT_FORMATS:
+        raise ValueError(f"不支持的格式: {source_format}")
+
+    fp.seek(0)
+    try:
+        with Image.open(fp) as img:
+            return img.format or source_format, img.size[0], img.size[1], img.mode
+    except Image.DecompressionBombError:
+        raise ValueError("像素数超过安全限制，请使用大图模式转换")
+    except Exception as e:
+        raise ValueError(f"文件损坏或无法解析: {e}")
+
+def prefilter_images(sources, max_pixels=None):
+    """预检输入源（见 collect_sources），返回 (待转换任务列表, 被拒绝的文件列表)
+
+    只读取文件头识别真实格式，并用 Image.open 惰性读取尺寸和模式（不解码像素），
+    在进入转换之前剔除损坏、超限或不支持的文件。任务按像素数从大到小排列，
+    让耗时最长的大图最先开始处理。
+    """
+    jobs = []
+    rejected = []
+
+    for source in sources:
+        try:
+            file_size = source['bytes'] if 'bytes' in source else os.path.getsize(source['path'])
+            with open_job_source(source) as fp:
+                source_format, width, height, mode = inspect_source(fp)
+        except ValueError as e:
+            rejected.append((source['name'], str(e)))
+            continue
+        except Exception as e:
+            rejected.append((source['name'], f"无法读取: {e}"))
+            continue
+
+        if max_pixels and width * height > max_pixels:
+            rejected.append((source['name'], f"像素数 {width * height} 超过上限 {max_pixels}"))
+            continue
+
+        jobs.append(dict(source, format=source_format, width=width, height=height,
+                         mode=mode, bytes=file_size))
+
+    # 大图优先调度，避免大文件集中在批次末尾
+    jobs.sort(key=lambda job: (job['width'] * job['height'], job['bytes']), reverse=True)
+    return jobs, rejected
+
+def collect_jobs_by_extension(sources):
+    """仅按扩展名筛选输入源（不读取文件内容），返回 (任务列表, 被跳过的文件列表)"""
+    jobs = []
+    rejected = []
+    for source in sources:
+        file_ext = os.path.splitext(source['name'])[1].lower().lstrip('.')
+        if not file_ext or file_ext not in SUPPORTED_FORMATS:
+            rejected.append((source['name'], "不支持的文件"))
+            continue
+        jobs.append(dict(source, format=SUPPORTED_FORMATS[file_ext][0]))
+    return jobs, rejected
+
+def get_source_size(job):
+    """返回任务源数据的字节数（压缩包成员为解压后大小）"""
+    return job['bytes'] if 'bytes' in job else os.path.getsize(job['path'])
+
+def hash_source(job):
+    """分块读取输入内容并计算BLAKE2b哈希"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open_job_source(job) as fp:
+        for chunk in iter(lambda: fp.read(DEDUP_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_duplicates(jobs):
+    """找出内容完全相同的输入，返回去重后的任务列表
+
+    只有大小相同的输入才可能重复，因此只对大小有冲突的输入计算哈希。
+    每组相同内容只保留第一个任务，其余任务记录在它的 duplicates 列表中。
+    """
+    sizes = {}
+    for job in jobs:
+        job['bytes'] = get_source_size(job)
+        sizes[job['bytes']] = sizes.get(job['bytes'], 0) + 1
+
+    unique = []
+    leaders = {}
+    for job in jobs:
+        job['duplicates'] = []
+        key = None
+        if sizes[job['bytes']] > 1:
+            try:
+                key = (job['bytes'], hash_source(job))
+            except Exception:
+                # 无法读取的文件留给转换阶段报告错误
+                pass
+        if key in leaders:
+            leaders[key]['duplicates'].append(job)
+            continue
+        if key is not None:
+            leaders[key] = job
+        unique.append(job)
+    return unique
+
+def get_dhash(img, hash_size=DHASH_SIZE):
+    """计算图片的差异哈希（dHash）：比较缩小后灰度图中相邻像素的明暗"""
+    # thumbnail 会利用JPEG的draft缩小解码，避免整图解码
+    img.thumbnail((hash_size * 4, hash_size * 4))
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            index = row * (hash_size + 1) + col
+            value = (value << 1) | (pixels[index] > pixels[index + 1])
+    return value
+
+def find_near_duplicates(jobs, max_distance=NEAR_DUPLICATE_DISTANCE):
+    """找出内容近似的输入，返回 [(任务A, 任务B, 汉明距离), ...]"""
+    hashes = []
+    for job in jobs:
+        try:
+            with open_job_source(job) as fp, Image.open(fp) as img:
+                value = get_dhash(img)
+        except Exception:
+            continue
+        # 纯色图片的哈希全为0，彼此无法区分，不参与比较
+        if value:
+            hashes.append((job, value))
+
+    pairs = []
+    for index, (job_a, hash_a) in enumerate(hashes):
+        for job_b, hash_b in hashes[index + 1:]:
+            distance = bin(hash_a ^ hash_b).count('1')
+            if distance <= max_distance:
+                pairs.append((job_a, job_b, distance))
+    return pairs
+
+def materialize_duplicate(leader, duplicate, outputs, dedup='hardlink'):
+    """用主任务的输出为内容相同的任务生成输出，返回写出的文件列表"""
+    if outputs == [leader['output_path']]:
+        targets = [duplicate['output_path']]
+    else:
+        # 每帧单独输出时按帧序号对应
+        targets = [get_frame_output_path(duplicate['output_path'], index)
+                   for index in range(1, len(outputs) + 1)]
+    mode = 'hardlink' if dedup == 'hardlink' else 'auto'
+    for src, dst in zip(outputs, targets):
+        passthrough_file(src, dst, mode)
+    return targets
+
+def calibrate_presets(sample_folder, target_format, sample_size=10, presets=None):
+    """在样本图片上测试各编码预设的编码耗时与输出体积"""
+    if presets is None:
+        presets = list(ENCODER_PRESETS)
+    pil_format, _ = SUPPORTED_FORMATS[target_format]
+
+    try:
+        files = sorted(f for f in os.listdir(sample_folder)
+                       if os.path.isfile(os.path.join(sample_folder, f))
+                       and os.path.splitext(f)[1].lower().lstrip('.') in SUPPORTED_FORMATS)
+    except Exception as e:
+        print(f"无法读取样本文件夹: {e}")
+        return None
+
+    if not files:
+        print("样本文件夹中没有找到支持的图片！")
+        return None
+
+    # 均匀抽取样本，保证每次校准使用相同的图片
+    if sample_size and len(files) > sample_size:
+        step = len(files) / sample_size
+        files = [files[int(i * step)] for i in range(sample_size)]
+
+    results = {name: {'seconds': 0.0, 'bytes': 0, 'count': 0} for name in presets}
+
+    print(f"\n开始校准编码预设...")
+    print(f"样本文件夹: {sample_folder}")
+    print(f"样本数量: {len(files)}")
+    print(f"目标格式: {target_format}")
+    print("-" * 50)
+
+    for i, filename in enumerate(files, 1):
+        print(f"[{i}/{len(files)}] 测试: {filename}")
+        try:
+            with Image.open(os.path.join(sample_folder, filename)) as img:
+                img.load()
+                # 解码和模式处理只做一次，只统计编码本身的耗时
+                img = prepare_image(img, target_format)
+                for name in presets:
+                    buffer = io.BytesIO()
+                    start = time.perf_counter()
+                    img.save(buffer, format=pil_format, **get_save_kwargs(target_format, name))
+                    results[name]['seconds'] += time.perf_counter() - start
+                    results[name]['bytes'] += buffer.tell()
+                    results[name]['count'] += 1
+        except Exception as e:
+            print(f"  -> 跳过: {e}")
+
+    # 输出对比结果
+    print("-" * 50)
+    baseline = results.get(DEFAULT_PRESET)
+    print(f"{'预设':<10}{'总耗时(秒)':>12}{'平均(毫秒)':>12}{'总大小':>12}{'相对大小':>10}")
+    for name in presets:
+        item = results[name]
+        if not item['count']:
+            continue
+        average_ms = item['seconds'] / item['count'] * 1000
+        relative = ''
+        if baseline and baseline['bytes']:
+            relative = f"{item['bytes'] / baseline['bytes'] * 100:.0f}%"
+        print(f"{name:<10}{item['seconds']:>12.3f}{average_ms:>12.1f}{format_size(item['bytes']):>12}{relative:>10}")
+
+    measured = [name for name in presets if results[name]['count']]
+    if measured:
+        fastest = min(measured, key=lambda name: results[name]['seconds'])
+        smallest = min(measured, key=lambda name: results[name]['bytes'])
+        print(f"\n编码最快: {fastest}")
+        print(f"体积最小: {smallest}")
+
+    return results
+
+def make_bench_photo(rng, size):
+    """类照片图片：平滑的色块叠加细节噪声"""
+    width, height = size
+    base = Image.frombytes('RGB', (16, 12), rng.randbytes(16 * 12 * 3)).resize(size, Image.BICUBIC)
+    noise = Image.frombytes('L', size, rng.randbytes(width * height)).convert('RGB')
+    return Image.blend(base, noise, 0.15).filter(ImageFilter.GaussianBlur(0.6))
+
+def make_bench_flat_ui(rng, size):
+    """界面截图类图片：纯色背景上的圆角色块与文字"""
+    width, height = size
+    img = Image.new('RGB', size, tuple(rng.randrange(200, 256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(24):
+        x, y = rng.randrange(width), rng.randrange(height)
+        box = (x, y, x + rng.randrange(20, width // 3), y + rng.randrange(10, height // 4))
+        draw.rounded_rectangle(box, radius=6, fill=tuple(rng.randrange(256) for _ in range(3)))
+        draw.text((x + 4, y + 4), f"Item {rng.randrange(1000)}", fill=(20, 20, 20))
+    return img
+
+def make_bench_rgba(rng, size):
+    """带透明通道的图片：类照片内容加径向渐变透明度"""
+    img = make_bench_photo(rng, size)
+    img.putalpha(Image.radial_gradient('L').resize(size))
+    return img
+
+def make_bench_palette(rng, size):
+    """调色板图片：界面类内容量化为32色"""
+    return make_bench_flat_ui(rng, size).quantize(32)
+
+def make_bench_icon(rng, size):
+    """小图标：透明背景上的几何图形"""
+    img = Image.new('RGBA', size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    width, height = size
+    color = tuple(rng.randrange(256) for _ in range(3)) + (255,)
+    draw.ellipse((2, 2, width - 3, height - 3), fill=color)
+    draw.rectangle((width // 3, height // 3, width * 2 // 3, height * 2 // 3), fill=(255, 255, 255, 200))
+    return img
+
+BENCH_GENERATORS = {
+    'photo': make_bench_photo,
+    'flat_ui': make_bench_flat_ui,
+    'rgba': make_bench_rgba,
+    'palette': make_bench_palette,
+    'large_tiff': make_bench_photo,
+    'icons': make_bench_icon,
+}
+
+def generate_bench_corpus(corpus_folder, corpora=None, formats=BENCH_FORMATS):
+    """生成基准测试图片集：corpus_folder/图片集/源格式/ 下的图片，已存在的文件不重复生成
+
+    返回 {(图片集, 源格式): [文件路径, ...]}
+    """
+    corpora = corpora or list(BENCH_CORPORA)
+    corpus_files = {}
+    for corpus in corpora:
+        spec = BENCH_CORPORA[corpus]
+        for source_format in formats:
+            if source_format not in spec.get('formats', formats):
+                continue
+            folder = os.path.join(corpus_folder, corpus, source_format)
+            os.makedirs(folder, exist_ok=True)
+            paths = []
+            for index in range(spec['count']):
+                path = os.path.join(folder, f"{corpus}_{index:03d}{SUPPORTED_FORMATS[source_format][1]}")
+                if not os.path.exists(path):
+                    # 以图片集名和序号作为种子，每次生成的内容完全相同
+                    img = BENCH_GENERATORS[corpus](random.Random(f"{corpus}-{index}"), spec['size'])
+                    img = prepare_image(img, source_format)
+                    with atomic_output(path) as fp:
+                        img.save(fp, format=SUPPORTED_FORMATS[source_format][0])
+                paths.append(path)
+            corpus_files[(corpus, source_format)] = paths
+    return corpus_files
+
+def get_peak_rss_mb():
+    """返回当前进程的峰值常驻内存(MB)，不支持的平台（Windows）返回None"""
+    # Linux下getrusage的峰值会继承exec之前父进程的值，优先读取只属于本进程的VmHWM
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux以KB为单位，macOS以字节为单位
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_bench_pair(files, output_folder, target_format, preset, result_queue):
+    """在子进程中转换一组图片并报告耗时、吞吐量、峰值内存与输出大小"""
+    os.makedirs(output_folder, exist_ok=True)
+    _, target_extension = SUPPORTED_FORMATS[target_format]
+    result = {'images': 0, 'megapixels': 0.0, 'output_bytes': 0, 'failures': 0}
+
+    start = time.perf_counter()
+    for path in files:
+        info = {}
+        output_path = os.path.join(output_folder, os.path.splitext(os.path.basename(path))[0] + target_extension)
+        success, _ = convert_image(path, output_path, target_format, preset, info=info)
+        if not success:
+            result['failures'] += 1
+            continue
+        width, height = info['size']
+        result['images'] += 1
+        result['megapixels'] += width * height / 1e6
+        result['output_bytes'] += sum(os.path.getsize(output) for output in info['outputs'])
+    result['seconds'] = time.perf_counter() - start
+    result['peak_rss_mb'] = get_peak_rss_mb()
+    result_queue.put(result)
+
+def load_bench_results(results_path):
+    """读取基准测试结果文件，返回 {(图片集, 源格式, 目标格式): 结果行}"""
+    with open(results_path, encoding='utf-8', newline='') as f:
+        rows = csv.DictReader(line for line in f if not line.startswith('#'))
+        return {(row['corpus'], row['source'], row['target']): row for row in rows}
+
+def run_benchmark(corpus_folder=DEFAULT_BENCH_FOLDER, results_path=DEFAULT_BENCH_RESULTS, corpora=None,
+                  formats=BENCH_FORMATS, preset=DEFAULT_PRESET, compare=None):
+    """对每个图片集的每组源格式与目标格式运行转换基准测试
+
+    每组在独立的子进程中运行，峰值内存互不影响；结果按固定顺序写入CSV，
+    便于在版本之间直接比较。compare 为旧结果文件时输出吞吐量与体积的变化。
+    """
+    print(f"\n准备基准测试图片...")
+    corpus_files = generate_bench_corpus(corpus_folder, corpora, formats)
+    output_root = os.path.join(corpus_folder, "_output")
+    context = multiprocessing.get_context('spawn')
+    rows = []
+
+    print(f"图片集: {', '.join(corpora or BENCH_CORPORA)}")
+    print(f"编码预设: {preset}")
+    print("-" * 50)
+    for (corpus, source_format), files in corpus_files.items():
+        for target_format in formats:
+            output_folder = os.path.join(output_root, f"{corpus}_{source_format}_{target_format}")
+            shutil.rmtree(output_folder, ignore_errors=True)
+            result_queue = context.Queue()
+            process = context.Process(target=run_bench_pair,
+                                      args=(files, output_folder, target_format, preset, result_queue))
+            process.start()
+            result = result_queue.get()
+            process.join()
+            shutil.rmtree(output_folder, ignore_errors=True)
+
+            seconds = result['seconds']
+            row = {
+                'corpus': corpus,
+                'source': source_format,
+                'target': target_format,
+                'images': result['images'],
+                'megapixels': round(result['megapixels'], 3),
+                'seconds': round(seconds, 3),
+                'images_per_second': round(result['images'] / seconds, 2) if seconds else 0,
+                'mp_per_second': round(result['megapixels'] / seconds, 2) if seconds else 0,
+                'peak_rss_mb': result['peak_rss_mb'] if result['peak_rss_mb'] is not None else '',
+                'output_bytes': result['output_bytes'],
+                'failures': result['failures'],
+            }
+            rows.append(row)
+            print(f"{corpus:<11}{source_format:>5} -> {target_format:<5}{row['images_per_second']:>10} 张/秒"
+                  f"{row['mp_per_second']:>10} MP/s{format_size(row['output_bytes']):>10}"
+                  + (f"  峰值内存 {row['peak_rss_mb']}MB" if row['peak_rss_mb'] != '' else "")
+                  + (f"  失败 {row['failures']}" if row['failures'] else ""))
+    shutil.rmtree(output_root, ignore_errors=True)
+
+    previous = None
+    if compare:
+        try:
+            previous = load_bench_results(compare)
+        except OSError as e:
+            print(f"无法读取对比结果: {e}")
+
+    import PIL
+    with atomic_output(results_path) as fp:
+        text = io.TextIOWrapper(fp, encoding='utf-8', newline='')
+        text.write(f"# python={sys.version.split()[0]} pillow={PIL.__version__} preset={preset}\n")
+        writer = csv.DictWriter(text, fieldnames=BENCH_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        text.flush()
+        text.detach()
+    print("-" * 50)
+    print(f"结果文件: {results_path}")
+
+    if previous:
+        print(f"\n与 {compare} 对比:")
+        for row in rows:
+            old = previous.get((row['corpus'], row['source'], row['target']))
+            if not old:
+                continue
+            changes = []
+            for column, label in (('mp_per_second', 'MP/s'), ('output_bytes', '体积')):
+                old_value, new_value = float(old[column] or 0), float(row[column] or 0)
+                if old_value:
+                    changes.append(f"{label} {(new_value - old_value) / old_value * 100:+.1f}%")
+            print(f"  {row['corpus']} {row['source']} -> {row['target']}: {', '.join(changes)}")
+
+    return rows
+
+def run_conversion_pipeline(jobs, target_format, convert_options, workers=None,
+                            readers=DEFAULT_PIPELINE_READERS, queue_size=None):
+    """流水线方式转换，按完成顺序依次产出 (任务, 是否成功, 错误信息, 详情)
+
+    预读线程把源文件读入内存 -> 编码线程解码、处理并编码到内存 -> 写出线程原子写盘。
+    各阶段之间使用有界队列衔接，磁盘等待与编码计算相互重叠，内存中最多只保留
+    队列容量内的文件数据。Pillow在解码和编码时会释放GIL，编码线程可以并行执行。
+    """
+    workers = workers or os.cpu_count() or 1
+    queue_size = queue_size or workers * 2
+
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+    read_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    result_queue = queue.Queue()
+
+    def read_stage():
+        while True:
+            try:
+                job = job_queue.get_nowait()
+            except queue.Empty:
+                return
+            start = time.perf_counter()
+            try:
+                with open_job_source(job) as f:
+                    data = f.read()
+            except Exception as e:
+                read_queue.put((job, None, f"读取失败: {e}", 0.0))
+                continue
+            read_queue.put((job, data, None, time.perf_counter() - start))
+
+    def encode_stage():
+        while True:
+            item = read_queue.get()
+            if item is None:
+                write_queue.put(None)
+                return
+            job, data, error_msg, read_time = item
+            success, info, buffers = False, {'timings': {'read': read_time}}, []
+            if data is not None:
+                success, error_msg = convert_image(io.BytesIO(data), job['output_path'], target_format,
+                                                   info=info, buffers=buffers, **convert_options)
+            write_queue.put((job, success, error_msg, info, buffers))
+
+    def write_stage():
+        finished = 0
+        while finished < workers:
+            item = write_queue.get()
+            if item is None:
+                finished += 1
+                continue
+            job, success, error_msg, info, buffers = item
+            if success:
+                start = time.perf_counter()
+                try:
+                    for output_path, data in buffers:
+                        with atomic_output(output_path) as fp:
+                            fp.write(data)
+                except OSError as e:
+                    success, error_msg = False, f"写出失败: {e}"
+                info['timings']['write'] = info['timings'].get('write', 0.0) + time.perf_counter() - start
+            result_queue.put((job, success, error_msg, info))
+        result_queue.put(None)
+
+    reader_threads = [threading.Thread(target=read_stage, daemon=True) for _ in range(readers)]
+    threads = reader_threads + [threading.Thread(target=encode_stage, daemon=True) for _ in range(workers)]
+    threads.append(threading.Thread(target=write_stage, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    def close_read_stage():
+        # 所有预读线程结束后，通知每个编码线程退出
+        for thread in reader_threads:
+            thread.join()
+        for _ in range(workers):
+            read_queue.put(None)
+
+    threading.Thread(target=close_read_stage, daemon=True).start()
+
+    while True:
+        item = result_queue.get()
+        if item is None:
+            return
+        yield item
+
+def collect_jobs(input_folder, files, output_folder, target_format, stack, prefilter=True, max_pixels=None):
+    """将输入文件整理为转换任务并生成输出路径，返回 (任务列表, 被跳过的文件列表)
+
+    压缩包展开为其中的成员（由stack负责关闭），prefilter 为 False 时只按扩展名筛选
+    """
+    sources, rejected = collect_sources(input_folder, files, stack)
+    if prefilter:
+        jobs, prefilter_rejected = prefilter_images(sources, max_pixels)
+    else:
+        jobs, prefilter_rejected = collect_jobs_by_extension(sources)
+    rejected += prefilter_rejected
+
+    _, target_extension = SUPPORTED_FORMATS[target_format]
+    for job in jobs:
+        job['output_path'] = os.path.join(output_folder, f"{job['output_name']}{target_extension}")
+        if 'member' in job:
+            os.makedirs(os.path.dirname(job['output_path']), exist_ok=True)
+    return jobs, rejected
+
+def should_passthrough(job, target_format, max_bytes=None, palette=None):
+    """源格式与目标格式相同时直通而不重新编码
+
+    调色板输出，以及体积上限模式下超出上限的同格式文件仍需要重新编码
+    """
+    if not is_same_format(job['format'], target_format):
+        return False
+    if palette and job['format'] in QUANTIZE_FORMATS:
+        return False
+    return not (max_bytes and get_source_size(job) > max_bytes)
+
+def passthrough_job(job, passthrough=DEFAULT_PASSTHROUGH):
+    """将任务的源文件直通到输出位置，返回使用的方式"""
+    if 'member' in job:
+        copy_member(job, job['output_path'])
+        return 'stream'
+    return passthrough_file(job['path'], job['output_path'], passthrough)
+
+def convert_job(job, target_format, convert_options):
+    """转换单个任务，返回 (是否成功, 错误信息, 详情)，详情的内容见 convert_image"""
+    info = {}
+    try:
+        with open_job_source(job) as fp:
+            success, error_msg = convert_image(fp, job['output_path'], target_format,
+                                               info=info, **convert_options)
+    except Exception as e:
+        success, error_msg = False, f"读取失败: {e}"
+    return success, error_msg, info
+
+def describe_conversion(info):
+    """生成转换成功时的附加说明：体积上限的搜索结果、调色板或帧数"""
+    if 'budget_met' in info:
+        if 'quality' in info:
+            detail = f"质量 {info['quality']}"
+        elif info.get('colors'):
+            detail = f"调色板 {info['colors']} 色"
+        else:
+            detail = "原样编码"
+        detail += f", {format_size(info['output_bytes'])}"
+        if not info['budget_met']:
+            detail += "，超出体积上限"
+        return f" ({detail})"
+    if 'palette_colors' in info:
+        lossless = "，无损" if info['palette_lossless'] else ""
+        return f" (调色板 {info['palette_colors']} 色{lossless})"
+    if info.get('frames', 1) > 1:
+        return f" ({info['frames']} 帧，输出 {len(info['outputs'])} 个文件)"
+    return ""
+
+def make_timing_record(job, success, info, method=None):
+    """生成单张图片的耗时记录：各阶段耗时(秒)、输入输出字节数、百万像素数与体积上限的搜索结果"""
+    timings = info.get('timings', {})
+    width, height = info.get('size') or (job.get('width', 0), job.get('height', 0))
+    try:
+        input_bytes = get_source_size(job)
+    except OSError:
+        input_bytes = 0
+    output_bytes = 0
+    for path in info.get('outputs', []) if success else []:
+        try:
+            output_bytes += os.path.getsize(path)
+        except OSError:
+            pass
+
+    record = {
+        'name': job['name'],
+        'status': ('passthrough' if method else 'converted') if success else 'failed',
+        'input_bytes': input_bytes,
+        'output_bytes': output_bytes,
+        'megapixels': round(width * height / 1e6, 3),
+        'quality': info.get('quality'),
+        'colors': info.get('colors'),
+        'budget_met': info.get('budget_met'),
+    }
+    for stage in TIMING_STAGES:
+        record[stage] = round(timings.get(stage, 0.0), 6)
+    record['total'] = round(sum(timings.get(stage, 0.0) for stage in TIMING_STAGES), 6)
+    return record
+
+def percentile(values, percent):
+    """按最近秩法计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+def summarize_timings(records, wall_time, top=DEFAULT_REPORT_TOP):
+    """汇总耗时记录：吞吐量(MP/s)、各阶段百分位耗时与最慢的文件"""
+    converted = [record for record in records if record['status'] == 'converted']
+    megapixels = sum(record['megapixels'] for record in converted)
+    busy_time = sum(record['total'] for record in converted)
+    return {
+        'images': len(converted),
+        'megapixels': round(megapixels, 3),
+        'wall_time': round(wall_time, 3),
+        'mp_per_second': round(megapixels / wall_time, 3) if wall_time else 0.0,
+        'mp_per_busy_second': round(megapixels / busy_time, 3) if busy_time else 0.0,
+        'input_bytes': sum(record['input_bytes'] for record in converted),
+        'output_bytes': sum(record['output_bytes'] for record in converted),
+        'stages': {
+            stage: {f"p{percent}": percentile([record[stage] for record in converted], percent)
+                    for percent in TIMING_PERCENTILES}
+            for stage in TIMING_STAGES + ('total',)
+        },
+        'slowest': [{'name': record['name'], 'total': record['total'], 'megapixels': record['megapixels']}
+                    for record in sorted(converted, key=lambda record: record['total'], reverse=True)[:top]],
+    }
+
+def get_summary_report_path(report_path):
+    """CSV耗时报告对应的汇总文件路径：<报告名>.summary.csv"""
+    return os.path.splitext(report_path)[0] + '.summary.csv'
+
+def flatten_summary(summary):
+    """将汇总展开为 (指标, 值) 行，各阶段百分位记为 <阶段>_p50，最慢的文件记为 slowest_<名次>_<字段>"""
+    for key, value in summary.items():
+        if key == 'stages':
+            for stage, values in value.items():
+                for name, seconds in values.items():
+                    yield f"{stage}_{name}", seconds
+        elif key == 'slowest':
+            for rank, record in enumerate(value, 1):
+                for name, item in record.items():
+                    yield f"slowest_{rank}_{name}", item
+        else:
+            yield key, value
+
+def write_csv_rows(path, header, rows):
+    """原子写出带BOM的UTF-8 CSV（便于Excel直接打开）"""
+    with atomic_output(path) as fp:
+        text = io.TextIOWrapper(fp, encoding='utf-8-sig', newline='')
+        writer = csv.writer(text)
+        writer.writerow(header)
+        writer.writerows(rows)
+        text.flush()
+        text.detach()
+
+def write_timing_report(report_path, records, summary):
+    """写出耗时报告，返回写出的文件列表
+
+    .json 包含逐张记录与汇总；其他扩展名将逐张记录写为CSV，
+    汇总另写入 <报告名>.summary.csv（见 flatten_summary）
+    """
+    folder = os.path.dirname(os.path.abspath(report_path))
+    os.makedirs(folder, exist_ok=True)
+    if report_path.lower().endswith('.json'):
+        with atomic_output(report_path) as fp:
+            fp.write(json.dumps({'summary': summary, 'images': records}, ensure_ascii=False, indent=2)
+                     .encode('utf-8'))
+        return [report_path]
+
+    write_csv_rows(report_path, TIMING_REPORT_FIELDS,
+                   ([record.get(field) for field in TIMING_REPORT_FIELDS] for record in records))
+    summary_path = get_summary_report_path(report_path)
+    write_csv_rows(summary_path, ('metric', 'value'), flatten_summary(summary))
+    return [report_path, summary_path]
+
+def print_timing_summary(summary):
+    """打印耗时汇总"""
+    print(f"吞吐量: {summary['megapixels']} MP / {summary['wall_time']} 秒 = {summary['mp_per_second']} MP/s"
+          f" (按单张累计耗时 {summary['mp_per_busy_second']} MP/s)")
+    print("各阶段耗时(毫秒)  " + "  ".join(f"p{percent}" for percent in TIMING_PERCENTILES))
+    for stage, values in summary['stages'].items():
+        print(f"  {stage:<8} " + "  ".join(f"{values[f'p{percent}'] * 1000:.1f}"
+                                          for percent in TIMING_PERCENTILES))
+    if summary['slowest']:
+        print("最慢的文件:")
+        for record in summary['slowest']:
+            print(f"  {record['name']}: {record['total'] * 1000:.1f} 毫秒 ({record['megapixels']} MP)")
+
+def process_images(input_folder, output_folder, target_format, preset=DEFAULT_PRESET,
+                   background=DEFAULT_BACKGROUND, large_image=False,
+                   memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, max_pixels=None, multi_frame=True,
+                   passthrough=DEFAULT_PASSTHROUGH, prefilter=True,
+                   pipeline=False, workers=None, readers=DEFAULT_PIPELINE_READERS,
+                   dedup=None, near_duplicates=False, max_bytes=None,
+                   palette=None, dither=False, quantizer=DEFAULT_QUANTIZER,
+                   on_image=None, report=None, report_top=DEFAULT_REPORT_TOP):
+    """批量处理图片
+
+    on_image 为回调函数时，每处理完一张图片都会以耗时记录（见 make_timing_record）调用它；
+    report 为报告文件路径时，写出逐张耗时与汇总（见 write_timing_report）
+    """
     processed_count = 0
+    passthrough_count = 0
+    deduplicated_count = 0
+    over_budget_count = 0
+    input_bytes = 0
+    output_bytes = 0
     skipped_count = 0
     error_count = 0
     
@@ -171,7 +1957,34 @@ def process_images(input_folder, output_folder, target_format):
     print(f"输入文件夹: {input_folder}")
     print(f"输出文件夹: {output_folder}")
     print(f"目标格式: {target_format}")
+    print(f"编码预设: {preset}")
+    if large_image:
+        print(f"大图模式: 内存预算 {memory_budget_mb}MB" + (f"，像素上限 {max_pixels}" if max_pixels else ""))
+        if pipeline:
+            print("大图模式按条带读写文件，不使用流水线模式")
+            pipeline = False
+    if palette:
+        print(f"调色板输出: {palette} 色，量化器 {quantizer}，{'抖动' if dither else '不抖动'}"
+              f"（仅PNG/WEBP）")
+        if quantizer == 'libimagequant' and not features.check_feature('libimagequant'):
+            print("当前Pillow未启用libimagequant，请选择其他量化器")
+            return False, 0, 0, 0
+    if max_bytes:
+        print(f"体积上限: {format_size(max_bytes)}")
+    if dedup:
+        print(f"重复输入: 相同内容只转换一次，其余{'硬链接' if dedup == 'hardlink' else '复制'}转换结果")
+    if pipeline:
+        print(f"流水线模式: 预读线程 {readers} 个，编码线程 {workers or os.cpu_count() or 1} 个")
     print("-" * 50)
+    batch_start = time.perf_counter()
+    records = []
+    
+    def record_result(job, success, info, method=None):
+        record = make_timing_record(job, success, info, method)
+        records.append(record)
+        if on_image:
+            on_image(record)
+        return record
     
     # 获取输入文件夹中的所有文件
     try:
@@ -184,58 +1997,297 @@ def process_images(input_folder, output_folder, target_format):
         print("输入文件夹中没有找到任何文件！")
         return False, 0, 0, 0
     
-    _, target_extension = SUPPORTED_FORMATS[target_format]
-    
-    for i, filename in enumerate(files, 1):
-        input_path = os.path.join(input_folder, filename)
+    with contextlib.ExitStack() as archives:
+        if large_image:
+            # 大图模式自行检查像素上限，本批次（含预检与去重）不使用Pillow的解压炸弹保护
+            archives.enter_context(unlimited_pixels())
         
-        # 获取文件扩展名（不含点）
-        file_ext = os.path.splitext(filename)[1].lower().lstrip('.')
+        # 压缩包展开为其中的成员直接读取；预检识别真实格式并剔除无法转换的文件
+        jobs, rejected = collect_jobs(input_folder, files, output_folder, target_format, archives,
+                                      prefilter, max_pixels)
         
-        # 检查是否为支持的图片格式
-        if not file_ext or file_ext not in SUPPORTED_FORMATS:
-            print(f"[{i}/{len(files)}] 跳过不支持的文件: {filename}")
+        for filename, reason in rejected:
+            print(f"跳过: {filename} ({reason})")
             skipped_count += 1
-            continue
         
-        # 生成输出文件名
-        name_without_ext = os.path.splitext(filename)[0]
-        output_filename = f"{name_without_ext}{target_extension}"
-        output_path = os.path.join(output_folder, output_filename)
+        total = len(jobs)
+        if dedup:
+            jobs = find_duplicates(jobs)
         
-        # 显示进度
-        print(f"[{i}/{len(files)}] 处理: {filename}", end="")
+        if near_duplicates:
+            pairs = find_near_duplicates(jobs)
+            print(f"近似重复检测: 发现 {len(pairs)} 对")
+            for job_a, job_b, distance in pairs:
+                print(f"  {job_a['name']} ≈ {job_b['name']} (差异 {distance}/{DHASH_SIZE * DHASH_SIZE})")
         
-        # 如果源格式与目标格式相同，直接复制
-        if file_ext == target_format:
-            try:
-                shutil.copy2(input_path, output_path)
-                print(f" -> 复制 (格式相同)")
-                skipped_count += 1
-            except Exception as e:
-                print(f" -> 复制失败: {e}")
+        convert_options = {
+            'preset': preset,
+            'background': background,
+            'large_image': large_image,
+            'memory_budget_mb': memory_budget_mb,
+            'max_pixels': max_pixels,
+            'multi_frame': multi_frame,
+            'max_bytes': max_bytes,
+            'palette': palette,
+            'dither': dither,
+            'quantizer': quantizer,
+        }
+        
+        def describe_result(record, success, error_msg, info):
+            nonlocal processed_count, error_count, over_budget_count, input_bytes, output_bytes
+            if not success:
                 error_count += 1
-            continue
+                return f" -> 转换失败: {error_msg}"
+            processed_count += 1
+            # 统计转换前后的体积变化
+            input_bytes += record['input_bytes']
+            output_bytes += record['output_bytes']
+            if info.get('budget_met') is False:
+                over_budget_count += 1
+            return f" -> 转换成功{describe_conversion(info)}"
         
-        # 转换图片
-        success, error_msg = convert_image(input_path, output_path, target_format)
+        def finish_duplicates(job, outputs):
+            # 主任务完成后为内容相同的任务生成输出，outputs为None表示主任务失败
+            nonlocal done, deduplicated_count, error_count
+            for duplicate in job.get('duplicates', ()):
+                done += 1
+                print(f"[{done}/{total}] 处理: {duplicate['name']}", end="")
+                if outputs is None:
+                    print(f" -> 转换失败: 与 {job['name']} 内容相同，其转换失败")
+                    error_count += 1
+                    continue
+                try:
+                    materialize_duplicate(job, duplicate, outputs, dedup)
+                    print(f" -> 与 {job['name']} 内容相同 ({'硬链接' if dedup == 'hardlink' else '复制'})")
+                    deduplicated_count += 1
+                except Exception as e:
+                    print(f" -> 复制失败: {e}")
+                    error_count += 1
+        
+        done = 0
+        pipeline_jobs = []
+        for job in jobs:
+            # 如果源格式与目标格式相同，直通到输出位置而不重新编码
+            if should_passthrough(job, target_format, max_bytes, palette):
+                done += 1
+                print(f"[{done}/{total}] 处理: {job['name']}", end="")
+                try:
+                    start = time.perf_counter()
+                    method = passthrough_job(job, passthrough)
+                    record_result(job, True, {'timings': {'write': time.perf_counter() - start},
+                                              'outputs': [job['output_path']]}, method)
+                    print(f" -> 直通 (格式相同, {method})")
+                    passthrough_count += 1
+                    outputs = [job['output_path']]
+                except Exception as e:
+                    print(f" -> 复制失败: {e}")
+                    error_count += 1
+                    outputs = None
+                finish_duplicates(job, outputs)
+                continue
+        
+            if pipeline:
+                pipeline_jobs.append(job)
+                continue
+        
+            # 显示进度
+            done += 1
+            print(f"[{done}/{total}] 处理: {job['name']}", end="")
+        
+            # 转换图片
+            success, error_msg, info = convert_job(job, target_format, convert_options)
+            record = record_result(job, success, info)
+            print(describe_result(record, success, error_msg, info))
+            finish_duplicates(job, info['outputs'] if success else None)
+        
+        # 流水线模式下按完成顺序输出结果
+        for job, success, error_msg, info in run_conversion_pipeline(pipeline_jobs, target_format, convert_options,
+                                                                     workers, readers):
+            done += 1
+            record = record_result(job, success, info)
+            print(f"[{done}/{total}] 处理: {job['name']}{describe_result(record, success, error_msg, info)}")
+            finish_duplicates(job, info['outputs'] if success else None)
         
-        if success:
-            print(f" -> 转换成功")
-            processed_count += 1
-        else:
-            print(f" -> 转换失败: {error_msg}")
-            error_count += 1
-    
     # 输出统计信息
     print("-" * 50)
     print(f"处理完成！")
     print(f"成功转换: {processed_count} 张")
+    if input_bytes:
+        change = (output_bytes - input_bytes) / input_bytes * 100
+        print(f"转换体积: {format_size(input_bytes)} -> {format_size(output_bytes)} ({change:+.1f}%)")
+    print(f"直通复制: {passthrough_count} 张")
+    if max_bytes:
+        print(f"超出体积上限: {over_budget_count} 张")
+    if dedup:
+        print(f"重复输入: {deduplicated_count} 张 (省去 {deduplicated_count} 次转换)")
     print(f"跳过处理: {skipped_count} 张")
     print(f"转换失败: {error_count} 张")
     print(f"输出文件夹: {output_folder}")
     
-    return True, processed_count, skipped_count, error_count
+    if report:
+        summary = summarize_timings(records, time.perf_counter() - batch_start, report_top)
+        print("-" * 50)
+        print_timing_summary(summary)
+        try:
+            written = write_timing_report(report, records, summary)
+            print(f"耗时报告: {', '.join(written)}")
+        except OSError as e:
+            print(f"无法写出耗时报告: {e}")
+    
+    # 直通和去重的文件同样已成功输出，计入处理数量
+    return True, processed_count + passthrough_count + deduplicated_count, skipped_count, error_count
+
+def convert_input_file(input_folder, filename, output_folder, target_format,
+                       passthrough=DEFAULT_PASSTHROUGH, prefilter=True, convert_options=None):
+    """转换输入文件夹中的单个文件（压缩包则转换其中的全部图片）
+
+    返回 (是否全部成功, 结果说明列表)；没有可转换的图片时结果为None
+    """
+    convert_options = convert_options or {}
+    messages = []
+    all_success = True
+
+    with contextlib.ExitStack() as archives:
+        if convert_options.get('large_image'):
+            archives.enter_context(unlimited_pixels())
+        jobs, rejected = collect_jobs(input_folder, [filename], output_folder, target_format, archives,
+                                      prefilter, convert_options.get('max_pixels'))
+        for name, reason in rejected:
+            messages.append(f"跳过: {name} ({reason})")
+
+        for job in jobs:
+            if should_passthrough(job, target_format, convert_options.get('max_bytes'),
+                                  convert_options.get('palette')):
+                try:
+                    method = passthrough_job(job, passthrough)
+                    messages.append(f"{job['name']} -> 直通 (格式相同, {method})")
+                except Exception as e:
+                    messages.append(f"{job['name']} -> 复制失败: {e}")
+                    all_success = False
+                continue
+
+            success, error_msg, info = convert_job(job, target_format, convert_options)
+            if success:
+                messages.append(f"{job['name']} -> 转换成功{describe_conversion(info)}")
+            else:
+                messages.append(f"{job['name']} -> 转换失败: {error_msg}")
+                all_success = False
+
+    return (all_success if jobs else None), messages
+
+def watch_folder(input_folder, output_folder, target_format, interval=DEFAULT_WATCH_INTERVAL,
+                 settle_time=DEFAULT_SETTLE_TIME, after='keep', processed_folder=None, workers=None,
+                 passthrough=DEFAULT_PASSTHROUGH, prefilter=True, **convert_options):
+    """监视输入文件夹，自动转换新放入的文件，按 Ctrl+C 停止
+
+    文件的大小和修改时间在 settle_time 秒内保持不变才视为写入完成；
+    转换在有界的线程池中进行，等待中的任务不超过线程数的两倍。
+    转换成功后按 after 保留源文件、移动到 processed_folder 或删除。
+    convert_options 为 convert_image 的转换参数。
+    """
+    workers = workers or os.cpu_count() or 1
+    if after == 'move':
+        processed_folder = processed_folder or os.path.join(os.path.dirname(os.path.abspath(input_folder)),
+                                                            "processed_images")
+        os.makedirs(processed_folder, exist_ok=True)
+
+    print(f"\n开始监视文件夹...")
+    print(f"输入文件夹: {input_folder}")
+    print(f"输出文件夹: {output_folder}")
+    print(f"目标格式: {target_format}")
+    print(f"转换线程: {workers} 个，文件保持 {settle_time:g} 秒不变后开始转换")
+    if after == 'move':
+        print(f"转换成功后移动源文件到: {processed_folder}")
+    elif after == 'delete':
+        print("转换成功后删除源文件")
+    print("按 Ctrl+C 停止监视")
+    print("-" * 50)
+
+    candidates = {}  # 文件名 -> (大小与修改时间, 首次观察到该状态的时间)
+    finished = {}    # 已处理的文件名 -> 处理时的大小与修改时间，保留源文件时避免重复转换
+    pending = {}     # 进行中的任务 -> (文件名, 大小与修改时间)
+    counts = {'success': 0, 'failed': 0, 'skipped': 0}
+
+    def collect(future):
+        filename, signature = pending.pop(future)
+        finished[filename] = signature
+        try:
+            success, messages = future.result()
+        except Exception as e:
+            success, messages = False, [f"{filename} -> 转换失败: {e}"]
+        for message in messages:
+            print(f"[{time.strftime('%H:%M:%S')}] {message}")
+        counts[{True: 'success', False: 'failed', None: 'skipped'}[success]] += 1
+        if not success:
+            return
+        source_path = os.path.join(input_folder, filename)
+        try:
+            if after == 'move':
+                shutil.move(source_path, os.path.join(processed_folder, filename))
+            elif after == 'delete':
+                os.remove(source_path)
+        except OSError as e:
+            print(f"[{time.strftime('%H:%M:%S')}] 无法{'移动' if after == 'move' else '删除'}源文件 {filename}: {e}")
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        try:
+            while True:
+                for future in [future for future in pending if future.done()]:
+                    collect(future)
+
+                try:
+                    names = os.listdir(input_folder)
+                except OSError as e:
+                    print(f"无法读取输入文件夹: {e}")
+                    time.sleep(interval)
+                    continue
+
+                now = time.monotonic()
+                in_progress = {filename for filename, _ in pending.values()}
+                present = set()
+                for filename in sorted(names):
+                    # 忽略隐藏文件（包括正在写入的临时文件）
+                    if filename.startswith('.'):
+                        continue
+                    try:
+                        stat_result = os.stat(os.path.join(input_folder, filename))
+                    except OSError:
+                        continue
+                    if not stat.S_ISREG(stat_result.st_mode):
+                        continue
+                    present.add(filename)
+                    signature = (stat_result.st_size, stat_result.st_mtime_ns)
+                    if filename in in_progress or finished.get(filename) == signature:
+                        continue
+
+                    # 状态变化后重新计时，保持不变足够久才提交转换
+                    previous = candidates.get(filename)
+                    if previous is None or previous[0] != signature:
+                        candidates[filename] = (signature, now)
+                        continue
+                    if now - previous[1] < settle_time or len(pending) >= workers * 2:
+                        continue
+                    del candidates[filename]
+                    future = executor.submit(convert_input_file, input_folder, filename, output_folder,
+                                             target_format, passthrough, prefilter, convert_options)
+                    pending[future] = (filename, signature)
+
+                # 清理已不存在的文件记录
+                for records in (candidates, finished):
+                    for filename in [filename for filename in records if filename not in present]:
+                        del records[filename]
+
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n停止监视，等待进行中的转换完成...")
+            for future in list(pending):
+                future.exception()
+                collect(future)
+
+    print("-" * 50)
+    print(f"监视结束：成功 {counts['success']} 个文件，失败 {counts['failed']} 个文件，"
+          f"跳过 {counts['skipped']} 个文件")
+    return counts['success'], counts['failed']
 
 def ask_continue():
     """询问用户是否继续转换"""
@@ -274,8 +2326,159 @@ def change_folders():
         else:
             print("请输入 Y(是) 或 N(否)")
 
+def add_conversion_arguments(parser):
+    """添加转换相关的命令行参数"""
+    parser.add_argument('-f', '--format', required=True, choices=sorted(SUPPORTED_FORMATS),
+                        help='目标格式')
+    parser.add_argument('-p', '--preset', default=DEFAULT_PRESET, choices=list(ENCODER_PRESETS),
+                        help=f'编码预设 (默认{DEFAULT_PRESET})')
+    parser.add_argument('--background', default=DEFAULT_BACKGROUND, type=parse_background,
+                        help='透明区域的背景色，如 #ffffff (默认白色)')
+    parser.add_argument('--passthrough', default=DEFAULT_PASSTHROUGH, choices=PASSTHROUGH_MODES,
+                        help=f'源格式与目标格式相同时的直通方式 (默认{DEFAULT_PASSTHROUGH})')
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help='不预检文件内容，只按扩展名筛选输入文件')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='流水线模式：预读、编码、写出并行进行，输出经临时文件原子写入')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='流水线模式的编码线程数 (默认等于CPU核数)')
+    parser.add_argument('--readers', type=int, default=DEFAULT_PIPELINE_READERS,
+                        help=f'流水线模式的预读线程数 (默认{DEFAULT_PIPELINE_READERS})')
+    parser.add_argument('--max-bytes', type=parse_size, default=None,
+                        help='单张图片的体积上限，如 150KB：JPG/WEBP自动搜索质量，PNG自动选择调色板大小')
+    parser.add_argument('--palette', type=int, default=None, choices=range(2, 257), metavar='2-256',
+                        help='PNG/WEBP输出为调色板图片的颜色数；颜色数不超过该值的图片无损转换')
+    parser.add_argument('--dither', action='store_true',
+                        help='调色板量化时使用Floyd-Steinberg抖动 (仅不透明图片)')
+    parser.add_argument('--quantizer', default=DEFAULT_QUANTIZER, choices=list(QUANTIZERS),
+                        help=f'调色板量化器 (默认{DEFAULT_QUANTIZER})')
+    parser.add_argument('--dedup', default=None, choices=DEDUP_MODES,
+                        help='内容完全相同的输入只转换一次，其余输出使用硬链接或复制')
+    parser.add_argument('--near-duplicates', action='store_true',
+                        help='用感知哈希检测并报告内容近似的图片')
+    parser.add_argument('--report', default=None,
+                        help='写出逐张图片的各阶段耗时报告，扩展名为 .json 时同时包含汇总，'
+                             '否则为CSV并另写出汇总 <报告名>.summary.csv')
+    parser.add_argument('--report-top', type=int, default=DEFAULT_REPORT_TOP,
+                        help=f'报告中列出的最慢文件数量 (默认{DEFAULT_REPORT_TOP})')
+    parser.add_argument('--first-frame-only', action='store_true',
+                        help='多帧图片只转换第一帧 (默认转换所有帧)')
+    parser.add_argument('--large-image', action='store_true',
+                        help='大图模式：按条带读写TIFF，超出内存预算时提前失败')
+    parser.add_argument('--memory-budget', type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help=f'大图模式的单张图片内存预算，单位MB (默认{DEFAULT_MEMORY_BUDGET_MB})')
+    parser.add_argument('--max-pixels', type=int, default=None,
+                        help='大图模式允许的最大像素数 (默认不限制)')
+
+def get_conversion_options(args):
+    """从命令行参数中提取转换选项"""
+    return {
+        'preset': args.preset,
+        'background': args.background,
+        'large_image': args.large_image,
+        'memory_budget_mb': args.memory_budget,
+        'max_pixels': args.max_pixels,
+        'multi_frame': not args.first_frame_only,
+        'passthrough': args.passthrough,
+        'prefilter': not args.no_prefilter,
+        'pipeline': args.pipeline,
+        'workers': args.workers,
+        'readers': args.readers,
+        'dedup': args.dedup,
+        'max_bytes': args.max_bytes,
+        'palette': args.palette,
+        'dither': args.dither,
+        'quantizer': args.quantizer,
+        'report': args.report,
+        'report_top': args.report_top,
+        'near_duplicates': args.near_duplicates,
+    }
+
+def build_arg_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="图片格式批量转换工具（不带参数运行时进入交互模式）")
+    subparsers = parser.add_subparsers(dest='command')
+
+    convert_parser = subparsers.add_parser('convert', help='非交互方式批量转换文件夹中的图片')
+    convert_parser.add_argument('input_folder', help='输入文件夹')
+    convert_parser.add_argument('output_folder', help='输出文件夹')
+    add_conversion_arguments(convert_parser)
+
+    calibrate_parser = subparsers.add_parser('calibrate', help='在样本图片上对比各编码预设的耗时与体积')
+    calibrate_parser.add_argument('folder', help='样本图片文件夹')
+    calibrate_parser.add_argument('-f', '--format', required=True, choices=sorted(SUPPORTED_FORMATS),
+                                  help='目标格式')
+    calibrate_parser.add_argument('-n', '--sample-size', type=int, default=10,
+                                  help='最多抽取的样本数量 (默认10，0表示全部)')
+    calibrate_parser.add_argument('-p', '--preset', action='append', choices=list(ENCODER_PRESETS),
+                                  help='只测试指定预设，可重复指定 (默认测试全部)')
+
+    bench_parser = subparsers.add_parser('bench', help='用生成的测试图片集测量各格式之间的转换性能')
+    bench_parser.add_argument('--corpus-folder', default=DEFAULT_BENCH_FOLDER,
+                              help=f'测试图片的存放位置，已生成的图片会被复用 (默认{DEFAULT_BENCH_FOLDER})')
+    bench_parser.add_argument('-o', '--output', default=DEFAULT_BENCH_RESULTS,
+                              help=f'结果文件 (默认{DEFAULT_BENCH_RESULTS})')
+    bench_parser.add_argument('--corpus', action='append', choices=list(BENCH_CORPORA),
+                              help='只测试指定图片集，可重复指定 (默认全部)')
+    bench_parser.add_argument('--formats', nargs='+', default=list(BENCH_FORMATS), choices=BENCH_FORMATS,
+                              help='参与测试的源/目标格式 (默认全部)')
+    bench_parser.add_argument('-p', '--preset', default=DEFAULT_PRESET, choices=list(ENCODER_PRESETS),
+                              help=f'编码预设 (默认{DEFAULT_PRESET})')
+    bench_parser.add_argument('--compare', default=None,
+                              help='与之前的结果文件对比吞吐量和输出体积')
+
+    watch_parser = subparsers.add_parser('watch', help='监视文件夹，自动转换新放入的图片（无需交互）')
+    watch_parser.add_argument('input_folder', help='监视的输入文件夹')
+    watch_parser.add_argument('output_folder', help='输出文件夹')
+    add_conversion_arguments(watch_parser)
+    watch_parser.add_argument('--interval', type=float, default=DEFAULT_WATCH_INTERVAL,
+                              help=f'扫描间隔，单位秒 (默认{DEFAULT_WATCH_INTERVAL:g})')
+    watch_parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE_TIME,
+                              help=f'文件保持不变多少秒后视为写入完成 (默认{DEFAULT_SETTLE_TIME:g})')
+    watch_parser.add_argument('--after', default='keep', choices=WATCH_ACTIONS,
+                              help='转换成功后源文件的处理方式：保留、移动或删除 (默认keep)')
+    watch_parser.add_argument('--processed-folder', default=None,
+                              help='--after move 时源文件的去处 (默认与输入文件夹同级的 processed_images)')
+
+    return parser
+
+def run_command(argv):
+    """执行命令行子命令"""
+    args = build_arg_parser().parse_args(argv)
+
+    if args.command == 'convert':
+        os.makedirs(args.output_folder, exist_ok=True)
+        success, _, _, error_count = process_images(args.input_folder, args.output_folder, args.format,
+                                                    **get_conversion_options(args))
+        return 0 if success and not error_count else 1
+
+    if args.command == 'watch':
+        os.makedirs(args.output_folder, exist_ok=True)
+        options = get_conversion_options(args)
+        # 监视模式逐个文件转换，不使用批量模式的流水线与去重选项
+        for key in ('pipeline', 'readers', 'dedup', 'near_duplicates', 'report', 'report_top'):
+            options.pop(key)
+        _, failed = watch_folder(args.input_folder, args.output_folder, args.format, args.interval,
+                                 args.settle, args.after, args.processed_folder, **options)
+        return 0 if not failed else 1
+
+    if args.command == 'bench':
+        rows = run_benchmark(args.corpus_folder, args.output, args.corpus, args.formats, args.preset, args.compare)
+        return 0 if not any(row['failures'] for row in rows) else 1
+
+    if args.command == 'calibrate':
+        results = calibrate_presets(args.folder, args.format, args.sample_size, args.preset)
+        return 0 if results else 1
+
+    build_arg_parser().print_help()
+    return 1
+
 def main():
     """主函数"""
+    # 带参数运行时执行命令行子命令
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
+
     print("=" * 60)
     print("           图片格式批量转换工具")
     print("=" * 60)
@@ -311,10 +2514,14 @@ def main():
             
             # 获取目标格式
             target_format = get_target_format()
+            preset = get_encoder_preset()
+            background = DEFAULT_BACKGROUND
+            if SUPPORTED_FORMATS[target_format][0] in NO_ALPHA_MODES:
+                background = get_background_color()
             
             # 处理图片
             success, processed_count, skipped_count, error_count = process_images(
-                input_folder, output_folder, target_format)
+                input_folder, output_folder, target_format, preset, background)
             
             # 询问是否继续
             if not ask_continue():
@@ -2,17 +2,599 @@
 # 需要安装依赖: pip install python-docx
 
 import os
+import sys
 import json
 import re
+import io
+import gzip
+import html
+import hashlib
+import zipfile
+import posixpath
+import tempfile
+import argparse
+import concurrent.futures
+import xml.etree.ElementTree as ET
+from collections import namedtuple
 from docx import Document
 from pathlib import Path
 
+# 解析引擎: docx 使用 python-docx 构建完整对象树; stream 直接流式解析 word/document.xml
+ENGINES = ('docx', 'stream')
+
+# WordprocessingML 命名空间
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+OFFICE_DOCUMENT_REL = ('http://schemas.openxmlformats.org/officeDocument/2006/'
+                       'relationships/officeDocument')
+STYLES_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+WP_NS = 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing'
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+# 内嵌图片: 提取到输出目录下的资源文件夹，尺寸由EMU换算为CSS像素
+ASSETS_FOLDER = 'assets'
+EMU_PER_PIXEL = 9525
+MEDIA_COPY_CHUNK = 1024 * 1024
+
+# 段落对齐值(w:jc)到CSS对齐的映射，与python-docx的alignment_map结果一致
+JC_ALIGNMENT_MAP = {
+    'left': 'left',
+    'start': 'left',
+    'center': 'center',
+    'right': 'right',
+    'end': 'right',
+    'both': 'justify'
+}
+
+# 样式内联化模式: None 输出内联style; document 每个文档单独生成样式表; shared 所有文档共用一个样式表
+INTERN_MODES = (None, 'document', 'shared')
+SHARED_STYLES_CSS = 'word-inline-styles.css'
+STYLE_CLASS_PREFIX = 's-'
+STYLE_RULE_PATTERN = re.compile(r'^\.(' + STYLE_CLASS_PREFIX + r'[0-9a-f]+) \{ (.*) \}$')
+
+# JS分块输出时每块的默认大小(字符数)，按段落边界切分
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# 按标题拆分页面: 内置标题样式名(样式未设置大纲级别时使用)，以及无标题开头部分的锚点
+HEADING_STYLE_PATTERN = re.compile(r'^heading ([1-9])$', re.IGNORECASE)
+START_SECTION_ID = 'sec-start'
+
+# 搜索索引: CJK文字按相邻两字切分(单字成词时保留单字)，其他文字按单词切分并转为小写
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+SEARCH_TOKEN_PATTERN = re.compile(f'([{CJK_CHARS}]+)|((?:(?![{CJK_CHARS}])[^\\W_])+)')
+SEARCH_INDEX_SUFFIX = '.search.json'
+COMBINED_SEARCH_INDEX = 'word-search-index.json'
+
+# 增量转换: 输出目录中的清单文件，转换逻辑变化时需提高版本号使旧结果失效
+MANIFEST_FILENAME = 'word-manifest.json'
+CONVERTER_VERSION = '2.1'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 预压缩副本(.gz)的压缩级别，固定mtime使相同内容得到相同的压缩文件
+GZIP_LEVEL = 9
+
+# Word允许的最大字号(磅)，字号以半磅为单位，在此范围内预先计算CSS类名
+MAX_FONT_SIZE_PT = 1638
+
+# run的格式信息，两种解析引擎共用同一渲染逻辑；font_name为西文字体，east_asia_font为中日韩文字体
+RunFormat = namedtuple('RunFormat', 'font_size_pt bold italic underline color font_name east_asia_font',
+                       defaults=(None,))
+EMPTY_RUN_FORMAT = RunFormat(None, False, False, False, None, None)
+
+# 开关型属性: 在样式中设置为开时与上一级的结果取反(XOR)，直接格式设置绝对值
+TOGGLE_PROPERTIES = ('bold', 'italic')
+
+# 渲染后的段落: HTML、纯文本、标题级别(非标题为None)、锚点ID
+RenderedParagraph = namedtuple('RenderedParagraph', 'html text heading_level anchor')
+
+
+def w_tag(name):
+    """返回带WordprocessingML命名空间的标签名"""
+    return f'{{{W_NS}}}{name}'
+
+
+def w_attr(element, name):
+    """读取带命名空间的w:属性"""
+    return element.get(w_tag(name))
+
+
+def is_on(element):
+    """按ST_OnOff规则判断开关型属性(w:b/w:i)，元素不存在时返回None"""
+    if element is None:
+        return None
+    return w_attr(element, 'val') not in ('false', '0', 'off')
+
+
+def escape_template_literal(text):
+    """转义JS模板字符串中的反斜杠、反引号和${"""
+    return text.replace('\\', '\\\\').replace('`', '\\`').replace('${', '\\${')
+
+
+def minify_template(text):
+    """
+    压缩模板代码: 去掉每行缩进、空行和整行//注释后直接拼接
+    仅用于转换器自身的HTML/JS模板，模板中的语句均以分号或括号结尾
+    """
+    lines = (line.strip() for line in text.split('\n'))
+    return ''.join(line for line in lines if line and not line.startswith('//'))
+
+
+def to_js_string(text):
+    """
+    将文本转换为JSON格式的JS字符串字面量，可安全嵌入JS文件和<script>标签
+    """
+    literal = json.dumps(text, ensure_ascii=False)
+    return (literal.replace('</', '<\\/')
+            .replace('<!--', '<\\!--')
+            .replace('\u2028', '\\u2028')
+            .replace('\u2029', '\\u2029'))
+
+
+def tokenize_search_text(text):
+    """
+    将段落文本切分为搜索词，返回去重后的词集合
+    """
+    terms = set()
+    for cjk, word in SEARCH_TOKEN_PATTERN.findall(text):
+        if word:
+            terms.add(word.lower())
+        elif len(cjk) == 1:
+            terms.add(cjk)
+        else:
+            terms.update(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return terms
+
+
+def read_relationships(archive, part_name):
+    """
+    读取部件的关系文件，返回 {关系ID: (关系类型, 目标部件路径)}
+    """
+    folder, name = posixpath.split(part_name)
+    try:
+        root = ET.fromstring(archive.read(posixpath.join(folder, '_rels', name + '.rels')))
+    except KeyError:
+        return {}
+    
+    relationships = {}
+    for rel in root.iter(f'{{{REL_NS}}}Relationship'):
+        target = rel.get('Target', '')
+        if rel.get('TargetMode') != 'External':
+            if target.startswith('/'):
+                target = target.lstrip('/')
+            else:
+                target = posixpath.join(folder, target)
+            target = posixpath.normpath(target)
+        relationships[rel.get('Id')] = (rel.get('Type'), target)
+    return relationships
+
+
+def find_related_part(archive, part_name, rel_type, default):
+    """
+    按关系类型查找部件路径，找不到时返回默认路径
+    """
+    for found_type, target in read_relationships(archive, part_name).values():
+        if found_type == rel_type:
+            return target
+    return default
+
+
+def read_run_properties(rpr):
+    """
+    读取w:rPr中显式设置的格式，返回只包含已设置项的字典
+    """
+    props = {}
+    if rpr is None:
+        return props
+    
+    for name in ('bold', 'italic'):
+        element = rpr.find(w_tag('b' if name == 'bold' else 'i'))
+        if element is not None:
+            props[name] = is_on(element)
+    
+    u = rpr.find(w_tag('u'))
+    if u is not None:
+        props['underline'] = w_attr(u, 'val') not in (None, 'none')
+    
+    sz = rpr.find(w_tag('sz'))
+    if sz is not None:
+        try:
+            # w:sz 以半磅为单位
+            props['font_size_pt'] = float(w_attr(sz, 'val')) / 2 or None
+        except (TypeError, ValueError):
+            pass
+    
+    color = rpr.find(w_tag('color'))
+    if color is not None:
+        value = w_attr(color, 'val')
+        props['color'] = value.lower() if value and value.lower() != 'auto' else None
+    
+    # 西文字体和中日韩文字体分别继承
+    fonts = rpr.find(w_tag('rFonts'))
+    if fonts is not None:
+        if w_attr(fonts, 'ascii'):
+            props['font_name'] = w_attr(fonts, 'ascii')
+        if w_attr(fonts, 'eastAsia'):
+            props['east_asia_font'] = w_attr(fonts, 'eastAsia')
+    
+    return props
+
+
+class StyleResolver:
+    """
+    按 文档默认格式 → 段落样式 → 字符样式 → 直接格式 的顺序解析run的最终格式
+    粗体/斜体为开关型属性: 段落样式和字符样式中设置为开时依次取反，直接格式设置最终值
+    结果按(段落样式ID, 字符样式ID, 直接格式指纹)缓存，每种组合每个文档只计算一次
+    """
+    
+    def __init__(self, styles_root=None):
+        self.styles = {}
+        self.default_paragraph_style = None
+        self.default_run_props = {}
+        self.default_alignment = None
+        self.chain_cache = {}
+        self.format_cache = {}
+        
+        if styles_root is None:
+            return
+        
+        doc_defaults = styles_root.find(w_tag('docDefaults'))
+        if doc_defaults is not None:
+            self.default_run_props = read_run_properties(
+                doc_defaults.find(f"{w_tag('rPrDefault')}/{w_tag('rPr')}"))
+            self.default_alignment = self.read_alignment(
+                doc_defaults.find(f"{w_tag('pPrDefault')}/{w_tag('pPr')}"))
+        
+        for style in styles_root.iterfind(w_tag('style')):
+            style_id = w_attr(style, 'styleId')
+            style_type = w_attr(style, 'type')
+            based_on = style.find(w_tag('basedOn'))
+            outline_level = self.read_outline_level(style.find(w_tag('pPr')))
+            name = style.find(w_tag('name'))
+            if outline_level is None and name is not None:
+                match = HEADING_STYLE_PATTERN.match(w_attr(name, 'val') or '')
+                if match:
+                    outline_level = int(match.group(1))
+            self.styles[style_id] = (
+                w_attr(based_on, 'val') if based_on is not None else None,
+                read_run_properties(style.find(w_tag('rPr'))),
+                self.read_alignment(style.find(w_tag('pPr'))),
+                outline_level
+            )
+            if style_type == 'paragraph' and w_attr(style, 'default') in ('1', 'true', 'on'):
+                self.default_paragraph_style = style_id
+
+    def read_alignment(self, ppr):
+        """读取w:pPr中的对齐方式，未设置时返回None"""
+        if ppr is None:
+            return None
+        jc = ppr.find(w_tag('jc'))
+        if jc is None:
+            return None
+        return JC_ALIGNMENT_MAP.get(w_attr(jc, 'val'), 'left')
+
+    def read_outline_level(self, ppr):
+        """读取w:pPr中的大纲级别，返回1-9级，0表示正文，未设置时返回None"""
+        if ppr is None:
+            return None
+        outline = ppr.find(w_tag('outlineLvl'))
+        if outline is None:
+            return None
+        try:
+            level = int(w_attr(outline, 'val'))
+        except (TypeError, ValueError):
+            return None
+        return level + 1 if 0 <= level < 9 else 0
+
+    def style_chain(self, style_id):
+        """
+        合并样式及其basedOn继承链，返回(run格式, 对齐方式, 大纲级别)
+        """
+        if style_id in self.chain_cache:
+            return self.chain_cache[style_id]
+        
+        chain = []
+        seen = set()
+        current_id = style_id
+        while current_id in self.styles and current_id not in seen:
+            seen.add(current_id)
+            chain.append(self.styles[current_id])
+            current_id = chain[-1][0]
+        
+        props = {}
+        alignment = None
+        outline_level = None
+        for _, style_props, style_alignment, style_outline_level in reversed(chain):
+            props.update(style_props)
+            if style_alignment is not None:
+                alignment = style_alignment
+            if style_outline_level is not None:
+                outline_level = style_outline_level
+        
+        result = (props, alignment, outline_level)
+        self.chain_cache[style_id] = result
+        return result
+
+    def paragraph_style_id(self, paragraph):
+        """返回段落的样式ID，未指定时使用默认段落样式"""
+        pstyle = paragraph.find(f"{w_tag('pPr')}/{w_tag('pStyle')}")
+        if pstyle is not None:
+            return w_attr(pstyle, 'val')
+        return self.default_paragraph_style
+
+    def paragraph_alignment(self, paragraph):
+        """
+        解析段落的最终对齐方式
+        """
+        alignment = self.read_alignment(paragraph.find(w_tag('pPr')))
+        if alignment is None:
+            alignment = self.style_chain(self.paragraph_style_id(paragraph))[1]
+        if alignment is None:
+            alignment = self.default_alignment
+        return alignment or 'left'
+
+    def heading_level(self, paragraph, paragraph_style_id):
+        """
+        返回段落的标题级别(1-9)，正文段落返回None
+        """
+        level = self.read_outline_level(paragraph.find(w_tag('pPr')))
+        if level is None:
+            level = self.style_chain(paragraph_style_id)[2]
+        return level or None
+
+    @staticmethod
+    def make_format(props):
+        """由属性字典生成RunFormat"""
+        return RunFormat(props.get('font_size_pt'), bool(props.get('bold')),
+                         bool(props.get('italic')), bool(props.get('underline')),
+                         props.get('color'), props.get('font_name'), props.get('east_asia_font'))
+
+    def default_format(self):
+        """文档默认格式(docDefaults)，输出时设置在内容容器上"""
+        return self.make_format(self.default_run_props)
+
+    def resolve_run(self, paragraph_style_id, run):
+        """
+        解析run的最终格式
+        """
+        rpr = run.find(w_tag('rPr'))
+        rstyle = rpr.find(w_tag('rStyle')) if rpr is not None else None
+        run_style_id = w_attr(rstyle, 'val') if rstyle is not None else None
+        direct = read_run_properties(rpr)
+        
+        key = (paragraph_style_id, run_style_id, tuple(sorted(direct.items())))
+        run_format = self.format_cache.get(key)
+        if run_format is None:
+            props = dict(self.default_run_props)
+            for style_id in (paragraph_style_id, run_style_id):
+                for name, value in self.style_chain(style_id)[0].items():
+                    if name in TOGGLE_PROPERTIES:
+                        props[name] = bool(props.get(name)) != bool(value)
+                    else:
+                        props[name] = value
+            props.update(direct)
+            run_format = self.make_format(props)
+            self.format_cache[key] = run_format
+        return run_format
+
+
+def load_style_resolver(archive, part_name):
+    """
+    读取文档部件关联的样式部件并构建样式解析器，文档没有样式部件时只使用内置默认值
+    """
+    styles_name = find_related_part(archive, part_name, STYLES_REL, 'word/styles.xml')
+    try:
+        return StyleResolver(ET.fromstring(archive.read(styles_name)))
+    except KeyError:
+        return StyleResolver()
+
+
+class OutputWriter:
+    """
+    以文本方式写入输出文件，precompress为True时同时写入.gz预压缩副本
+    
+    内容先写入同目录下的 <文件名>.tmp（及 <文件名>.gz.tmp），全部成功后才替换为正式文件；
+    写出过程中出错时删除临时文件，不会留下写了一半的输出。
+    """
+    
+    def __init__(self, path, precompress=False):
+        path = os.fspath(path)
+        self.targets = [(f'{path}.tmp', path)]
+        self.file = open(f'{path}.tmp', 'w', encoding='utf-8')
+        self.gzip_file = None
+        self.gzip_raw = None
+        if precompress:
+            gzip_path = f'{path}.gz'
+            self.targets.append((f'{gzip_path}.tmp', gzip_path))
+            try:
+                self.gzip_raw = open(f'{gzip_path}.tmp', 'wb')
+            except BaseException:
+                self.discard()
+                raise
+            # 压缩头中记录的文件名仍取正式文件名，保证输出与直接写入时逐字节一致
+            compressed = gzip.GzipFile(gzip_path, 'wb', compresslevel=GZIP_LEVEL, fileobj=self.gzip_raw, mtime=0)
+            self.gzip_file = io.TextIOWrapper(compressed, encoding='utf-8')
+
+    def write(self, text):
+        self.file.write(text)
+        if self.gzip_file is not None:
+            self.gzip_file.write(text)
+
+    def close(self):
+        self.file.close()
+        if self.gzip_file is not None:
+            self.gzip_file.close()
+        if self.gzip_raw is not None:
+            self.gzip_raw.close()
+
+    def commit(self):
+        """关闭文件并将临时文件替换为正式文件"""
+        self.close()
+        for temp_path, path in self.targets:
+            os.replace(temp_path, path)
+
+    def discard(self):
+        """关闭文件并删除临时文件"""
+        try:
+            self.close()
+        finally:
+            for temp_path, _ in self.targets:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.discard()
+            return
+        try:
+            self.commit()
+        except BaseException:
+            self.discard()
+            raise
+
+
+class MediaExtractor:
+    """
+    从docx压缩包中按需流式复制run引用的图片到资源文件夹，不解码图片
+    文件按内容哈希命名，相同图片在所有文档中只保存一份
+    """
+    
+    def __init__(self, archive, part_name, assets_dir):
+        self.archive = archive
+        self.relationships = read_relationships(archive, part_name)
+        self.assets_dir = Path(assets_dir)
+        
+        # 已提取的图片: {关系ID: 资源文件名}
+        self.extracted = {}
+
+    def extract(self, rel_id):
+        """
+        复制关系ID对应的图片部件，返回资源文件名，外部链接或缺失的部件返回None
+        """
+        if rel_id in self.extracted:
+            return self.extracted[rel_id]
+        
+        relationship = self.relationships.get(rel_id)
+        filename = None
+        if relationship is not None:
+            try:
+                source = self.archive.open(relationship[1])
+            except KeyError:
+                source = None
+            if source is not None:
+                self.assets_dir.mkdir(parents=True, exist_ok=True)
+                digest = hashlib.blake2b(digest_size=16)
+                # 边读边写入临时文件并计算哈希，完成后按哈希重命名
+                with source, tempfile.NamedTemporaryFile(dir=self.assets_dir, suffix='.tmp',
+                                                         delete=False) as temp:
+                    while True:
+                        chunk = source.read(MEDIA_COPY_CHUNK)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                        temp.write(chunk)
+                
+                extension = posixpath.splitext(relationship[1])[1].lower()
+                filename = digest.hexdigest() + extension
+                target = self.assets_dir / filename
+                if target.exists():
+                    os.remove(temp.name)
+                else:
+                    # 临时文件默认仅所有者可读，改为静态服务器可读取的权限
+                    os.chmod(temp.name, 0o644)
+                    os.replace(temp.name, target)
+        
+        self.extracted[rel_id] = filename
+        return filename
+
+    def output_names(self):
+        """
+        已提取的资源文件(相对输出目录的路径)，用于增量转换清单
+        """
+        return sorted({f'{ASSETS_FOLDER}/{filename}'
+                       for filename in self.extracted.values() if filename})
+
+    def run_images(self, run):
+        """
+        生成run中每个内嵌图片的<img>标签，宽高取自wp:extent
+        """
+        for drawing in run.iter(w_tag('drawing')):
+            blip = drawing.find(f'.//{{{A_NS}}}blip')
+            if blip is None:
+                continue
+            filename = self.extract(blip.get(f'{{{R_NS}}}embed'))
+            if filename is None:
+                continue
+            
+            size_attrs = ""
+            extent = drawing.find(f'.//{{{WP_NS}}}extent')
+            if extent is not None:
+                try:
+                    width = round(int(extent.get('cx')) / EMU_PER_PIXEL)
+                    height = round(int(extent.get('cy')) / EMU_PER_PIXEL)
+                    size_attrs = f' width="{width}" height="{height}"'
+                except (TypeError, ValueError):
+                    pass
+            
+            doc_pr = drawing.find(f'.//{{{WP_NS}}}docPr')
+            alt = html.escape(doc_pr.get('descr', '')) if doc_pr is not None else ''
+            yield f'<img src="{ASSETS_FOLDER}/{filename}"{size_attrs} alt="{alt}">'
+
+
 class WordToFileConverter:
     """
     Word文档转文件转换器
     """
     
-    def __init__(self):
+    def __init__(self, engine='docx', intern_styles=None, normalize_runs=True,
+                 chunk_size=None, chunk_files=False, split_level=None, search_index=False,
+                 extract_images=False, minify=False, precompress=False):
+        if engine not in ENGINES:
+            raise ValueError(f"不支持的解析引擎: {engine}")
+        if intern_styles not in INTERN_MODES:
+            raise ValueError(f"不支持的样式模式: {intern_styles}")
+        self.engine = engine
+        self.intern_styles = intern_styles
+        self.normalize_runs = normalize_runs
+        
+        # JS分块输出: chunk_size为每块字符数(None表示不分块)，chunk_files为True时首块以外写入单独文件
+        self.chunk_size = chunk_size
+        self.chunk_files = chunk_files
+        
+        # 按标题拆分页面: split_level为1时按标题1拆分，为2时按标题1和标题2拆分，None表示不拆分
+        self.split_level = split_level
+        
+        # 是否生成客户端搜索索引(<文档名>.search.json，批量转换时另生成跨文档索引)
+        self.search_index = search_index
+        
+        # 是否提取内嵌图片到输出目录下的assets文件夹
+        self.extract_images = extract_images
+        
+        # 输出压缩: minify去掉模板中的缩进和换行，precompress为每个输出文件生成.gz副本
+        self.minify = minify
+        self.precompress = precompress
+        
+        # 当前文档生成的输出文件(相对输出目录的文件名)，用于增量转换清单
+        self.document_outputs = []
+        
+        # 当前文档提取的资源文件，不生成.gz副本，单独记录后并入输出列表
+        self.document_media = []
+        
+        # 当前文档中已使用的锚点ID
+        self.document_anchors = set()
+        
+        # 当前文档中已生成的样式类: {内联样式: 类名}
+        self.document_styles = {}
+        
+        # 当前文档的默认格式(docDefaults)，设置在内容容器上，run只输出与之不同的格式
+        self.document_format = EMPTY_RUN_FORMAT
+        
+        # 最近一次批量转换中每个文件的结果: [(文件路径, 是否成功), ...]
+        self.last_batch_results = []
+
         # 中文字号与磅值对应关系
         self.size_mapping = {
             42: 'initial',        # 初号
@@ -40,6 +622,10 @@ class WordToFileConverter:
             2: 'right',   # 右对齐
             3: 'justify'  # 两端对齐
         }
+        
+        # 预先计算所有半磅字号对应的CSS类名
+        self.size_classes = {half / 2: self.match_size_class(half / 2)
+                             for half in range(1, MAX_FONT_SIZE_PT * 2 + 1)}
 
     def select_folder_dialog(self, title):
         """使用tkinter弹出文件夹选择对话框"""
@@ -85,13 +671,10 @@ class WordToFileConverter:
         
         return file_path
 
-    def pt_to_class_name(self, font_size_pt):
+    def match_size_class(self, font_size_pt):
         """
-        将Word字体大小(磅)转换为CSS类名
+        按字号对应关系匹配CSS类名
         """
-        if font_size_pt is None:
-            return "normal"
-        
         # 尝试精确匹配
         if font_size_pt in self.size_mapping:
             return self.size_mapping[font_size_pt]
@@ -115,138 +698,507 @@ class WordToFileConverter:
         # 默认情况
         return "normal"
 
-    def get_run_styles(self, run):
+    def pt_to_class_name(self, font_size_pt):
         """
-        获取run的样式信息
+        将Word字体大小(磅)转换为CSS类名
         """
-        styles = []
-        
-        # 粗体
-        if run.bold:
-            styles.append("font-weight:bold")
-        
-        # 斜体  
-        if run.italic:
-            styles.append("font-style:italic")
+        if font_size_pt is None:
+            return "normal"
         
-        # 下划线
-        if run.underline:
-            styles.append("text-decoration:underline")
+        # Word字号均为半磅的整数倍，直接查预先计算的表
+        class_name = self.size_classes.get(font_size_pt)
+        if class_name is None:
+            class_name = self.match_size_class(font_size_pt)
+            self.size_classes[font_size_pt] = class_name
+        return class_name
+
+    def get_run_format(self, run):
+        """
+        获取python-docx run的格式信息
+        """
+        # 获取字体大小
+        font_size_pt = None
+        if run.font.size:
+            font_size_pt = run.font.size.pt
         
         # 字体颜色
+        color = None
         if run.font.color and run.font.color.rgb:
             try:
-                color = run.font.color.rgb
+                rgb = run.font.color.rgb
                 # 将颜色转换为16进制
-                if hasattr(color, '__iter__'):
+                if hasattr(rgb, '__iter__'):
                     # 如果是RGB元组
-                    color_hex = ''.join(f'{c:02x}' for c in color)
+                    color = ''.join(f'{c:02x}' for c in rgb)
                 else:
                     # 如果是整数
-                    color_hex = f'{color:06x}'
-                styles.append(f"color:#{color_hex}")
+                    color = f'{rgb:06x}'
             except:
                 pass  # 颜色解析失败时忽略
         
-        # 字体名称
-        if run.font.name:
-            styles.append(f"font-family:'{run.font.name}'")
+        return RunFormat(font_size_pt, bool(run.bold), bool(run.italic),
+                         bool(run.underline), color, run.font.name)
+
+    def get_format_styles(self, run_format, base=EMPTY_RUN_FORMAT):
+        """
+        根据格式信息生成内联样式列表
+        base: 外层容器已有的格式，只输出与之不同的部分
+        """
+        styles = []
+        
+        # 粗体
+        if run_format.bold != base.bold:
+            styles.append("font-weight:bold" if run_format.bold else "font-weight:normal")
+        
+        # 斜体  
+        if run_format.italic != base.italic:
+            styles.append("font-style:italic" if run_format.italic else "font-style:normal")
+        
+        # 下划线
+        if run_format.underline != base.underline:
+            styles.append("text-decoration:underline" if run_format.underline
+                          else "text-decoration:none")
+        
+        # 字体颜色
+        if run_format.color and run_format.color != base.color:
+            styles.append(f"color:#{run_format.color}")
+        
+        # 字体名称: 西文字体在前，中日韩文字体在后，浏览器按字符逐个选用
+        fonts = [font for font in (run_format.font_name, run_format.east_asia_font) if font]
+        if fonts and fonts != [font for font in (base.font_name, base.east_asia_font) if font]:
+            styles.append("font-family:" + ",".join(f"'{font}'" for font in fonts))
         
         return styles
 
-    def process_paragraph(self, paragraph):
+    def get_container_attributes(self):
+        """
+        生成内容容器的class和style属性值，承载文档默认格式(每个文档只输出一次)
+        """
+        class_names = []
+        size_class = self.pt_to_class_name(self.document_format.font_size_pt)
+        if size_class != "normal":
+            class_names.append(size_class)
+        styles = "; ".join(self.get_format_styles(self.document_format))
+        if self.intern_styles and styles:
+            class_names.append(self.intern_style(styles))
+            styles = ""
+        return " ".join(class_names), styles
+
+    def get_run_styles(self, run):
+        """
+        获取run的样式信息
+        """
+        return self.get_format_styles(self.get_run_format(run))
+
+    def intern_style(self, declarations):
+        """
+        为一组内联样式生成按内容哈希命名的短类名，相同样式在所有文档中得到相同类名
+        """
+        class_name = self.document_styles.get(declarations)
+        if class_name is None:
+            digest = hashlib.blake2b(declarations.encode('utf-8'), digest_size=4).hexdigest()
+            class_name = STYLE_CLASS_PREFIX + digest
+            self.document_styles[declarations] = class_name
+        return class_name
+
+    def write_interned_css(self, css_path, styles, merge=False):
+        """
+        写入样式类表，merge为True时保留文件中已有的样式类(共用样式表)
+        """
+        rules = {class_name: declarations for declarations, class_name in styles.items()}
+        if merge and css_path.exists():
+            with open(css_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    match = STYLE_RULE_PATTERN.match(line.strip())
+                    if match:
+                        rules.setdefault(match.group(1), match.group(2))
+        
+        with self.open_output(css_path) as f:
+            f.write("/* Word文档run样式类，由转换器自动生成 */\n")
+            for class_name in sorted(rules):
+                f.write(f".{class_name} {{ {rules[class_name]} }}\n")
+
+    def merge_runs(self, runs):
+        """
+        规范化段落中的run: 合并格式相同的相邻run，纯空白run并入相邻的span而不是丢弃
+        """
+        merged = []
+        leading_space = ''
+        
+        for text, run_format in runs:
+            if not text:
+                continue
+            
+            # 纯空白run保留在前一个span中，段首的空白并入后一个span
+            if not text.strip():
+                if merged:
+                    merged[-1][0].append(text)
+                else:
+                    leading_space += text
+                continue
+            
+            if merged and merged[-1][1] == run_format:
+                merged[-1][0].append(text)
+            else:
+                merged.append(([leading_space, text], run_format))
+                leading_space = ''
+        
+        return [(''.join(parts), run_format) for parts, run_format in merged]
+
+    def render_paragraph(self, alignment, runs, anchor=None):
+        """
+        将段落对齐方式和(文本, 格式)列表渲染为HTML字符串
+        anchor: 段落的锚点ID(标题段落)
+        """
+        html_parts = []
+        
+        if self.normalize_runs:
+            runs = self.merge_runs(runs)
+        
+        for text, run_format in runs:
+            if not text.strip():
+                continue
+            
+            # 图片等已渲染好的内容(格式为None)直接输出
+            if run_format is None:
+                html_parts.append(text)
+                continue
+            
+            # 获取CSS类名，与文档默认字号相同时由容器提供
+            css_class = "normal"
+            if run_format.font_size_pt != self.document_format.font_size_pt:
+                css_class = self.pt_to_class_name(run_format.font_size_pt)
+            
+            # 获取内联样式
+            styles = self.get_format_styles(run_format, self.document_format)
+            style_attr = f' style="{"; ".join(styles)}"' if styles else ""
+            
+            # 样式内联化: 用生成的样式类代替重复的style属性
+            class_names = [css_class] if css_class != "normal" else []
+            if self.intern_styles and styles:
+                class_names.append(self.intern_style("; ".join(styles)))
+                style_attr = ""
+            
+            # 构建HTML元素
+            if class_names or style_attr:
+                class_attr = f' class="{" ".join(class_names)}"' if class_names else ""
+                html_parts.append(f'<span{class_attr}{style_attr}>{text}</span>')
+            else:
+                html_parts.append(text)
+        
+        if html_parts:
+            # 合并连续的文本
+            combined_html = ''.join(html_parts)
+            id_attr = f' id="{anchor}"' if anchor else ""
+            return f'<p{id_attr} class="align-{alignment}">{combined_html}</p>'
+        return ""
+
+    def make_anchor(self, text):
+        """
+        根据标题文本生成稳定的锚点ID，同一文档内重复的标题依次追加序号
+        """
+        digest = hashlib.blake2b(text.strip().encode('utf-8'), digest_size=4).hexdigest()
+        anchor = f'sec-{digest}'
+        index = 2
+        while anchor in self.document_anchors:
+            anchor = f'sec-{digest}-{index}'
+            index += 1
+        self.document_anchors.add(anchor)
+        return anchor
+
+    def read_paragraph(self, paragraph, run_elements, resolver, media=None):
+        """
+        按样式解析器处理段落元素，run_elements为[(文本, w:r元素), ...]
+        media: 图片提取器，提供时run中的内嵌图片输出为<img>标签
+        返回RenderedParagraph，段落无内容时返回None
+        """
+        style_id = resolver.paragraph_style_id(paragraph)
+        alignment = resolver.paragraph_alignment(paragraph)
+        runs = []
+        for run_text, run in run_elements:
+            runs.append((run_text, resolver.resolve_run(style_id, run)))
+            if media is not None:
+                runs.extend((image_html, None) for image_html in media.run_images(run))
+        text = ''.join(run_text for run_text, run_format in runs if run_format is not None)
+        
+        heading_level = resolver.heading_level(paragraph, style_id)
+        anchor = self.make_anchor(text) if heading_level and text.strip() else None
+        
+        html_para = self.render_paragraph(alignment, runs, anchor)
+        if not html_para:
+            return None
+        return RenderedParagraph(html_para, text, heading_level, anchor)
+
+    def process_paragraph(self, paragraph, resolver=None):
+        """
+        处理单个段落，返回HTML字符串
+        resolver: 样式解析器，提供时run格式包含从段落样式和字符样式继承的格式
+        """
+        if resolver is not None:
+            rendered = self.read_paragraph(
+                paragraph._p, [(run.text, run._r) for run in paragraph.runs], resolver)
+            return rendered.html if rendered else ""
+        
+        # 获取段落对齐方式
+        alignment = 'left'
+        if paragraph.alignment is not None:
+            alignment = self.alignment_map.get(paragraph.alignment, 'left')
+        
+        runs = [(run.text, self.get_run_format(run)) for run in paragraph.runs]
+        return self.render_paragraph(alignment, runs)
+
+    def read_stream_text(self, run):
+        """
+        读取流式解析到的w:r元素中的文本
+        """
+        text_parts = []
+        for child in run:
+            if child.tag == w_tag('t'):
+                text_parts.append(child.text or '')
+            elif child.tag in (w_tag('tab'), w_tag('ptab')):
+                text_parts.append('\t')
+            elif child.tag == w_tag('cr'):
+                text_parts.append('\n')
+            elif child.tag == w_tag('br'):
+                # 与python-docx一致: 仅文本换行输出换行符，分页/分栏符忽略
+                if w_attr(child, 'type') in (None, 'textWrapping'):
+                    text_parts.append('\n')
+            elif child.tag == w_tag('noBreakHyphen'):
+                text_parts.append('-')
+        return ''.join(text_parts)
+
+    def process_stream_paragraph(self, paragraph, resolver, media=None):
+        """
+        处理流式读取到的w:p元素，返回RenderedParagraph
+        """
+        return self.read_paragraph(
+            paragraph,
+            [(self.read_stream_text(run), run) for run in paragraph.iterfind(w_tag('r'))],
+            resolver, media)
+
+    def iter_stream_paragraphs(self, docx_path, assets_dir=None, resolver=None):
+        """
+        直接从docx压缩包中流式解析word/document.xml，逐段生成RenderedParagraph
+        仅处理正文(w:body)下的段落，处理完的元素立即清除，内存占用不随文档增大
+        """
+        with zipfile.ZipFile(docx_path) as archive:
+            part_name = find_related_part(archive, '', OFFICE_DOCUMENT_REL,
+                                          'word/document.xml')
+            if resolver is None:
+                resolver = load_style_resolver(archive, part_name)
+            media = MediaExtractor(archive, part_name, assets_dir) if assets_dir else None
+            
+            with archive.open(part_name) as part:
+                body = None
+                depth = 0
+                for event, element in ET.iterparse(part, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if depth == 2 and element.tag == w_tag('body'):
+                            body = element
+                        continue
+                    
+                    depth -= 1
+                    # 只在正文的直接子元素结束时处理，表格等内部段落随之一并丢弃
+                    if body is None or depth != 2:
+                        continue
+                    if element.tag == w_tag('p'):
+                        rendered = self.process_stream_paragraph(element, resolver, media)
+                        if rendered:
+                            yield rendered
+                    body.clear()
+            
+            if media:
+                self.document_media = media.output_names()
+
+    def iter_document_paragraphs(self, docx_path, engine=None, assets_dir=None, resolver=None):
+        """
+        按所选解析引擎逐段生成RenderedParagraph
+        assets_dir: 内嵌图片的提取目录，None表示忽略图片
+        resolver: 已构建的样式解析器，None表示从文档中读取
+        """
+        engine = engine or self.engine
+        self.document_anchors = set()
+        if engine == 'stream':
+            yield from self.iter_stream_paragraphs(docx_path, assets_dir, resolver)
+            return
+        
+        # 读取Word文档
+        doc = Document(docx_path)
+        if resolver is None:
+            resolver = StyleResolver(doc.styles.element)
+        
+        with zipfile.ZipFile(docx_path) as archive:
+            media = None
+            if assets_dir:
+                part_name = find_related_part(archive, '', OFFICE_DOCUMENT_REL,
+                                              'word/document.xml')
+                media = MediaExtractor(archive, part_name, assets_dir)
+            
+            # 处理所有段落，空段落(无文字也无图片)不输出
+            for paragraph in doc.paragraphs:
+                rendered = self.read_paragraph(
+                    paragraph._p, [(run.text, run._r) for run in paragraph.runs], resolver, media)
+                if rendered:
+                    yield rendered
+            
+            if media:
+                self.document_media = media.output_names()
+
+    def split_chunks(self, paragraphs):
+        """
+        按段落边界将HTML段落逐块切分为不超过chunk_size字符的块(单个超长段落独占一块)
+        每块在凑满时立即生成，内存中只保留当前块
+        """
+        chunk_size = self.chunk_size or DEFAULT_CHUNK_SIZE
+        separator = '' if self.minify else '\n'
+        current = []
+        current_size = 0
+        produced = False
+        for html_para in (paragraph.html for paragraph in paragraphs):
+            if current and current_size + len(html_para) > chunk_size:
+                yield separator.join(current)
+                produced = True
+                current = []
+                current_size = 0
+            current.append(html_para)
+            current_size += len(html_para) + 1
+        if current or not produced:
+            yield separator.join(current)
+
+    def build_chunked_js(self, stem, paragraphs, output_dir):
+        """
+        逐段生成分块懒加载的JS文件内容: 首块立即渲染，其余在浏览器空闲或滚动接近底部时追加
+        chunk_files为True时首块以外的内容在切分出来时即写入 <文档名>.chunk-N.js，按需加载
+        块数在所有块生成后才确定，因此写在块列表之后
+        """
+        def template(text):
+            return minify_template(text) if self.minify else text
+        
+        container_properties, apply_container = self.build_container_js()
+        yield template(f"""// 自动生成的文档内容(分块)
+const CONTENT_DATA = {{{container_properties}
+    chunks: [
+        """)
+        
+        separator = ',' if self.minify else ',\n        '
+        chunk_files = ['null']
+        chunk_count = 0
+        for index, chunk in enumerate(self.split_chunks(paragraphs)):
+            chunk_count += 1
+            if index and self.chunk_files:
+                chunk_filename = f'{stem}.chunk-{index}.js'
+                with self.open_output(output_dir / chunk_filename) as f:
+                    f.write(f"CONTENT_DATA.chunks[{index}] = {to_js_string(chunk)};\n")
+                self.document_outputs.append(chunk_filename)
+                chunk_files.append(to_js_string(chunk_filename))
+                continue
+            if index:
+                yield separator
+            yield to_js_string(chunk)
+        
+        yield template(f"""
+    ],
+    chunkCount: {chunk_count},
+    chunkFiles: [{', '.join(chunk_files)}],
+    get content() {{
+        return this.chunks.join('\\n');
+    }}
+}};
+
+// 导出供其他模块使用
+if (typeof module !== 'undefined' && module.exports) {{
+    module.exports = CONTENT_DATA;
+}}
+
+// 分块插入内容到页面
+if (typeof document !== 'undefined') {{
+    const chunkBase = document.currentScript ? document.currentScript.src.replace(/[^/]*$/, '') : '';
+    document.addEventListener('DOMContentLoaded', function() {{
+        const contentElement = document.getElementById('word-content');
+        if (!contentElement) {{
+            return;
+        }}{apply_container}
+        let next = 0;
+        let loading = false;
+
+        function loadChunk(index, callback) {{
+            if (CONTENT_DATA.chunks[index] !== undefined) {{
+                callback(CONTENT_DATA.chunks[index]);
+                return;
+            }}
+            const script = document.createElement('script');
+            script.src = chunkBase + CONTENT_DATA.chunkFiles[index];
+            script.onload = function() {{ callback(CONTENT_DATA.chunks[index] || ''); }};
+            script.onerror = function() {{ callback(''); }};
+            document.head.appendChild(script);
+        }}
+
+        function renderNext() {{
+            if (loading || next >= CONTENT_DATA.chunkCount) {{
+                return;
+            }}
+            loading = true;
+            loadChunk(next++, function(html) {{
+                contentElement.insertAdjacentHTML('beforeend', html);
+                loading = false;
+                scheduleNext();
+            }});
+        }}
+
+        function onScroll() {{
+            if (window.innerHeight + window.scrollY >= document.body.offsetHeight - window.innerHeight) {{
+                renderNext();
+            }}
+        }}
+
+        function scheduleNext() {{
+            if (next >= CONTENT_DATA.chunkCount) {{
+                window.removeEventListener('scroll', onScroll);
+            }} else if (window.requestIdleCallback) {{
+                window.requestIdleCallback(renderNext);
+            }} else {{
+                setTimeout(renderNext, 50);
+            }}
+        }}
+
+        contentElement.innerHTML = '';
+        window.addEventListener('scroll', onScroll, {{ passive: true }});
+        renderNext();
+    }});
+}}
+""")
+
+    def open_output(self, path):
+        """
+        打开输出文件，开启预压缩时同时写入.gz副本
+        """
+        return OutputWriter(path, self.precompress)
+
+    def build_container_js(self):
         """
-        处理单个段落，返回HTML字符串
+        生成JS输出中描述内容容器默认格式的属性，以及页面脚本中应用它们的语句
         """
-        html_parts = []
-        
-        # 获取段落对齐方式
-        alignment = 'left'
-        if paragraph.alignment is not None:
-            alignment = self.alignment_map.get(paragraph.alignment, 'left')
-        
-        for run in paragraph.runs:
-            text = run.text
-            if not text.strip():
-                continue
-                
-            # 获取字体大小
-            font_size_pt = None
-            if run.font.size:
-                font_size_pt = run.font.size.pt
-            
-            # 获取CSS类名
-            css_class = self.pt_to_class_name(font_size_pt)
-            
-            # 获取内联样式
-            styles = self.get_run_styles(run)
-            style_attr = f' style="{"; ".join(styles)}"' if styles else ""
-            
-            # 构建HTML元素
-            if css_class != "normal" or style_attr:
-                class_attr = f' class="{css_class}"' if css_class != "normal" else ""
-                html_parts.append(f'<span{class_attr}{style_attr}>{text}</span>')
-            else:
-                html_parts.append(text)
-        
-        if html_parts:
-            # 合并连续的文本
-            combined_html = ''.join(html_parts)
-            return f'<p class="align-{alignment}">{combined_html}</p>'
-        return ""
+        container_class, container_style = self.get_container_attributes()
+        properties = f"""
+    containerClass: {to_js_string(container_class)},
+    containerStyle: {to_js_string(container_style)},"""
+        apply = """
+        contentElement.className = (contentElement.className + ' ' + CONTENT_DATA.containerClass).trim();
+        contentElement.style.cssText += CONTENT_DATA.containerStyle;"""
+        return properties, apply
 
-    def convert_word_to_file(self, docx_path, output_type='js', output_dir=None):
+    def build_file_parts(self, output_type, title, styles_link=""):
         """
-        将Word文档转换为指定类型的文件
-        output_type: 'js' 或 'html'
+        根据输出类型生成文件的头部和尾部，段落内容写在两者之间
         """
-        try:
-            # 将路径转换为Path对象
-            input_path = Path(docx_path)
-            
-            # 检查文件是否存在
-            if not input_path.exists():
-                print(f"错误: 文件不存在: {input_path}")
-                return False
-                
-            # 使用Path对象的suffix属性检查文件格式
-            if input_path.suffix.lower() not in ['.docx']:
-                print(f"错误: 不支持的文件格式: {input_path}")
-                return False
-            
-            print(f"正在处理: {input_path.name}")
-            
-            # 读取Word文档
-            doc = Document(input_path)
-            
-            # 处理所有段落
-            html_content = []
-            for i, paragraph in enumerate(doc.paragraphs):
-                if paragraph.text.strip():  # 跳过空段落
-                    html_para = self.process_paragraph(paragraph)
-                    if html_para:
-                        html_content.append(html_para)
-            
-            # 组合所有HTML内容，每行一个段落
-            full_html = '\n'.join(html_content)
-            
-            # 确定输出路径
-            if output_dir is None:
-                output_dir = Path.cwd()
-            else:
-                output_dir = Path(output_dir)
-                output_dir.mkdir(exist_ok=True)
-            
-            # 生成输出文件名
-            output_filename = input_path.stem + f'.{output_type}'
-            output_path = output_dir / output_filename
-            
-            # 根据输出类型生成不同的内容
-            if output_type == 'js':
-                # 生成JS文件内容
-                file_content = f"""// 自动生成的文档内容
-const CONTENT_DATA = {{
-    content: `{full_html}`
+        if output_type == 'js':
+            # 生成JS文件内容
+            container_properties, apply_container = self.build_container_js()
+            header = f"""// 自动生成的文档内容
+const CONTENT_DATA = {{{container_properties}
+    content: `"""
+            footer = f"""`
 }};
 
 // 导出供其他模块使用
@@ -258,21 +1210,25 @@ if (typeof module !== 'undefined' && module.exports) {{
 if (typeof document !== 'undefined') {{
     document.addEventListener('DOMContentLoaded', function() {{
         const contentElement = document.getElementById('word-content');
-        if (contentElement) {{
+        if (contentElement) {{{apply_container}
             contentElement.innerHTML = CONTENT_DATA.content;
         }}
     }});
 }}
 """
-            elif output_type == 'html':
-                # 生成HTML文件内容
-                file_content = f"""<!DOCTYPE html>
+        else:
+            # 生成HTML文件内容
+            container_class, container_style = self.get_container_attributes()
+            container_attrs = f' class="{" ".join(["content-container", container_class]).strip()}"'
+            if container_style:
+                container_attrs += f' style="{container_style}"'
+            header = f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{input_path.stem}</title>
-    <link rel="stylesheet" href="word-styles.css">
+    <title>{html.escape(title)}</title>
+    <link rel="stylesheet" href="word-styles.css">{styles_link}
     <style>
         body {{
             margin: 0;
@@ -300,25 +1256,394 @@ if (typeof document !== 'undefined') {{
 <body>
     <div class="container">
         <div class="header">
-            <h1>{input_path.stem}</h1>
+            <h1>{html.escape(title)}</h1>
         </div>
-        <div id="word-content" class="content-container">
-{full_html}
+        <div id="word-content"{container_attrs}>
+"""
+            footer = f"""
         </div>
     </div>
 </body>
 </html>
 """
+        
+        if self.minify:
+            header, footer = minify_template(header), minify_template(footer)
+        return header, footer
+
+    def write_document(self, f, output_type, title, paragraphs, output_path, styles_link=""):
+        """
+        逐段写入文件内容: 先写头部，段落边生成边写入，最后写尾部，不在内存中拼接整个文档
+        """
+        if output_type == 'js' and self.chunk_size:
+            # 分块懒加载的JS文件内容，每块切分出来即写入
+            for part in self.build_chunked_js(output_path.stem, paragraphs, output_path.parent):
+                f.write(part)
+            return
+        
+        header, footer = self.build_file_parts(output_type, title, styles_link)
+        f.write(header)
+        self.write_paragraphs(f, output_type, paragraphs)
+        f.write(footer)
+
+    def write_paragraphs(self, f, output_type, paragraphs):
+        """
+        逐段写入段落HTML，JS输出按模板字符串转义
+        """
+        separator = '' if self.minify else '\n'
+        for index, paragraph in enumerate(paragraphs):
+            if index:
+                f.write(separator)
+            f.write(escape_template_literal(paragraph.html) if output_type == 'js'
+                    else paragraph.html)
+
+    def write_section_js(self, f, section):
+        """
+        写入JS章节文件: 内容登记到全局的 CONTENT_SECTIONS[锚点] 中，
+        同一页面先后加载多个章节文件时不会重复声明变量；章节整体按需加载，不再分块
+        """
+        section_key = to_js_string(section['id'])
+        header = f"""// 自动生成的文档章节
+var CONTENT_SECTIONS = CONTENT_SECTIONS || {{}};
+CONTENT_SECTIONS[{section_key}] = {{
+    title: {to_js_string(section['title'])},
+    content: `"""
+        footer = f"""`
+}};
+
+// 导出供其他模块使用
+if (typeof module !== 'undefined' && module.exports) {{
+    module.exports = CONTENT_SECTIONS[{section_key}];
+}}
+"""
+        if self.minify:
+            header, footer = minify_template(header), minify_template(footer)
+        f.write(header)
+        self.write_paragraphs(f, 'js', section['paragraphs'])
+        f.write(footer)
+
+    def build_section_index_js(self, toc_html):
+        """
+        生成JS目录页内容: 显示目录，地址锚点变化(点击目录项或直接打开带锚点的地址)时
+        按目录项的data-src加载章节文件，并将 CONTENT_SECTIONS[锚点] 的内容显示在目录下方
+        """
+        container_properties, apply_container = self.build_container_js()
+        return f"""// 自动生成的文档目录
+var CONTENT_SECTIONS = CONTENT_SECTIONS || {{}};
+const CONTENT_DATA = {{{container_properties}
+    content: {to_js_string(toc_html)}
+}};
+
+// 导出供其他模块使用
+if (typeof module !== 'undefined' && module.exports) {{
+    module.exports = CONTENT_DATA;
+}}
+
+// 插入目录，并按锚点加载章节
+if (typeof document !== 'undefined') {{
+    const sectionBase = document.currentScript ? document.currentScript.src.replace(/[^/]*$/, '') : '';
+    document.addEventListener('DOMContentLoaded', function() {{
+        const contentElement = document.getElementById('word-content');
+        if (!contentElement) {{
+            return;
+        }}{apply_container}
+        contentElement.innerHTML = CONTENT_DATA.content;
+        const sectionElement = document.createElement('div');
+        sectionElement.className = 'word-section';
+        contentElement.appendChild(sectionElement);
+
+        const sectionFiles = {{}};
+        contentElement.querySelectorAll('a[data-src]').forEach(function(link) {{
+            sectionFiles[link.getAttribute('href').slice(1)] = link.getAttribute('data-src');
+        }});
+
+        function currentSection() {{
+            return decodeURIComponent(window.location.hash.slice(1));
+        }}
+
+        function loadSection(id, callback) {{
+            if (CONTENT_SECTIONS[id] !== undefined) {{
+                callback(CONTENT_SECTIONS[id]);
+                return;
+            }}
+            const script = document.createElement('script');
+            script.src = sectionBase + sectionFiles[id];
+            script.onload = function() {{ callback(CONTENT_SECTIONS[id]); }};
+            document.head.appendChild(script);
+        }}
+
+        function showSection() {{
+            const id = currentSection();
+            if (!sectionFiles[id]) {{
+                return;
+            }}
+            loadSection(id, function(section) {{
+                if (!section || currentSection() !== id) {{
+                    return;
+                }}
+                sectionElement.innerHTML = section.content;
+                const target = document.getElementById(id);
+                if (target) {{
+                    target.scrollIntoView();
+                }}
+            }});
+        }}
+
+        window.addEventListener('hashchange', showSection);
+        showSection();
+    }});
+}}
+"""
+
+    def split_sections(self, stem, paragraphs):
+        """
+        按不高于split_level的标题将段落拆分为章节，第一个标题之前的内容单独成为一节
+        每个章节在下一个拆分标题出现时生成，内存中只保留当前章节的段落
+        """
+        section = None
+        for paragraph in paragraphs:
+            starts_section = (paragraph.anchor is not None
+                              and paragraph.heading_level <= self.split_level)
+            if starts_section or section is None:
+                if section is not None:
+                    yield section
+                if starts_section:
+                    section_id = paragraph.anchor
+                    title = paragraph.text.strip()
+                    level = paragraph.heading_level
+                else:
+                    section_id, title, level = START_SECTION_ID, stem, 0
+                section = {'id': section_id, 'title': title, 'level': level, 'paragraphs': []}
+            section['paragraphs'].append(paragraph)
+        if section is not None:
+            yield section
+
+    def write_sections(self, stem, paragraphs, output_type, output_dir, styles_link=""):
+        """
+        将文档拆分为按章节的页面文件(<文档名>.<锚点>.<类型>)，
+        并生成目录页(<文档名>.<类型>)和章节清单(<文档名>.sections.json)
+        段落逐个读取，每个章节完成后立即写出页面文件
+        """
+        toc_items = []
+        manifest_sections = []
+        
+        for section in self.split_sections(stem, paragraphs):
+            page_filename = f"{stem}.{section['id']}.{output_type}"
+            page_path = output_dir / page_filename
+            with self.open_output(page_path) as f:
+                if output_type == 'js':
+                    self.write_section_js(f, section)
+                else:
+                    self.write_document(f, output_type, section['title'], section['paragraphs'],
+                                        page_path, styles_link)
+            self.document_outputs.append(page_filename)
+            
+            # HTML目录直接链接到页面文件；JS目录链接到锚点，由目录页脚本按data-src加载章节文件
+            if output_type == 'html' and section['id'] == START_SECTION_ID:
+                href = page_filename
+            elif output_type == 'html':
+                href = f"{page_filename}#{section['id']}"
             else:
+                href = f"#{section['id']}"
+            toc_items.append(
+                f'<li class="toc-level-{section["level"]}">'
+                f'<a href="{href}" data-src="{page_filename}">{html.escape(section["title"])}</a></li>')
+            manifest_sections.append({
+                'id': section['id'],
+                'title': section['title'],
+                'level': section['level'],
+                'file': page_filename,
+                'paragraphs': len(section['paragraphs'])
+            })
+        
+        index_path = output_dir / f'{stem}.{output_type}'
+        toc_html = '<nav class="word-toc">\n<ul>\n' + '\n'.join(toc_items) + '\n</ul>\n</nav>'
+        toc_paragraph = RenderedParagraph(toc_html, '', None, None)
+        with self.open_output(index_path) as f:
+            if output_type == 'js':
+                index_content = self.build_section_index_js(toc_html)
+                f.write(minify_template(index_content) if self.minify else index_content)
+            else:
+                self.write_document(f, output_type, stem, [toc_paragraph], index_path, styles_link)
+        self.document_outputs.append(index_path.name)
+        
+        manifest = {
+            'document': stem,
+            'index': index_path.name,
+            'sections': manifest_sections
+        }
+        with self.open_output(output_dir / f'{stem}.sections.json') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        self.document_outputs.append(f'{stem}.sections.json')
+        
+        print(f"  已拆分为 {len(manifest_sections)} 个页面，目录: {index_path.name}")
+
+    def collect_paragraphs(self, paragraphs, records):
+        """
+        逐段传递段落，同时保存去掉HTML的段落信息(供搜索索引使用)
+        """
+        for paragraph in paragraphs:
+            records.append(paragraph._replace(html=''))
+            yield paragraph
+
+    def build_search_index(self, stem, paragraphs, output_type):
+        """
+        构建文档的倒排索引: 搜索词 → 段落序号，段落序号 → 所在章节(标题锚点、标题、页面文件)
+        """
+        page_filename = f'{stem}.{output_type}'
+        sections = []
+        paragraph_sections = []
+        terms = {}
+        
+        for index, paragraph in enumerate(paragraphs):
+            # 拆分页面时，章节所在的页面文件随拆分点变化
+            if self.split_level and paragraph.anchor and paragraph.heading_level <= self.split_level:
+                page_filename = f'{stem}.{paragraph.anchor}.{output_type}'
+            elif self.split_level and not sections:
+                page_filename = f'{stem}.{START_SECTION_ID}.{output_type}'
+            
+            if paragraph.anchor:
+                sections.append([paragraph.anchor, paragraph.text.strip(), page_filename])
+            elif not sections:
+                sections.append(['', stem, page_filename])
+            paragraph_sections.append(len(sections) - 1)
+            
+            for term in sorted(tokenize_search_text(paragraph.text)):
+                terms.setdefault(term, []).append(index)
+        
+        return {
+            'document': stem,
+            'sections': sections,
+            'paragraphs': paragraph_sections,
+            'terms': terms
+        }
+
+    def write_combined_search_index(self, output_dir, stems):
+        """
+        合并各文档的搜索索引为跨文档索引，词条指向[文档序号, 段落序号]
+        """
+        documents = []
+        terms = {}
+        for stem in stems:
+            index_path = output_dir / (stem + SEARCH_INDEX_SUFFIX)
+            if not index_path.exists():
+                continue
+            with open(index_path, 'r', encoding='utf-8') as f:
+                document_index = json.load(f)
+            
+            document_number = len(documents)
+            documents.append({
+                'document': document_index['document'],
+                'sections': document_index['sections'],
+                'paragraphs': document_index['paragraphs']
+            })
+            for term, postings in document_index['terms'].items():
+                terms.setdefault(term, []).extend([document_number, paragraph_index]
+                                                  for paragraph_index in postings)
+        
+        combined_path = output_dir / COMBINED_SEARCH_INDEX
+        with self.open_output(combined_path) as f:
+            json.dump({'documents': documents, 'terms': terms}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        print(f"✓ 跨文档搜索索引已生成: {combined_path}")
+
+    def convert_word_to_file(self, docx_path, output_type='js', output_dir=None, engine=None,
+                             ensure_css=True):
+        """
+        将Word文档转换为指定类型的文件
+        output_type: 'js' 或 'html'
+        engine: 'docx' 或 'stream'，默认使用构造时指定的解析引擎
+        ensure_css: 是否检查并生成CSS文件，批量转换时由调用方统一生成(含共用样式类表)
+        """
+        try:
+            # 将路径转换为Path对象
+            input_path = Path(docx_path)
+            
+            # 检查文件是否存在
+            if not input_path.exists():
+                print(f"错误: 文件不存在: {input_path}")
+                return False
+                
+            # 使用Path对象的suffix属性检查文件格式
+            if input_path.suffix.lower() not in ['.docx']:
+                print(f"错误: 不支持的文件格式: {input_path}")
+                return False
+            
+            print(f"正在处理: {input_path.name}")
+            self.document_styles = {}
+            self.document_outputs = []
+            self.document_media = []
+            
+            if output_type not in ('js', 'html'):
                 print(f"错误: 不支持的输出类型: {output_type}")
                 return False
             
-            # 写入文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(file_content)
+            # 确定输出路径
+            if output_dir is None:
+                output_dir = Path.cwd()
+            else:
+                output_dir = Path(output_dir)
+                output_dir.mkdir(exist_ok=True)
+            
+            # 生成输出文件名
+            output_filename = input_path.stem + f'.{output_type}'
+            output_path = output_dir / output_filename
+            
+            # 样式类表的链接(样式类在渲染段落时收集，写完内容后再写入样式表)
+            styles_link = ""
+            if self.intern_styles == 'document':
+                styles_filename = input_path.stem + '.styles.css'
+                styles_link = f'\n    <link rel="stylesheet" href="{styles_filename}">'
+            elif self.intern_styles == 'shared':
+                styles_link = f'\n    <link rel="stylesheet" href="{SHARED_STYLES_CSS}">'
+            
+            # 先读取样式，文档默认格式在写出头部时设置到内容容器上
+            with zipfile.ZipFile(input_path) as archive:
+                resolver = load_style_resolver(archive, find_related_part(
+                    archive, '', OFFICE_DOCUMENT_REL, 'word/document.xml'))
+            self.document_format = resolver.default_format()
+            
+            # 读取Word文档，段落逐个生成
+            assets_dir = output_dir / ASSETS_FOLDER if self.extract_images else None
+            paragraphs = self.iter_document_paragraphs(input_path, engine, assets_dir, resolver)
+            search_records = []
+            if self.search_index:
+                paragraphs = self.collect_paragraphs(paragraphs, search_records)
+            
+            if self.split_level:
+                # 按标题拆分为多个页面，原输出文件作为目录页
+                self.write_sections(input_path.stem, paragraphs, output_type, output_dir,
+                                    styles_link)
+            else:
+                # 边解析边写入文件
+                with self.open_output(output_path) as f:
+                    self.write_document(f, output_type, input_path.stem, paragraphs, output_path,
+                                        styles_link)
+                self.document_outputs.append(output_filename)
+            
+            if self.intern_styles == 'document':
+                self.write_interned_css(output_dir / styles_filename, self.document_styles)
+                self.document_outputs.append(styles_filename)
+            elif self.intern_styles == 'shared' and ensure_css:
+                self.write_interned_css(output_dir / SHARED_STYLES_CSS,
+                                        self.document_styles, merge=True)
+            
+            # 搜索索引
+            if self.search_index:
+                index_path = output_dir / (input_path.stem + SEARCH_INDEX_SUFFIX)
+                with self.open_output(index_path) as f:
+                    json.dump(self.build_search_index(input_path.stem, search_records,
+                                                      output_type),
+                              f, ensure_ascii=False, separators=(',', ':'))
+                self.document_outputs.append(index_path.name)
+            
+            if self.precompress:
+                self.document_outputs += [name + '.gz' for name in self.document_outputs]
+            self.document_outputs += self.document_media
             
             # 确保CSS文件存在
-            self.ensure_css_file(output_dir)
+            if ensure_css:
+                self.ensure_css_file(output_dir)
             
             print(f"✓ 成功转换: {input_path.name} -> {output_path}")
             return True
@@ -334,7 +1659,8 @@ if (typeof document !== 'undefined') {{
         确保CSS文件存在
         """
         css_path = Path(output_dir) / 'word-styles.css'
-        if not css_path.exists():
+        gzip_missing = self.precompress and not css_path.with_name(css_path.name + '.gz').exists()
+        if not css_path.exists() or gzip_missing:
             self.generate_css_file(output_dir)
 
     def generate_css_file(self, output_dir=None):
@@ -419,6 +1745,13 @@ span {
     white-space: pre-wrap;
 }
 
+/* 拆分页面目录 */
+.word-toc ul {
+    list-style: none;
+    padding-left: 0;
+}
+.toc-level-2 { margin-left: 2em; }
+
 /* 页面容器 */
 .content-container {
     max-width: 800px;
@@ -430,15 +1763,124 @@ span {
 }
 """
         
-        css_path = output_dir / 'word-styles.css'
-        with open(css_path, 'w', encoding='utf-8') as f:
+        css_path = Path(output_dir) / 'word-styles.css'
+        with self.open_output(css_path) as f:
             f.write(css_content)
         
         print(f"✓ CSS文件已生成: {css_path}")
 
-    def batch_convert_word_files(self, input_dir=None, output_type='js', output_dir=None):
+    def settings_fingerprint(self, output_type):
+        """
+        影响输出内容的转换设置，任何一项变化都会使增量清单中的记录失效
+        """
+        return {
+            'version': CONVERTER_VERSION,
+            'output_type': output_type,
+            'engine': self.engine,
+            'intern_styles': self.intern_styles,
+            'normalize_runs': self.normalize_runs,
+            'chunk_size': self.chunk_size,
+            'chunk_files': self.chunk_files,
+            'split_level': self.split_level,
+            'search_index': self.search_index,
+            'extract_images': self.extract_images,
+            'minify': self.minify,
+            'precompress': self.precompress
+        }
+
+    def hash_file(self, file_path):
+        """
+        计算文件内容的BLAKE2b哈希
+        """
+        digest = hashlib.blake2b()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def load_manifest(self, output_dir):
+        """
+        读取增量转换清单，不存在或损坏时返回空清单
+        """
+        manifest_path = Path(output_dir) / MANIFEST_FILENAME
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if isinstance(manifest.get('documents'), dict):
+                return manifest
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {'documents': {}}
+
+    def save_manifest(self, output_dir, manifest):
+        """
+        原子写入增量转换清单
+        """
+        manifest_path = Path(output_dir) / MANIFEST_FILENAME
+        temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, manifest_path)
+
+    def is_unchanged(self, file_path, entry, settings, output_dir):
+        """
+        判断文档自上次转换后是否未变化: 设置相同、输出仍在，且大小和修改时间相同；
+        大小或修改时间变化时再比较内容哈希(仅修改时间变化的文档无需重新转换)
+        """
+        if not entry or entry.get('settings') != settings:
+            return False
+        if not all((output_dir / name).exists() for name in entry.get('outputs', [])):
+            return False
+        
+        stat_result = file_path.stat()
+        if entry.get('size') == stat_result.st_size and entry.get('mtime_ns') == stat_result.st_mtime_ns:
+            return True
+        if entry.get('size') != stat_result.st_size:
+            return False
+        if self.hash_file(file_path) != entry.get('hash'):
+            return False
+        
+        entry['mtime_ns'] = stat_result.st_mtime_ns
+        return True
+
+    def referenced_outputs(self, manifest, exclude=None):
+        """
+        清单中除exclude外其他文档仍在使用的输出文件(资源文件可被多个文档共用)
+        """
+        return {output for name, entry in manifest['documents'].items() if name != exclude
+                for output in entry.get('outputs', [])}
+
+    def report_orphaned_outputs(self, manifest, word_files, output_dir):
+        """
+        报告源文件已被删除的输出文件，输出也已全部删除的记录从清单中移除
+        """
+        current_names = {file_path.name for file_path in word_files}
+        for name in sorted(set(manifest['documents']) - current_names):
+            in_use = self.referenced_outputs(manifest, exclude=name)
+            outputs = [output for output in manifest['documents'][name].get('outputs', [])
+                       if output not in in_use and (output_dir / output).exists()]
+            if outputs:
+                print(f"! 源文件已删除: {name}，遗留输出: {', '.join(outputs)}")
+            else:
+                del manifest['documents'][name]
+
+    def report_stale_outputs(self, manifest, name, outputs, output_dir):
+        """
+        报告文档重新转换后不再生成的旧输出(如减少的分块、拆分页面和不再引用的图片)
+        """
+        in_use = set(outputs) | self.referenced_outputs(manifest, exclude=name)
+        stale = [output for output in manifest['documents'].get(name, {}).get('outputs', [])
+                 if output not in in_use and (output_dir / output).exists()]
+        if stale:
+            print(f"! {name} 不再生成的旧输出: {', '.join(stale)}")
+
+    def batch_convert_word_files(self, input_dir=None, output_type='js', output_dir=None,
+                                 workers=1, incremental=False):
         """
         批量转换目录下的所有Word文档
+        workers: 并行转换的进程数，1为逐个转换，None为CPU核心数
+        incremental: 增量模式，根据输出目录中的清单跳过未变化的文档，并报告源文件已删除的输出
+        每个文件的转换结果保存在 self.last_batch_results 中(增量模式下跳过的文件结果为None)
         """
         if input_dir is None:
             input_dir = Path.cwd()
@@ -459,20 +1901,91 @@ span {
         # 支持的Word文档扩展名
         word_extensions = ['.docx']
         
-        converted_count = 0
-        total_count = 0
-        
         print(f"开始在目录 {input_dir} 中查找Word文档...")
         print(f"输出目录: {output_dir}")
         
-        # 确保CSS文件存在
+        # 确保CSS文件存在，只在此处生成一次，避免多个进程同时写入
         self.ensure_css_file(output_dir)
         
-        for file_path in input_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in word_extensions:
-                total_count += 1
-                if self.convert_word_to_file(file_path, output_type, output_dir):
-                    converted_count += 1
+        word_files = sorted(file_path for file_path in input_dir.iterdir()
+                            if file_path.is_file() and file_path.suffix.lower() in word_extensions)
+        total_count = len(word_files)
+        
+        # 增量模式: 跳过清单中记录的未变化文档
+        manifest = None
+        pending_files = word_files
+        if incremental:
+            manifest = self.load_manifest(output_dir)
+            settings = self.settings_fingerprint(output_type)
+            self.report_orphaned_outputs(manifest, word_files, output_dir)
+            pending_files = [file_path for file_path in word_files
+                             if not self.is_unchanged(file_path,
+                                                      manifest['documents'].get(file_path.name),
+                                                      settings, output_dir)]
+            skipped_count = total_count - len(pending_files)
+            if skipped_count:
+                print(f"跳过未变化的文档: {skipped_count} 个")
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending_files)))
+        
+        shared_styles = {}
+        outcomes = {}
+        if workers == 1:
+            for file_path in pending_files:
+                outcomes[file_path] = convert_batch_file(self, file_path, output_type, output_dir)
+        else:
+            print(f"使用 {workers} 个进程并行转换")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(convert_batch_file, self, file_path, output_type,
+                                           output_dir)
+                           for file_path in pending_files]
+                for file_path, future in zip(pending_files, futures):
+                    try:
+                        outcomes[file_path] = future.result()
+                    except Exception as e:
+                        print(f"✗ 转换失败 {file_path}: {str(e)}")
+                        outcomes[file_path] = (False, {}, [])
+        
+        results = []
+        for file_path in word_files:
+            if file_path not in outcomes:
+                results.append(None)
+                continue
+            success, styles, outputs = outcomes[file_path]
+            results.append(success)
+            shared_styles.update(styles)
+            
+            if manifest is not None:
+                if success:
+                    self.report_stale_outputs(manifest, file_path.name, outputs, output_dir)
+                    stat_result = file_path.stat()
+                    manifest['documents'][file_path.name] = {
+                        'size': stat_result.st_size,
+                        'mtime_ns': stat_result.st_mtime_ns,
+                        'hash': self.hash_file(file_path),
+                        'settings': settings,
+                        'outputs': outputs
+                    }
+                else:
+                    manifest['documents'].pop(file_path.name, None)
+        
+        if manifest is not None:
+            self.save_manifest(output_dir, manifest)
+        
+        # 共用样式类表在所有文档转换完成后统一写入一次
+        if self.intern_styles == 'shared':
+            self.write_interned_css(output_dir / SHARED_STYLES_CSS, shared_styles, merge=True)
+        
+        # 跨文档搜索索引由各文档的索引文件合并而成
+        if self.search_index:
+            self.write_combined_search_index(
+                output_dir, [file_path.stem for file_path, success in zip(word_files, results)
+                             if success is not False])
+        
+        self.last_batch_results = list(zip(word_files, results))
+        converted_count = sum(1 for success in results if success)
         
         print(f"\n转换完成: {converted_count}/{total_count} 个文件成功转换")
         print(f"输出目录: {output_dir}")
@@ -494,6 +2007,121 @@ span {
         print("2. JS文件需要通过HTML引入并调用CONTENT_DATA.content")
         print("3. HTML文件可以直接在浏览器中打开查看")
 
+def convert_batch_file(converter, file_path, output_type, output_dir):
+    """
+    批量转换中转换单个文件(可在子进程中运行)，返回(是否成功, 生成的样式类, 输出文件列表)
+    """
+    success = converter.convert_word_to_file(file_path, output_type, output_dir,
+                                             ensure_css=False)
+    return success, converter.document_styles, converter.document_outputs
+
+def add_converter_arguments(parser):
+    """
+    添加转换器设置相关的命令行参数
+    """
+    parser.add_argument('-t', '--type', default='js', choices=['js', 'html'],
+                        help='输出格式 (默认js)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='输出目录 (默认与输入相同)')
+    parser.add_argument('--engine', default='docx', choices=ENGINES,
+                        help='解析引擎，stream为流式解析超大文档 (默认docx)')
+    parser.add_argument('--intern-styles', default=None, choices=[mode for mode in INTERN_MODES if mode],
+                        help='将重复的内联样式合并为样式类，写入文档自己的或共用的CSS文件')
+    parser.add_argument('--no-normalize-runs', action='store_true',
+                        help='不合并格式相同的相邻文本片段 (旧行为)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='JS输出分块懒加载的每块字符数 (默认不分块)')
+    parser.add_argument('--chunk-files', action='store_true',
+                        help=f'首块以外的内容写入单独的JS文件按需加载 (未指定 --chunk-size 时每块{DEFAULT_CHUNK_SIZE}字符)')
+    parser.add_argument('--split-level', type=int, default=None, choices=range(1, 10), metavar='1-9',
+                        help='按不高于该级别的标题将文档拆分为多个页面并生成目录页')
+    parser.add_argument('--search-index', action='store_true',
+                        help='生成客户端搜索索引 <文档名>.search.json')
+    parser.add_argument('--extract-images', action='store_true',
+                        help='将内嵌图片提取到输出目录下的 assets 文件夹')
+    parser.add_argument('--minify', action='store_true',
+                        help='去掉输出模板中的缩进和换行')
+    parser.add_argument('--precompress', action='store_true',
+                        help='为每个输出文件同时生成 .gz 预压缩副本')
+
+
+def get_converter_options(args):
+    """
+    从命令行参数中提取转换器设置
+    """
+    chunk_size = args.chunk_size
+    if args.chunk_files and not chunk_size:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    return {
+        'engine': args.engine,
+        'intern_styles': args.intern_styles,
+        'normalize_runs': not args.no_normalize_runs,
+        'chunk_size': chunk_size,
+        'chunk_files': args.chunk_files,
+        'split_level': args.split_level,
+        'search_index': args.search_index,
+        'extract_images': args.extract_images,
+        'minify': args.minify,
+        'precompress': args.precompress,
+    }
+
+
+def build_arg_parser():
+    """
+    构建命令行参数解析器
+    """
+    parser = argparse.ArgumentParser(description="Word文档转HTML/JS转换器（不带参数运行时进入交互模式）")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    convert_parser = subparsers.add_parser('convert', help='转换单个Word文档')
+    convert_parser.add_argument('file', help='Word文档(.docx)')
+    add_converter_arguments(convert_parser)
+    
+    batch_parser = subparsers.add_parser('batch', help='批量转换目录下的所有Word文档')
+    batch_parser.add_argument('input_dir', help='包含Word文档的目录')
+    add_converter_arguments(batch_parser)
+    batch_parser.add_argument('--workers', type=int, default=None,
+                              help='并行转换的进程数，1为逐个转换 (默认等于CPU核心数)')
+    batch_parser.add_argument('--incremental', action='store_true',
+                              help='增量转换: 跳过清单中记录的未变化文档')
+    
+    css_parser = subparsers.add_parser('css', help='生成CSS文件')
+    css_parser.add_argument('-o', '--output', default=None,
+                            help='输出目录 (默认当前目录)')
+    
+    return parser
+
+
+def run_command(argv):
+    """
+    执行命令行子命令，返回退出码
+    """
+    args = build_arg_parser().parse_args(argv)
+    
+    if args.command == 'convert':
+        converter = WordToFileConverter(**get_converter_options(args))
+        output_dir = args.output or os.path.dirname(os.path.abspath(args.file))
+        return 0 if converter.convert_word_to_file(args.file, args.type, output_dir) else 1
+    
+    if args.command == 'batch':
+        converter = WordToFileConverter(**get_converter_options(args))
+        converted_count = converter.batch_convert_word_files(args.input_dir, args.type, args.output,
+                                                             workers=args.workers,
+                                                             incremental=args.incremental)
+        if converted_count is None:
+            return 1
+        return 0 if all(success is not False for _, success in converter.last_batch_results) else 1
+    
+    if args.command == 'css':
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+        WordToFileConverter().generate_css_file(Path(args.output) if args.output else None)
+        return 0
+    
+    build_arg_parser().print_help()
+    return 1
+
+
 def main():
     """
     主函数
@@ -505,6 +2133,10 @@ def main():
         print("请先安装 python-docx: pip install python-docx")
         exit(1)
     
+    # 带参数运行时执行命令行子命令
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
+    
     print("Word文档转文件转换器")
     print("=" * 50)
     
@@ -547,7 +2179,7 @@ def main():
             output_type = 'js' if format_choice == '1' else 'html'
             
             print(f"\n开始批量转换...")
-            converter.batch_convert_word_files(input_dir, output_type, output_dir)
+            converter.batch_convert_word_files(input_dir, output_type, output_dir, workers=None)
             
         elif choice == '2':
             print("\n请选择Word文档...")
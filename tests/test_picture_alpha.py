@@ -0,0 +1,66 @@
+import pytest
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def close_to(pixel, expected, tolerance=1):
+    return all(abs(a - b) <= tolerance for a, b in zip(pixel, expected))
+
+
+@pytest.mark.parametrize('background, expected', [((255, 255, 255), (255, 127, 127)),
+                                                  ((0, 0, 0), (128, 0, 0))])
+def test_rgba_is_blended_onto_background(background, expected):
+    img = Image.new('RGBA', (4, 4), (255, 0, 0, 255))
+    img.putpixel((0, 0), (255, 0, 0, 128))
+    img.putpixel((1, 0), (0, 255, 0, 0))
+
+    result = pbc.flatten_alpha(img, background)
+
+    assert result.mode == 'RGB'
+    assert close_to(result.getpixel((0, 0)), expected)
+    assert result.getpixel((1, 0)) == background
+    assert result.getpixel((2, 2)) == (255, 0, 0)
+
+
+def test_la_is_blended_as_grey():
+    img = Image.new('LA', (2, 1), (0, 255))
+    img.putpixel((1, 0), (0, 0))
+
+    result = pbc.flatten_alpha(img, '#336699')
+
+    assert result.mode == 'RGB'
+    assert result.getpixel((0, 0)) == (0, 0, 0)
+    assert result.getpixel((1, 0)) == (0x33, 0x66, 0x99)
+
+
+def test_palette_transparency_index_is_honoured():
+    img = Image.new('P', (2, 1))
+    img.putpalette([255, 0, 0, 0, 0, 255] + [0] * 762)
+    img.putpixel((0, 0), 0)
+    img.putpixel((1, 0), 1)
+    img.info['transparency'] = 1
+
+    result = pbc.flatten_alpha(img, (0, 255, 0))
+
+    assert result.getpixel((0, 0)) == (255, 0, 0)
+    assert result.getpixel((1, 0)) == (0, 255, 0)
+
+
+def test_opaque_images_are_returned_unchanged():
+    img = Image.new('RGB', (2, 2), 'blue')
+
+    assert pbc.flatten_alpha(img) is img
+
+
+def test_transparent_png_to_jpg_uses_background(tmp_path):
+    img = Image.new('RGBA', (8, 8), (0, 0, 0, 0))
+    img.save(tmp_path / 'clear.png')
+
+    ok, message = pbc.convert_image(str(tmp_path / 'clear.png'), str(tmp_path / 'out.jpg'), 'jpg',
+                                    background=(0, 0, 255))
+
+    assert ok, message
+    with Image.open(tmp_path / 'out.jpg') as output:
+        assert output.mode == 'RGB'
+        assert close_to(output.getpixel((4, 4)), (0, 0, 255), tolerance=4)
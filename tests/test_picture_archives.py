@@ -0,0 +1,44 @@
+import io
+import os
+import zipfile
+
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_archive_members_outside_output_folder_are_rejected(tmp_path):
+    input_folder = tmp_path / 'in'
+    output_folder = tmp_path / 'out' / 'images'
+    input_folder.mkdir()
+    output_folder.mkdir(parents=True)
+    with zipfile.ZipFile(input_folder / 'pack.zip', 'w') as archive:
+        for member in ('../escape.png', 'sub/../../escape2.png', '/absolute.png', 'C:drive.png',
+                       'sub/ok.png', './dot.png'):
+            archive.writestr(member, png_bytes('red'))
+
+    success, converted, _, error_count = pbc.process_images(str(input_folder), str(output_folder), 'webp')
+
+    assert success and converted == 2 and error_count == 0
+    written = sorted(os.path.relpath(os.path.join(root, name), tmp_path)
+                     for root, _, names in os.walk(tmp_path / 'out') for name in names)
+    assert written == [os.path.join('out', 'images', 'pack', 'dot.webp'),
+                       os.path.join('out', 'images', 'pack', 'sub', 'ok.webp')]
+
+
+def test_collect_sources_reports_rejected_members(tmp_path):
+    with zipfile.ZipFile(tmp_path / 'pack.zip', 'w') as archive:
+        archive.writestr('..\\escape.png', png_bytes('red'))
+        archive.writestr('ok.png', png_bytes('red'))
+
+    with pbc.contextlib.ExitStack() as stack:
+        sources, rejected = pbc.collect_sources(str(tmp_path), ['pack.zip'], stack)
+
+    assert [source['member'] for source in sources] == ['ok.png']
+    assert [name for name, _ in rejected] == ['pack.zip/..\\escape.png']
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def test_multi_page_tiff_output_is_written(tmp_path):
+    pages = [Image.new('RGB', (8, 8), color) for color in ('red', 'green')]
+    output = tmp_path / 'pages.tiff'
+
+    pbc.save_output(pages[0], str(output), 'TIFF', {'save_all': True, 'append_images': pages[1:]})
+
+    with Image.open(output) as img:
+        assert img.n_frames == 2
+    assert os.listdir(tmp_path) == ['pages.tiff']
+
+
+def test_failed_write_leaves_no_files(tmp_path):
+    output = tmp_path / 'out.png'
+
+    with pytest.raises(RuntimeError):
+        with pbc.atomic_output(str(output)) as fp:
+            fp.write(b'partial')
+            raise RuntimeError('encoder failed')
+
+    assert os.listdir(tmp_path) == []
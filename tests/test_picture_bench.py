@@ -0,0 +1,44 @@
+import csv
+import filecmp
+
+import Picture_Batch_Conv as pbc
+
+
+def test_generated_corpus_is_deterministic(tmp_path, monkeypatch):
+    monkeypatch.setitem(pbc.BENCH_CORPORA, 'photo', {'count': 2, 'size': (48, 32)})
+
+    first = pbc.generate_bench_corpus(str(tmp_path / 'a'), ['photo'], ('png', 'jpg'))
+    second = pbc.generate_bench_corpus(str(tmp_path / 'b'), ['photo'], ('png', 'jpg'))
+
+    assert sorted(first) == [('photo', 'jpg'), ('photo', 'png')]
+    for key, paths in first.items():
+        assert len(paths) == 2
+        for path_a, path_b in zip(paths, second[key]):
+            assert filecmp.cmp(path_a, path_b, shallow=False)
+
+
+def test_run_benchmark_writes_one_csv_row_per_pair(tmp_path, monkeypatch, capsys):
+    monkeypatch.setitem(pbc.BENCH_CORPORA, 'icons', {'count': 3, 'size': (16, 16)})
+    results_path = tmp_path / 'results.csv'
+    formats = ('png', 'bmp')
+
+    rows = pbc.run_benchmark(str(tmp_path / 'corpus'), str(results_path), ['icons'], formats)
+
+    lines = results_path.read_text(encoding='utf-8').splitlines()
+    assert lines[0].startswith('# python=') and 'preset=default' in lines[0]
+    written = list(csv.DictReader(lines[1:]))
+    assert list(written[0]) == pbc.BENCH_COLUMNS
+    assert [(row['source'], row['target']) for row in written] == [
+        ('png', 'png'), ('png', 'bmp'), ('bmp', 'png'), ('bmp', 'bmp')]
+    assert all(row['images'] == '3' and row['failures'] == '0' for row in written)
+    assert all(float(row['megapixels']) == round(3 * 16 * 16 / 1e6, 3) for row in written)
+    assert len(rows) == 4
+    assert not (tmp_path / 'corpus' / '_output').exists()
+
+    loaded = pbc.load_bench_results(str(results_path))
+    assert loaded[('icons', 'png', 'bmp')]['output_bytes'] == str(rows[1]['output_bytes'])
+
+    capsys.readouterr()
+    pbc.run_benchmark(str(tmp_path / 'corpus'), str(tmp_path / 'again.csv'), ['icons'], formats,
+                      compare=str(results_path))
+    assert 'icons png -> bmp: MP/s' in capsys.readouterr().out
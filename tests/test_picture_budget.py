@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import random
+
+import pytest
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def make_noisy_image(mode='RGB', size=(160, 120), seed=7):
+    rng = random.Random(seed)
+    img = Image.frombytes(mode, size, bytes(rng.randrange(256) for _ in range(size[0] * size[1] * len(mode))))
+    return img
+
+
+def encode_serially(img, pil_format, save_kwargs):
+    buffer = io.BytesIO()
+    img.copy().save(buffer, format=pil_format, **save_kwargs)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('target_format', ['jpg', 'webp'])
+@pytest.mark.parametrize('mode', ['RGB', 'RGBA'])
+def test_reported_quality_matches_serial_encode(tmp_path, target_format, mode):
+    source = tmp_path / 'source.png'
+    make_noisy_image(mode).save(source)
+    pil_format, _ = pbc.SUPPORTED_FORMATS[target_format]
+    max_bytes = len(encode_serially(pbc.prepare_image(make_noisy_image(mode), target_format), pil_format,
+                                    {'quality': 60}))
+
+    for attempt in range(5):
+        output = tmp_path / f'out{attempt}.{target_format}'
+        info = {}
+        ok, message = pbc.convert_image(str(source), str(output), target_format, max_bytes=max_bytes, info=info)
+        assert ok, message
+
+        with Image.open(source) as img:
+            prepared = pbc.prepare_image(img, target_format)
+            save_kwargs = pbc.get_save_kwargs(target_format)
+            save_kwargs.pop('lossless', None)
+            expected = encode_serially(prepared, pil_format, dict(save_kwargs, quality=info['quality']))
+
+        assert info['budget_met']
+        assert info['output_bytes'] == len(expected) == output.stat().st_size
+        assert output.read_bytes() == expected
+
+
+def test_search_quality_leaves_source_settings_untouched():
+    img = make_noisy_image()
+    img.load()
+
+    quality, data = pbc.search_quality(img, 'JPEG', {}, 6000)
+
+    assert 'quality' not in getattr(img, 'encoderinfo', {})
+    assert encode_serially(img, 'JPEG', {'quality': quality}) == data
+
+
+def test_search_palette_matches_serial_encode():
+    img = make_noisy_image()
+    img.load()
+
+    colors, data = pbc.search_palette(img, {}, 12000)
+
+    assert colors is not None
+    assert encode_serially(pbc.quantize_image(img, colors), 'PNG', {}) == data
+    assert getattr(img, 'encoderinfo', {}) == {}
+
+
+def test_timing_records_and_reports_carry_budget_results(tmp_path):
+    input_folder = tmp_path / 'in'
+    input_folder.mkdir()
+    make_noisy_image().save(input_folder / 'noisy.png')
+    output_folder = tmp_path / 'out'
+    output_folder.mkdir()
+
+    for target_format, field in (('jpg', 'quality'), ('png', 'colors')):
+        records = []
+        report = tmp_path / f'{target_format}.csv'
+        pbc.process_images(str(input_folder), str(output_folder), target_format, max_bytes=12000,
+                           workers=1, on_image=records.append, report=str(report))
+
+        record, = records
+        other = 'colors' if field == 'quality' else 'quality'
+        assert isinstance(record[field], int) and record[other] is None
+        assert record['budget_met'] is True
+
+        with open(report, encoding='utf-8-sig', newline='') as f:
+            row, = csv.DictReader(f)
+        assert row[field] == str(record[field]) and row[other] == ''
+        assert row['budget_met'] == 'True'
+
+    records = []
+    pbc.process_images(str(input_folder), str(output_folder), 'jpg', workers=1, on_image=records.append)
+    assert (records[0]['quality'], records[0]['colors'], records[0]['budget_met']) == (None, None, None)
+
+
+def test_json_report_includes_budget_fields(tmp_path):
+    input_folder = tmp_path / 'in'
+    input_folder.mkdir()
+    make_noisy_image().save(input_folder / 'noisy.png')
+    output_folder = tmp_path / 'out'
+    output_folder.mkdir()
+    report = tmp_path / 'report.json'
+
+    pbc.process_images(str(input_folder), str(output_folder), 'webp', max_bytes=100, workers=1,
+                       report=str(report))
+
+    image, = json.loads(report.read_text(encoding='utf-8'))['images']
+    assert image['quality'] == pbc.BUDGET_QUALITY_RANGE[0] and image['colors'] is None
+    assert image['budget_met'] is False
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def make_inputs(folder):
+    folder.mkdir()
+    Image.new('RGB', (16, 16), 'red').save(folder / 'a.png')
+    Image.new('RGB', (16, 16), 'blue').save(folder / 'b.png')
+    for name in ('a_copy.png', 'a_copy2.png'):
+        (folder / name).write_bytes((folder / 'a.png').read_bytes())
+
+
+@pytest.mark.parametrize('dedup', pbc.DEDUP_MODES)
+def test_identical_inputs_are_converted_once(tmp_path, monkeypatch, dedup):
+    make_inputs(tmp_path / 'in')
+    output_folder = tmp_path / 'out'
+    output_folder.mkdir()
+    converted = []
+    original = pbc.convert_image
+
+    def counting_convert(input_path, *args, **kwargs):
+        converted.append(os.path.basename(str(getattr(input_path, 'name', input_path))))
+        return original(input_path, *args, **kwargs)
+
+    monkeypatch.setattr(pbc, 'convert_image', counting_convert)
+    success, processed, _, error_count = pbc.process_images(str(tmp_path / 'in'), str(output_folder), 'webp',
+                                                            dedup=dedup)
+
+    assert success and processed == 4 and error_count == 0
+    assert len(converted) == 2
+    outputs = {name: (output_folder / name) for name in ('a.webp', 'a_copy.webp', 'a_copy2.webp', 'b.webp')}
+    assert all(path.exists() for path in outputs.values())
+    assert outputs['a_copy.webp'].read_bytes() == outputs['a.webp'].read_bytes()
+    assert outputs['b.webp'].read_bytes() != outputs['a.webp'].read_bytes()
+    linked = os.path.samefile(outputs['a.webp'], outputs['a_copy2.webp'])
+    assert linked == (dedup == 'hardlink')
@@ -0,0 +1,115 @@
+import pytest
+from PIL import Image, ImageSequence
+
+import Picture_Batch_Conv as pbc
+
+DURATIONS = [100, 250, 400]
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+
+def make_frames():
+    return [Image.new('RGB', (16, 16), color) for color in COLORS]
+
+
+def read_durations(path):
+    with Image.open(path) as img:
+        durations = []
+        for frame in ImageSequence.Iterator(img):
+            frame.load()
+            durations.append(frame.info.get('duration'))
+        return durations
+
+
+def test_gif_animation_keeps_per_frame_durations(tmp_path):
+    source = tmp_path / 'anim.gif'
+    first, *rest = make_frames()
+    first.save(source, save_all=True, append_images=rest, duration=DURATIONS, loop=0)
+
+    for target_format in ('webp', 'png'):
+        output = tmp_path / f'anim.{target_format}'
+        info = {}
+        ok, message = pbc.convert_image(str(source), str(output), target_format, info=info)
+
+        assert ok, message
+        assert info['outputs'] == [str(output)]
+        assert read_durations(output) == DURATIONS
+
+
+def test_webp_animation_to_apng_keeps_durations(tmp_path):
+    source = tmp_path / 'anim.webp'
+    first, *rest = make_frames()
+    first.save(source, save_all=True, append_images=rest, duration=DURATIONS, lossless=True)
+
+    ok, message = pbc.convert_image(str(source), str(tmp_path / 'anim.png'), 'png')
+
+    assert ok, message
+    assert read_durations(tmp_path / 'anim.png') == DURATIONS
+
+
+def test_multi_page_tiff_writes_one_output_per_page(tmp_path):
+    source = tmp_path / 'pages.tif'
+    first, *rest = make_frames()
+    first.save(source, save_all=True, append_images=rest)
+
+    for target_format in ('png', 'webp'):
+        info = {}
+        ok, message = pbc.convert_image(str(source), str(tmp_path / f'pages.{target_format}'), target_format,
+                                        info=info)
+
+        assert ok, message
+        assert len(info['outputs']) == len(COLORS)
+        for path, color in zip(info['outputs'], COLORS):
+            with Image.open(path) as page:
+                assert getattr(page, 'n_frames', 1) == 1
+                pixel = page.convert('RGB').getpixel((0, 0))
+                assert all(abs(a - b) <= 4 for a, b in zip(pixel, color))
+
+
+def test_multi_page_tiff_to_tiff_stays_one_file(tmp_path):
+    source = tmp_path / 'pages.tif'
+    first, *rest = make_frames()
+    first.save(source, save_all=True, append_images=rest)
+
+    info = {}
+    ok, message = pbc.convert_image(str(source), str(tmp_path / 'out.tiff'), 'tiff', info=info)
+
+    assert ok, message
+    assert info['outputs'] == [str(tmp_path / 'out.tiff')]
+    with Image.open(tmp_path / 'out.tiff') as img:
+        assert img.n_frames == len(COLORS)
+
+
+def save_animation(path, **kwargs):
+    first, *rest = make_frames()
+    first.save(path, save_all=True, append_images=rest, duration=DURATIONS, **kwargs)
+    return path
+
+
+def fail(*args, **kwargs):
+    raise AssertionError('读取帧时长时不应定位或解码帧')
+
+
+@pytest.mark.parametrize('name, kwargs', [('anim.gif', {'loop': 0}), ('anim.png', {}),
+                                          ('anim.webp', {'lossless': True})])
+def test_frame_durations_are_read_from_headers(tmp_path, name, kwargs):
+    source = save_animation(tmp_path / name, **kwargs)
+
+    with Image.open(source) as img:
+        assert img.n_frames == len(DURATIONS)
+        position = img.fp.tell()
+        img.seek = img.load = fail
+        durations = pbc.read_frame_durations(img)
+        # 解码器后续仍从原位置读取
+        assert img.fp.tell() == position
+
+    assert type(durations) is list
+    assert durations == DURATIONS
+
+
+def test_frame_durations_fall_back_to_seeking(tmp_path, monkeypatch):
+    source = save_animation(tmp_path / 'anim.gif', loop=0)
+    monkeypatch.setattr(pbc, 'FRAME_DURATION_READERS', {})
+
+    with Image.open(source) as img:
+        assert pbc.read_frame_durations(img) == DURATIONS
+        assert img.tell() == 0
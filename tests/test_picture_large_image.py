@@ -0,0 +1,123 @@
+import struct
+import warnings
+import zlib
+
+import pytest
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def make_image(path, size=(64, 48)):
+    Image.new('RGB', size, (200, 30, 30)).save(path)
+    return path
+
+
+def test_large_image_restores_pixel_limit(tmp_path, monkeypatch):
+    source = make_image(tmp_path / 'big.png')
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+
+    ok, message = pbc.convert_image(str(source), str(tmp_path / 'big.bmp'), 'bmp', large_image=True)
+
+    assert ok, message
+    assert Image.MAX_IMAGE_PIXELS == 1000
+
+
+def test_normal_mode_still_refuses_bomb_after_large_image(tmp_path, monkeypatch):
+    source = make_image(tmp_path / 'big.png')
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    pbc.convert_image(str(source), str(tmp_path / 'large.bmp'), 'bmp', large_image=True)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        ok, _ = pbc.convert_image(str(source), str(tmp_path / 'normal.bmp'), 'bmp')
+
+    assert not ok
+    assert not (tmp_path / 'normal.bmp').exists()
+
+
+def test_large_image_batch_restores_pixel_limit(tmp_path, monkeypatch):
+    input_folder = tmp_path / 'in'
+    input_folder.mkdir()
+    make_image(input_folder / 'a.png')
+    make_image(input_folder / 'b.png')
+    (tmp_path / 'out').mkdir()
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+
+    pbc.process_images(str(input_folder), str(tmp_path / 'out'), 'bmp', large_image=True, workers=2)
+
+    assert Image.MAX_IMAGE_PIXELS == 1000
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == ['a.bmp', 'b.bmp']
+
+
+def test_nested_unlimited_pixels_restores_once(monkeypatch):
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1234)
+    with pbc.unlimited_pixels():
+        with pbc.unlimited_pixels():
+            assert Image.MAX_IMAGE_PIXELS is None
+        assert Image.MAX_IMAGE_PIXELS is None
+    assert Image.MAX_IMAGE_PIXELS == 1234
+
+
+def write_tiled_tiff(path, image, tile=16, compression=1):
+    """写出RGB分块TIFF，边缘分块的填充区域填入与图片无关的颜色"""
+    width, height = image.size
+    tiles = []
+    for y in range(0, height, tile):
+        for x in range(0, width, tile):
+            padded = Image.new('RGB', (tile, tile), (0, 255, 0))
+            padded.paste(image.crop((x, y, min(x + tile, width), min(y + tile, height))), (0, 0))
+            data = padded.tobytes()
+            tiles.append(zlib.compress(data) if compression == 8 else data)
+
+    def entries(tile_offsets):
+        return [(256, 'I', [width]), (257, 'I', [height]), (258, 'H', [8, 8, 8]),
+                (259, 'H', [compression]), (262, 'H', [2]), (277, 'H', [3]), (284, 'H', [1]),
+                (322, 'H', [tile]), (323, 'H', [tile]), (324, 'I', tile_offsets),
+                (325, 'I', [len(data) for data in tiles])]
+
+    def build(tile_offsets):
+        # IFD紧跟文件头，超过4字节的取值放在IFD之后，分块数据放在最后
+        fields = entries(tile_offsets)
+        extra_offset = 8 + 2 + len(fields) * 12 + 4
+        ifd, extra = struct.pack('<H', len(fields)), b''
+        for tag, code, values in fields:
+            packed = struct.pack('<' + code * len(values), *values)
+            field_type = 3 if code == 'H' else 4
+            if len(packed) <= 4:
+                ifd += struct.pack('<HHI', tag, field_type, len(values)) + packed.ljust(4, b'\0')
+            else:
+                ifd += struct.pack('<HHII', tag, field_type, len(values), extra_offset + len(extra))
+                extra += packed
+        return b'II*\0' + struct.pack('<I', 8) + ifd + struct.pack('<I', 0) + extra
+
+    header_size = len(build([0] * len(tiles)))
+    tile_offsets = [header_size + sum(len(data) for data in tiles[:index]) for index in range(len(tiles))]
+    path.write_bytes(build(tile_offsets) + b''.join(tiles))
+    return path
+
+
+def make_pattern(size):
+    image = Image.new('RGB', size)
+    image.putdata([(x * 9 % 256, y * 7 % 256, (x + y) % 256)
+                   for y in range(size[1]) for x in range(size[0])])
+    return image
+
+
+@pytest.mark.parametrize('size', [(10, 20), (16, 16), (21, 35)])
+@pytest.mark.parametrize('compression', [1, 8])
+@pytest.mark.parametrize('target_format', ['png', 'bmp'])
+def test_tiled_tiff_bands_are_cropped_to_image(tmp_path, size, compression, target_format):
+    expected = make_pattern(size)
+    source = write_tiled_tiff(tmp_path / 'tiled.tif', expected, compression=compression)
+    with Image.open(source) as img:
+        assert img.tag_v2[322] == 16 and pbc.get_tiff_bands(img)
+        assert img.convert('RGB').tobytes() == expected.tobytes()
+
+    output = tmp_path / f'out.{target_format}'
+    ok, message = pbc.convert_large_image(str(source), str(output), target_format)
+
+    assert ok, message
+    with Image.open(output) as result:
+        assert result.size == size
+        assert result.convert('RGB').tobytes() == expected.tobytes()
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+from PIL import Image, ImageChops
+
+import Picture_Batch_Conv as pbc
+
+
+def make_few_colors(mode, count, size=(32, 32), seed=3):
+    rng = random.Random(seed)
+    palette = [tuple(rng.randrange(256) for _ in mode) for _ in range(count)]
+    img = Image.new(mode, size)
+    img.putdata([palette[rng.randrange(count)] for _ in range(size[0] * size[1])])
+    return img
+
+
+def same_pixels(a, b):
+    return ImageChops.difference(a, b).getbbox() is None
+
+
+@pytest.mark.parametrize('mode', ['RGB', 'RGBA'])
+@pytest.mark.parametrize('count', [2, 37, 256])
+def test_palettize_lossless_keeps_every_pixel(mode, count):
+    img = make_few_colors(mode, count)
+
+    palettized = pbc.palettize_lossless(img, 256)
+
+    assert palettized.mode == 'P'
+    assert same_pixels(palettized.convert(mode), img)
+
+
+def test_palettize_lossless_refuses_too_many_colors():
+    assert pbc.palettize_lossless(make_few_colors('RGB', 300, size=(64, 64)), 256) is None
+
+
+def test_reduce_palette_quantizes_when_lossless_is_impossible():
+    info = {}
+    img = make_few_colors('RGB', 300, size=(64, 64))
+
+    palettized = pbc.reduce_palette(img, 16, info=info)
+
+    assert palettized.mode == 'P'
+    assert info == {'palette_lossless': False, 'palette_colors': info['palette_colors']}
+    assert info['palette_colors'] <= 16
+
+
+def test_quantize_keeps_transparency():
+    img = make_few_colors('RGBA', 300, size=(64, 64))
+    img.paste((10, 20, 30, 0), (0, 0, 16, 16))
+
+    quantized = pbc.quantize_image(img, 64, dither=True, quantizer='mediancut')
+
+    assert quantized.convert('RGBA').getpixel((8, 8))[3] <= 8
+
+
+@pytest.mark.parametrize('target_format', ['png', 'webp'])
+def test_palette_output_is_lossless_for_few_colors(tmp_path, target_format):
+    img = make_few_colors('RGB', 20)
+    img.save(tmp_path / 'few.png')
+    info = {}
+
+    ok, message = pbc.convert_image(str(tmp_path / 'few.png'), str(tmp_path / f'out.{target_format}'),
+                                    target_format, preset='lossless', palette=256, info=info)
+
+    assert ok, message
+    assert info['palette_lossless'] and info['palette_colors'] == 20
+    with Image.open(tmp_path / f'out.{target_format}') as output:
+        assert same_pixels(output.convert('RGB'), img)
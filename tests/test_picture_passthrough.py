@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def fail(*args):
+    raise OSError('unsupported')
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'src.bin'
+    path.write_bytes(b'image data' * 100)
+    return path
+
+
+def test_auto_falls_back_from_reflink_to_copy_range(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(pbc, 'reflink_file', fail)
+
+    assert pbc.passthrough_file(str(source), str(tmp_path / 'dst.bin')) == 'copy_range'
+    assert (tmp_path / 'dst.bin').read_bytes() == source.read_bytes()
+
+
+def test_auto_falls_back_to_plain_copy(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(pbc, 'reflink_file', fail)
+    monkeypatch.setattr(pbc, 'copy_range_file', fail)
+
+    assert pbc.passthrough_file(str(source), str(tmp_path / 'dst.bin')) == 'copy'
+    assert (tmp_path / 'dst.bin').read_bytes() == source.read_bytes()
+    assert os.stat(tmp_path / 'dst.bin').st_mtime == pytest.approx(os.stat(source).st_mtime)
+
+
+def test_explicit_mode_failure_raises_and_cleans_up(tmp_path, source, monkeypatch):
+    def partial_copy(src, dst):
+        open(dst, 'wb').close()
+        raise OSError('copy_file_range failed')
+
+    monkeypatch.setattr(pbc, 'copy_range_file', partial_copy)
+
+    with pytest.raises(OSError):
+        pbc.passthrough_file(str(source), str(tmp_path / 'dst.bin'), 'copy_range')
+    assert not (tmp_path / 'dst.bin').exists()
+
+
+def test_hardlink_mode_links_the_source(tmp_path, source):
+    assert pbc.passthrough_file(str(source), str(tmp_path / 'dst.bin'), 'hardlink') == 'hardlink'
+
+    assert os.path.samefile(source, tmp_path / 'dst.bin')
+
+
+def test_existing_hardlink_output_is_replaced_without_truncating_source(tmp_path, source):
+    os.link(source, tmp_path / 'dst.bin')
+    original = source.read_bytes()
+
+    pbc.passthrough_file(str(source), str(tmp_path / 'dst.bin'), 'copy')
+
+    assert source.read_bytes() == original == (tmp_path / 'dst.bin').read_bytes()
+    assert not os.path.samefile(source, tmp_path / 'dst.bin')
+
+
+def test_same_path_is_rejected(source):
+    with pytest.raises(shutil.SameFileError):
+        pbc.passthrough_file(str(source), str(source))
+
+
+def test_jpeg_extensions_are_the_same_format():
+    assert pbc.is_same_format('JPEG', 'jpg')
+    assert pbc.is_same_format('JPEG', 'jpe')
+    assert pbc.is_same_format('TIFF', 'tif')
+    assert not pbc.is_same_format('PNG', 'webp')
+
+
+def test_same_format_batch_copies_bytes_unchanged(tmp_path):
+    input_folder = tmp_path / 'in'
+    output_folder = tmp_path / 'out'
+    input_folder.mkdir()
+    output_folder.mkdir()
+    Image.new('RGB', (16, 16), 'green').save(input_folder / 'photo.jpeg', quality=70)
+    Image.new('RGB', (16, 16), 'green').save(input_folder / 'icon.png')
+
+    success, _, _, error_count = pbc.process_images(str(input_folder), str(output_folder), 'jpg',
+                                                    passthrough='copy')
+
+    assert success and error_count == 0
+    assert (output_folder / 'photo.jpg').read_bytes() == (input_folder / 'photo.jpeg').read_bytes()
+    with Image.open(output_folder / 'icon.jpg') as converted:
+        assert converted.format == 'JPEG'
@@ -0,0 +1,52 @@
+import pytest
+from PIL import Image, ImageFile
+
+import Picture_Batch_Conv as pbc
+
+
+@pytest.mark.parametrize('pil_format, extension', [('PNG', 'png'), ('JPEG', 'jpg'), ('TIFF', 'tif'),
+                                                   ('BMP', 'bmp'), ('WEBP', 'webp'), ('GIF', 'gif')])
+def test_sniff_format_recognises_real_headers(tmp_path, pil_format, extension):
+    path = tmp_path / f'image.{extension}'
+    Image.new('RGB', (4, 4)).save(path, pil_format)
+
+    assert pbc.sniff_format(path.read_bytes()[:16]) == pil_format
+
+
+def test_sniff_format_rejects_unknown_headers():
+    assert pbc.sniff_format(b'%PDF-1.7\n') is None
+    assert pbc.sniff_format(b'RIFF\x00\x00\x00\x00WAVE') is None
+
+
+def test_prefilter_rejects_bad_files_and_orders_largest_first(tmp_path):
+    Image.new('RGB', (10, 10)).save(tmp_path / 'small.png')
+    Image.new('RGB', (40, 30)).save(tmp_path / 'large.png')
+    # 扩展名与内容不符时以文件内容为准
+    Image.new('RGB', (20, 20)).save(tmp_path / 'medium.png', 'JPEG')
+    (tmp_path / 'text.png').write_text('not an image')
+    (tmp_path / 'broken.png').write_bytes((tmp_path / 'small.png').read_bytes()[:20])
+    Image.new('RGB', (100, 100)).save(tmp_path / 'huge.png')
+    files = ['small.png', 'large.png', 'medium.png', 'text.png', 'broken.png', 'huge.png']
+
+    with pbc.contextlib.ExitStack() as stack:
+        sources, _ = pbc.collect_sources(str(tmp_path), files, stack)
+        jobs, rejected = pbc.prefilter_images(sources, max_pixels=50 * 50)
+
+    assert [job['name'] for job in jobs] == ['large.png', 'medium.png', 'small.png']
+    assert jobs[1]['format'] == 'JPEG'
+    assert (jobs[0]['width'], jobs[0]['height']) == (40, 30)
+    assert sorted(name for name, _ in rejected) == ['broken.png', 'huge.png', 'text.png']
+
+
+def test_prefilter_does_not_decode_pixels(tmp_path, monkeypatch):
+    Image.new('RGB', (10, 10)).save(tmp_path / 'a.png')
+
+    def no_load(self):
+        raise AssertionError('prefilter decoded pixel data')
+
+    monkeypatch.setattr(ImageFile.ImageFile, 'load', no_load)
+    with pbc.contextlib.ExitStack() as stack:
+        sources, _ = pbc.collect_sources(str(tmp_path), ['a.png'], stack)
+        jobs, rejected = pbc.prefilter_images(sources)
+
+    assert [job['name'] for job in jobs] == ['a.png'] and rejected == []
@@ -0,0 +1,61 @@
+from PIL import Image, ImageChops
+
+import Picture_Batch_Conv as pbc
+
+
+def make_gradient(path, size=(64, 48)):
+    img = Image.linear_gradient('L').resize(size).convert('RGB')
+    img.save(path)
+    return img
+
+
+def test_every_preset_covers_every_output_format():
+    pil_formats = {pil_format for pil_format, _ in pbc.SUPPORTED_FORMATS.values()}
+
+    for name, preset in pbc.ENCODER_PRESETS.items():
+        assert set(preset) == pil_formats, name
+        assert name in pbc.PRESET_DESCRIPTIONS
+
+
+def test_default_preset_keeps_previous_settings():
+    assert pbc.get_save_kwargs('webp') == {'quality': 80}
+    assert pbc.get_save_kwargs('jpg') == {'quality': 95}
+    assert pbc.get_save_kwargs('png') == {}
+
+
+def test_get_save_kwargs_returns_a_copy():
+    pbc.get_save_kwargs('jpg', 'smallest')['quality'] = 1
+
+    assert pbc.ENCODER_PRESETS['smallest']['JPEG']['quality'] == 85
+
+
+def test_lossless_preset_round_trips_webp(tmp_path):
+    source = make_gradient(tmp_path / 'gradient.png')
+
+    ok, message = pbc.convert_image(str(tmp_path / 'gradient.png'), str(tmp_path / 'out.webp'), 'webp', 'lossless')
+
+    assert ok, message
+    with Image.open(tmp_path / 'out.webp') as output:
+        assert ImageChops.difference(output.convert('RGB'), source).getbbox() is None
+
+
+def test_calibrate_presets_measures_each_requested_preset(tmp_path):
+    for index in range(3):
+        make_gradient(tmp_path / f'sample{index}.png', size=(64 + index * 8, 48))
+    (tmp_path / 'notes.txt').write_text('not an image')
+
+    results = pbc.calibrate_presets(str(tmp_path), 'png', sample_size=2, presets=['fastest', 'smallest'])
+
+    assert set(results) == {'fastest', 'smallest'}
+    for item in results.values():
+        assert item['count'] == 2 and item['bytes'] > 0 and item['seconds'] >= 0
+    assert results['smallest']['bytes'] <= results['fastest']['bytes']
+
+
+def test_calibrate_command_exit_codes(tmp_path):
+    make_gradient(tmp_path / 'sample.png')
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+
+    assert pbc.run_command(['calibrate', str(tmp_path), '-f', 'webp', '-p', 'default']) == 0
+    assert pbc.run_command(['calibrate', str(empty), '-f', 'webp']) == 1
@@ -0,0 +1,110 @@
+import csv
+import json
+
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+def make_record(name, total, status='converted', megapixels=1.0):
+    record = {field: None for field in pbc.TIMING_REPORT_FIELDS}
+    record.update(name=name, status=status, input_bytes=100, output_bytes=40, megapixels=megapixels)
+    for stage in pbc.TIMING_STAGES:
+        record[stage] = 0.0
+    record['encode'] = record['total'] = total
+    return record
+
+
+def make_records():
+    # 总耗时 0.01 ~ 1.00 秒各一张，另有失败和直通的文件不计入汇总
+    records = [make_record(f'{index:03d}.png', index / 100) for index in range(1, 101)]
+    records.append(make_record('failed.png', 50.0, status='failed'))
+    records.append(make_record('copied.jpg', 40.0, status='passthrough'))
+    return records
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_percentile_uses_nearest_rank():
+    values = [index / 100 for index in range(100, 0, -1)]
+
+    assert [pbc.percentile(values, percent) for percent in (50, 95, 99, 100)] == [0.5, 0.95, 0.99, 1.0]
+    assert pbc.percentile([3.0], 50) == 3.0
+    assert pbc.percentile([], 95) == 0.0
+
+
+def test_summarize_timings_counts_only_converted_images():
+    summary = pbc.summarize_timings(make_records(), wall_time=20.0, top=3)
+
+    assert summary['images'] == 100
+    assert summary['megapixels'] == 100.0
+    assert summary['mp_per_second'] == 5.0
+    assert summary['mp_per_busy_second'] == round(100 / 50.5, 3)
+    assert summary['input_bytes'] == 10000 and summary['output_bytes'] == 4000
+    assert summary['stages']['total'] == {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+    assert summary['stages']['encode'] == summary['stages']['total']
+    assert summary['stages']['decode'] == {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    assert [record['name'] for record in summary['slowest']] == ['100.png', '099.png', '098.png']
+
+
+def test_summarize_timings_without_images():
+    summary = pbc.summarize_timings([make_record('failed.png', 1.0, status='failed')], wall_time=0.0)
+
+    assert summary['images'] == 0
+    assert summary['mp_per_second'] == summary['mp_per_busy_second'] == 0.0
+    assert summary['slowest'] == []
+
+
+def test_json_report_contains_records_and_summary(tmp_path):
+    records = make_records()
+    summary = pbc.summarize_timings(records, wall_time=20.0, top=2)
+    report = tmp_path / 'reports' / 'timing.json'
+
+    assert pbc.write_timing_report(str(report), records, summary) == [str(report)]
+
+    data = json.loads(report.read_text(encoding='utf-8'))
+    assert data == {'summary': summary, 'images': records}
+    assert sorted(path.name for path in report.parent.iterdir()) == ['timing.json']
+
+
+def test_csv_report_writes_summary_next_to_records(tmp_path):
+    records = make_records()
+    summary = pbc.summarize_timings(records, wall_time=20.0, top=2)
+    report = tmp_path / 'timing.csv'
+
+    written = pbc.write_timing_report(str(report), records, summary)
+
+    summary_path = tmp_path / 'timing.summary.csv'
+    assert written == [str(report), str(summary_path)]
+    header, *rows = read_csv(report)
+    assert header == list(pbc.TIMING_REPORT_FIELDS)
+    assert len(rows) == len(records)
+    assert dict(zip(header, rows[-1]))['status'] == 'passthrough'
+
+    header, *rows = read_csv(summary_path)
+    metrics = dict(rows)
+    assert header == ['metric', 'value']
+    assert len(metrics) == len(rows)
+    assert metrics['images'] == '100' and metrics['mp_per_second'] == '5.0'
+    assert (metrics['total_p50'], metrics['total_p95'], metrics['total_p99']) == ('0.5', '0.95', '0.99')
+    assert metrics['slowest_1_name'] == '100.png' and metrics['slowest_2_total'] == '0.99'
+    assert 'slowest_3_name' not in metrics
+
+
+def test_batch_report_option_writes_csv_summary(tmp_path):
+    input_folder = tmp_path / 'in'
+    input_folder.mkdir()
+    for name in ('a', 'b'):
+        Image.new('RGB', (40, 30), 'red').save(input_folder / f'{name}.png')
+    output_folder = tmp_path / 'out'
+    output_folder.mkdir()
+
+    pbc.process_images(str(input_folder), str(output_folder), 'bmp', workers=1,
+                       report=str(tmp_path / 'report.csv'))
+
+    metrics = dict(read_csv(tmp_path / 'report.summary.csv')[1:])
+    assert metrics['images'] == '2' and metrics['megapixels'] == '0.002'
+    assert len(read_csv(tmp_path / 'report.csv')) == 3
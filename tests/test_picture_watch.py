@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from PIL import Image
+
+import Picture_Batch_Conv as pbc
+
+
+class FakeClock:
+    """代替监视循环中的 time 模块：每次 sleep 推进时钟并执行预设的操作，操作用完后模拟 Ctrl+C"""
+
+    def __init__(self, actions):
+        self.now = 0.0
+        self.actions = list(actions)
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if not self.actions:
+            raise KeyboardInterrupt
+        self.now += seconds
+        self.actions.pop(0)()
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def folders(tmp_path):
+    paths = {name: tmp_path / name for name in ('in', 'out', 'done')}
+    for path in paths.values():
+        path.mkdir()
+    return paths
+
+
+def run_watch(monkeypatch, folders, actions, **options):
+    clock = FakeClock(actions)
+    submitted = []
+    original = pbc.convert_input_file
+
+    def recording_convert(input_folder, filename, *args):
+        submitted.append((filename, clock.now))
+        return original(input_folder, filename, *args)
+
+    monkeypatch.setattr(pbc, 'time', clock)
+    monkeypatch.setattr(pbc, 'convert_input_file', recording_convert)
+    result = pbc.watch_folder(str(folders['in']), str(folders['out']), 'webp', interval=1.0, settle_time=2.0,
+                              workers=1, **options)
+    return result, submitted
+
+
+def write_image(path, size=(8, 8)):
+    Image.new('RGB', size, 'red').save(path)
+
+
+def idle():
+    pass
+
+
+def test_file_is_converted_once_after_it_settles(monkeypatch, folders):
+    write_image(folders['in'] / 'a.png')
+
+    (success, failed), submitted = run_watch(monkeypatch, folders, [idle] * 6)
+
+    assert (success, failed) == (1, 0)
+    assert submitted == [('a.png', 2.0)]
+    assert (folders['out'] / 'a.webp').exists()
+    assert (folders['in'] / 'a.png').exists()
+
+
+def test_changing_file_restarts_the_settle_timer(monkeypatch, folders):
+    write_image(folders['in'] / 'a.png')
+    actions = [lambda: write_image(folders['in'] / 'a.png', size=(16, 16))] + [idle] * 6
+
+    _, submitted = run_watch(monkeypatch, folders, actions)
+
+    assert submitted == [('a.png', 3.0)]
+
+
+def test_hidden_files_are_ignored(monkeypatch, folders):
+    write_image(folders['in'] / '.partial.png')
+
+    (success, failed), submitted = run_watch(monkeypatch, folders, [idle] * 4)
+
+    assert submitted == [] and (success, failed) == (0, 0)
+
+
+@pytest.mark.parametrize('after', ['move', 'delete'])
+def test_source_is_moved_or_deleted_only_after_success(monkeypatch, folders, after):
+    write_image(folders['in'] / 'good.png')
+    (folders['in'] / 'bad.png').write_bytes(b'\x89PNG\r\n\x1a\n broken')
+
+    run_watch(monkeypatch, folders, [idle] * 6, after=after, processed_folder=str(folders['done']))
+
+    assert not (folders['in'] / 'good.png').exists()
+    assert (folders['done'] / 'good.png').exists() == (after == 'move')
+    assert (folders['in'] / 'bad.png').exists()
+    assert (folders['out'] / 'good.webp').exists()
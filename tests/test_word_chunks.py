@@ -0,0 +1,117 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+from docx import Document
+
+import Word_To_Html_Or_Js as w2h
+
+# 在node中模拟页面: 执行生成的JS，按需加载分块文件，收集插入页面的内容
+LOADER_HARNESS = r"""
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+const [dir, main] = process.argv.slice(1);
+const queue = [];
+const listeners = {};
+const content = {
+    innerHTML: 'placeholder',
+    className: 'content-container',
+    style: { cssText: '' },
+    insertAdjacentHTML(position, html) { this.innerHTML += html; },
+};
+const context = {
+    setTimeout: (fn) => queue.push(fn),
+    window: { innerHeight: 100, scrollY: 0, addEventListener() {}, removeEventListener() {} },
+    document: {
+        currentScript: { src: 'http://site/docs/' + main },
+        body: { offsetHeight: 10000 },
+        head: {
+            appendChild(script) {
+                queue.push(() => {
+                    const name = script.src.replace('http://site/docs/', '');
+                    vm.runInContext(fs.readFileSync(path.join(dir, name), 'utf8'), context);
+                    script.onload();
+                });
+            },
+        },
+        addEventListener(type, fn) { listeners[type] = fn; },
+        getElementById(id) { return id === 'word-content' ? content : null; },
+        createElement() { return {}; },
+    },
+};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(path.join(dir, main), 'utf8'), context);
+listeners.DOMContentLoaded();
+for (let steps = 0; queue.length && steps < 1000; steps++) {
+    queue.shift()();
+}
+process.stdout.write(JSON.stringify({
+    rendered: content.innerHTML,
+    content: vm.runInContext('CONTENT_DATA.content', context),
+    chunkCount: vm.runInContext('CONTENT_DATA.chunkCount', context),
+}));
+"""
+
+
+def make_long_document(path, count=30):
+    doc = Document()
+    for index in range(count):
+        doc.add_paragraph(f'第{index}段 `反引号` ${{模板}} \\ 结束')
+    doc.save(path)
+
+
+def read_plain_content(path):
+    script = f"process.stdout.write(require({json.dumps(str(path))}).content)"
+    return subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True).stdout
+
+
+def test_split_chunks_respects_paragraph_boundaries():
+    converter = w2h.WordToFileConverter(chunk_size=10)
+
+    paragraphs = [w2h.RenderedParagraph(html, '', None, None) for html in ['aaaa', 'bbbb', 'cccccccccccccc', 'dd']]
+    chunks = list(converter.split_chunks(paragraphs))
+
+    assert chunks == ['aaaa\nbbbb', 'cccccccccccccc', 'dd']
+    assert list(converter.split_chunks([])) == ['']
+
+
+def test_chunks_are_written_before_the_document_is_fully_read(tmp_path):
+    converter = w2h.WordToFileConverter(chunk_size=10, chunk_files=True)
+    consumed = []
+
+    def paragraphs():
+        for html in ['aaaa', 'bbbb', 'cccccccccccccc', 'dd']:
+            consumed.append(html)
+            yield w2h.RenderedParagraph(html, '', None, None)
+
+    parts = converter.build_chunked_js('doc', paragraphs(), tmp_path)
+    assert next(parts).startswith('// 自动生成的文档内容(分块)') and consumed == []
+    assert next(parts) == '"aaaa\\nbbbb"' and consumed == ['aaaa', 'bbbb', 'cccccccccccccc']
+
+    content = ''.join(parts)
+    assert 'chunkCount: 3' in content
+    assert (tmp_path / 'doc.chunk-2.js').read_text(encoding='utf-8') == 'CONTENT_DATA.chunks[2] = "dd";\n'
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='需要node运行生成的JS')
+@pytest.mark.parametrize('chunk_files', [False, True])
+def test_loader_renders_every_chunk_in_order(tmp_path, chunk_files):
+    make_long_document(tmp_path / 'doc.docx')
+    plain_dir = tmp_path / 'plain'
+    chunked_dir = tmp_path / 'chunked'
+    assert w2h.WordToFileConverter().convert_word_to_file(str(tmp_path / 'doc.docx'), 'js', str(plain_dir))
+    converter = w2h.WordToFileConverter(chunk_size=200, chunk_files=chunk_files)
+    assert converter.convert_word_to_file(str(tmp_path / 'doc.docx'), 'js', str(chunked_dir))
+
+    chunk_paths = sorted(chunked_dir.glob('doc.chunk-*.js'))
+    result = json.loads(subprocess.run(['node', '-e', LOADER_HARNESS, str(chunked_dir), 'doc.js'],
+                                       capture_output=True, text=True, check=True).stdout)
+
+    plain = read_plain_content(plain_dir / 'doc.js')
+    assert result['chunkCount'] > 3
+    assert len(chunk_paths) == (result['chunkCount'] - 1 if chunk_files else 0)
+    assert result['content'] == plain
+    # 块与块之间直接拼接插入，块内保留段落间的换行
+    assert result['rendered'].replace('\n', '') == plain.replace('\n', '')
@@ -0,0 +1,104 @@
+import json
+
+from docx import Document
+
+import Word_To_Html_Or_Js as w2h
+
+
+def make_document(path, text):
+    doc = Document()
+    doc.add_heading('标题', 1)
+    doc.add_paragraph(text)
+    doc.save(path)
+
+
+def parse(argv):
+    return w2h.build_arg_parser().parse_args(argv)
+
+
+def test_converter_flags_map_to_converter_options():
+    args = parse(['batch', 'docs', '--engine', 'stream', '--workers', '3', '--intern-styles', 'shared',
+                  '--no-normalize-runs', '--chunk-size', '4096', '--chunk-files',
+                  '--split-level', '2', '--search-index',
+                  '--extract-images', '--minify', '--precompress', '--incremental'])
+
+    assert w2h.get_converter_options(args) == {
+        'engine': 'stream',
+        'intern_styles': 'shared',
+        'normalize_runs': False,
+        'chunk_size': 4096,
+        'chunk_files': True,
+        'split_level': 2,
+        'search_index': True,
+        'extract_images': True,
+        'minify': True,
+        'precompress': True,
+    }
+    assert args.workers == 3 and args.incremental
+
+
+def test_defaults_match_the_interactive_menu():
+    args = parse(['batch', 'docs'])
+
+    assert args.type == 'js' and args.output is None and args.workers is None
+    assert w2h.get_converter_options(args) == {
+        'engine': 'docx', 'intern_styles': None, 'normalize_runs': True,
+        'chunk_size': None, 'chunk_files': False, 'split_level': None,
+        'search_index': False, 'extract_images': False, 'minify': False, 'precompress': False,
+    }
+
+
+def test_chunk_files_without_size_uses_default_chunk_size():
+    args = parse(['convert', 'doc.docx', '--chunk-files'])
+
+    assert w2h.get_converter_options(args)['chunk_size'] == w2h.DEFAULT_CHUNK_SIZE
+
+
+def test_batch_command_converts_every_document(tmp_path):
+    input_dir = tmp_path / 'docs'
+    input_dir.mkdir()
+    make_document(input_dir / 'a.docx', '第一篇')
+    make_document(input_dir / 'b.docx', '第二篇')
+    output_dir = tmp_path / 'out'
+
+    assert w2h.run_command(['batch', str(input_dir), '-o', str(output_dir), '-t', 'html', '--workers', '2']) == 0
+    assert '第二篇' in (output_dir / 'b.html').read_text(encoding='utf-8')
+    assert (output_dir / 'word-styles.css').exists()
+
+
+def test_batch_command_converts_incrementally(tmp_path, capsys):
+    input_dir = tmp_path / 'docs'
+    input_dir.mkdir()
+    make_document(input_dir / 'a.docx', '第一篇')
+    make_document(input_dir / 'b.docx', '第二篇')
+    output_dir = tmp_path / 'out'
+    argv = ['batch', str(input_dir), '-o', str(output_dir), '-t', 'html', '--workers', '1',
+            '--incremental', '--search-index', '--precompress']
+
+    assert w2h.run_command(argv) == 0
+    assert (output_dir / 'a.html.gz').exists() and (output_dir / 'b.search.json').exists()
+    manifest = json.loads((output_dir / w2h.MANIFEST_FILENAME).read_text(encoding='utf-8'))
+    assert sorted(manifest['documents']) == ['a.docx', 'b.docx']
+
+    capsys.readouterr()
+    assert w2h.run_command(argv) == 0
+    assert '跳过未变化的文档: 2 个' in capsys.readouterr().out
+
+
+def test_batch_command_reports_failed_documents(tmp_path):
+    input_dir = tmp_path / 'docs'
+    input_dir.mkdir()
+    make_document(input_dir / 'a.docx', '第一篇')
+    (input_dir / 'broken.docx').write_bytes(b'not a zip file')
+
+    assert w2h.run_command(['batch', str(input_dir), '--workers', '1']) == 1
+    assert (input_dir / 'a.js').exists()
+
+
+def test_convert_command_reports_failure(tmp_path):
+    assert w2h.run_command(['convert', str(tmp_path / 'missing.docx')]) == 1
+
+
+def test_css_command_creates_output_folder(tmp_path):
+    assert w2h.run_command(['css', '-o', str(tmp_path / 'styles')]) == 0
+    assert (tmp_path / 'styles' / 'word-styles.css').exists()
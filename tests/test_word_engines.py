@@ -0,0 +1,44 @@
+import filecmp
+
+import pytest
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt, RGBColor
+
+import Word_To_Html_Or_Js as w2h
+
+
+def make_document(path):
+    doc = Document()
+    doc.add_heading('第一章 概述', 1)
+    paragraph = doc.add_paragraph('普通文字 ')
+    run = paragraph.add_run('粗体')
+    run.bold = True
+    paragraph.add_run(' 和 ')
+    run = paragraph.add_run('红色小四')
+    run.font.size = Pt(12)
+    run.font.color.rgb = RGBColor(0xFF, 0, 0)
+    doc.add_paragraph('')
+    centered = doc.add_paragraph('居中 <转义> `模板` ${x}', style='Quote')
+    centered.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.add_heading('1.1 细节', 2)
+    doc.add_paragraph('列表项', style='List Bullet')
+    doc.save(path)
+
+
+@pytest.mark.parametrize('output_type', ['js', 'html'])
+@pytest.mark.parametrize('options', [{}, {'intern_styles': 'document', 'split_level': 2, 'search_index': True}])
+def test_stream_engine_matches_docx_engine(tmp_path, output_type, options):
+    make_document(tmp_path / 'doc.docx')
+
+    for engine in w2h.ENGINES:
+        converter = w2h.WordToFileConverter(engine=engine, **options)
+        assert converter.convert_word_to_file(str(tmp_path / 'doc.docx'), output_type, str(tmp_path / engine))
+
+    docx_dir, stream_dir = tmp_path / 'docx', tmp_path / 'stream'
+    names = sorted(path.name for path in docx_dir.iterdir())
+    assert names == sorted(path.name for path in stream_dir.iterdir())
+    match, mismatch, errors = filecmp.cmpfiles(docx_dir, stream_dir, names, shallow=False)
+    assert (mismatch, errors) == ([], [])
+    assert any('红色小四' in (docx_dir / name).read_text(encoding='utf-8')
+               for name in names if name.endswith(output_type))
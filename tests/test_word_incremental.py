@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+
+import Word_To_Html_Or_Js as w2h
+
+
+def make_document(path, paragraph_count=3, image_color=None):
+    doc = Document()
+    for index in range(paragraph_count):
+        doc.add_heading(f'第{index + 1}节', 1)
+        doc.add_paragraph(f'第{index + 1}段内容 ' * 20)
+    if image_color:
+        image_path = path.with_suffix('.png')
+        Image.new('RGB', (8, 4), image_color).save(image_path)
+        doc.add_picture(str(image_path), width=Inches(1))
+        os.remove(image_path)
+    doc.save(path)
+
+
+def convert(input_dir, output_dir, **options):
+    converter = w2h.WordToFileConverter(**options)
+    converter.batch_convert_word_files(str(input_dir), 'js', str(output_dir), workers=1,
+                                       incremental=True)
+    return [success for _, success in converter.last_batch_results]
+
+
+def read_manifest(output_dir):
+    return json.loads((output_dir / w2h.MANIFEST_FILENAME).read_text(encoding='utf-8'))
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    input_dir = tmp_path / 'docs'
+    input_dir.mkdir()
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+    return input_dir, output_dir
+
+
+def test_manifest_lists_every_output_of_a_document(dirs):
+    input_dir, output_dir = dirs
+    make_document(input_dir / 'a.docx', image_color='red')
+
+    assert convert(input_dir, output_dir, chunk_size=200, chunk_files=True,
+                   extract_images=True, precompress=True) == [True]
+
+    outputs = read_manifest(output_dir)['documents']['a.docx']['outputs']
+    assert 'a.js' in outputs and 'a.js.gz' in outputs and 'a.chunk-1.js.gz' in outputs
+    assets = [output for output in outputs if output.startswith(w2h.ASSETS_FOLDER + '/')]
+    assert len(assets) == 1 and not assets[0].endswith('.gz')
+    assert all((output_dir / output).exists() for output in outputs)
+
+
+def test_unchanged_documents_are_skipped(dirs):
+    input_dir, output_dir = dirs
+    make_document(input_dir / 'a.docx')
+    make_document(input_dir / 'b.docx', 2)
+    assert convert(input_dir, output_dir) == [True, True]
+    output_mtime = (output_dir / 'a.js').stat().st_mtime_ns
+
+    # 只改动修改时间的文档按内容哈希判断为未变化
+    os.utime(input_dir / 'a.docx', ns=(0, 0))
+    make_document(input_dir / 'b.docx', 4)
+    assert convert(input_dir, output_dir) == [None, True]
+    assert (output_dir / 'a.js').stat().st_mtime_ns == output_mtime
+
+    # 输出缺失时重新转换
+    (output_dir / 'a.js').unlink()
+    assert convert(input_dir, output_dir) == [True, None]
+
+
+def test_settings_or_version_change_invalidates_manifest(dirs, monkeypatch):
+    input_dir, output_dir = dirs
+    make_document(input_dir / 'a.docx')
+    assert convert(input_dir, output_dir) == [True]
+    assert convert(input_dir, output_dir) == [None]
+
+    assert convert(input_dir, output_dir, minify=True) == [True]
+    assert convert(input_dir, output_dir, minify=True) == [None]
+
+    monkeypatch.setattr(w2h, 'CONVERTER_VERSION', w2h.CONVERTER_VERSION + '-next')
+    assert convert(input_dir, output_dir, minify=True) == [True]
+    assert read_manifest(output_dir)['documents']['a.docx']['settings']['version'].endswith('-next')
+
+
+def test_outputs_no_longer_produced_are_reported(dirs, capsys):
+    input_dir, output_dir = dirs
+    make_document(input_dir / 'a.docx', 4, image_color='red')
+    make_document(input_dir / 'b.docx', 1, image_color='blue')
+    assert convert(input_dir, output_dir, split_level=1, extract_images=True) == [True, True]
+    old_outputs = read_manifest(output_dir)['documents']['a.docx']['outputs']
+    old_asset = next(output for output in old_outputs if output.startswith(w2h.ASSETS_FOLDER))
+    capsys.readouterr()
+
+    # 减少章节并换用另一文档也在使用的图片: 多出的页面和旧图片被报告，共用图片不报告
+    make_document(input_dir / 'a.docx', 2, image_color='blue')
+    assert convert(input_dir, output_dir, split_level=1, extract_images=True) == [True, None]
+
+    out = capsys.readouterr().out
+    new_outputs = read_manifest(output_dir)['documents']['a.docx']['outputs']
+    stale = sorted(set(old_outputs) - set(new_outputs))
+    assert old_asset in stale and len(stale) > 1
+    assert f"! a.docx 不再生成的旧输出: {', '.join(output for output in old_outputs if output in stale)}" in out
+    shared_asset = next(output for output in new_outputs if output.startswith(w2h.ASSETS_FOLDER))
+    assert shared_asset not in out
@@ -0,0 +1,84 @@
+import re
+
+from docx import Document
+from docx.shared import RGBColor
+
+import Word_To_Html_Or_Js as w2h
+
+
+def make_colored_document(path, color, text):
+    doc = Document()
+    for _ in range(3):
+        run = doc.add_paragraph().add_run(text)
+        run.font.color.rgb = RGBColor.from_string(color)
+        run.bold = True
+    doc.save(path)
+
+
+def css_rules(path):
+    rules = {}
+    for line in path.read_text(encoding='utf-8').splitlines():
+        match = w2h.STYLE_RULE_PATTERN.match(line)
+        if match:
+            rules[match.group(1)] = match.group(2)
+    return rules
+
+
+def test_intern_style_names_depend_only_on_declarations():
+    first = w2h.WordToFileConverter(intern_styles='shared')
+    second = w2h.WordToFileConverter(intern_styles='shared')
+
+    name = first.intern_style('color: #FF0000; font-weight: bold')
+
+    assert name.startswith(w2h.STYLE_CLASS_PREFIX)
+    assert first.intern_style('color: #FF0000; font-weight: bold') == name
+    assert second.intern_style('color: #FF0000; font-weight: bold') == name
+    assert first.intern_style('color: #00FF00') != name
+
+
+def test_write_interned_css_merge_keeps_existing_rules(tmp_path):
+    converter = w2h.WordToFileConverter(intern_styles='shared')
+    css_path = tmp_path / w2h.SHARED_STYLES_CSS
+    converter.write_interned_css(css_path, {'color: #FF0000': 's-00000001'})
+
+    converter.write_interned_css(css_path, {'color: #00FF00': 's-00000002'}, merge=True)
+    assert css_rules(css_path) == {'s-00000001': 'color: #FF0000', 's-00000002': 'color: #00FF00'}
+
+    converter.write_interned_css(css_path, {'color: #00FF00': 's-00000002'})
+    assert css_rules(css_path) == {'s-00000002': 'color: #00FF00'}
+
+
+def test_document_mode_writes_styles_next_to_output(tmp_path):
+    make_colored_document(tmp_path / 'doc.docx', 'FF0000', '红色')
+    converter = w2h.WordToFileConverter(intern_styles='document')
+
+    assert converter.convert_word_to_file(str(tmp_path / 'doc.docx'), 'html', str(tmp_path))
+
+    html = (tmp_path / 'doc.html').read_text(encoding='utf-8')
+    rules = css_rules(tmp_path / 'doc.styles.css')
+    assert 'style=' not in html
+    assert 'href="doc.styles.css"' in html
+    assert len(rules) == 1
+    assert html.count(next(iter(rules))) == 3
+
+
+def test_shared_mode_merges_styles_from_all_workers(tmp_path):
+    input_dir = tmp_path / 'docs'
+    input_dir.mkdir()
+    make_colored_document(input_dir / 'red.docx', 'FF0000', '红色')
+    make_colored_document(input_dir / 'green.docx', '00FF00', '绿色')
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+    # 上次转换留下的样式类同样保留
+    (output_dir / w2h.SHARED_STYLES_CSS).write_text('.s-00000001 { color: #0000FF }\n', encoding='utf-8')
+    converter = w2h.WordToFileConverter(intern_styles='shared')
+
+    assert converter.batch_convert_word_files(str(input_dir), 'html', str(output_dir), workers=2) == 2
+
+    rules = css_rules(output_dir / w2h.SHARED_STYLES_CSS)
+    assert len(rules) == 3 and 's-00000001' in rules
+    for name in ('red', 'green'):
+        html = (output_dir / f'{name}.html').read_text(encoding='utf-8')
+        used = set(re.findall(r'\b' + w2h.STYLE_CLASS_PREFIX + r'[0-9a-f]+\b', html))
+        assert len(used) == 1 and used <= set(rules)
+        assert f'href="{w2h.SHARED_STYLES_CSS}"' in html
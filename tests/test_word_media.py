@@ -0,0 +1,75 @@
+import io
+import zipfile
+
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+
+import Word_To_Html_Or_Js as w2h
+
+RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="image" Target="media/image1.png"/>
+<Relationship Id="rId2" Type="image" Target="/word/media/copy.PNG"/>
+<Relationship Id="rId3" Type="image" Target="media/other.png"/>
+<Relationship Id="rId4" Type="image" Target="media/missing.png"/>
+<Relationship Id="rId5" Type="image" Target="http://example.com/a.png" TargetMode="External"/>
+</Relationships>"""
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 4), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def make_archive(path):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('word/_rels/document.xml.rels', RELS)
+        archive.writestr('word/media/image1.png', png_bytes('red'))
+        archive.writestr('word/media/copy.PNG', png_bytes('red'))
+        archive.writestr('word/media/other.png', png_bytes('blue'))
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    make_archive(tmp_path / 'doc.docx')
+    assets_dir = tmp_path / 'assets'
+
+    with zipfile.ZipFile(tmp_path / 'doc.docx') as archive:
+        media = w2h.MediaExtractor(archive, 'word/document.xml', assets_dir)
+        first = media.extract('rId1')
+        copy = media.extract('rId2')
+        other = media.extract('rId3')
+        assert media.extract('rId1') == first
+
+        assert media.extract('rId4') is None
+        assert media.extract('rId5') is None
+        assert media.extract('rId9') is None
+
+    assert first == copy and first.endswith('.png')
+    assert other != first
+    assert sorted(path.name for path in assets_dir.iterdir()) == sorted([first, other])
+    assert (assets_dir / first).read_bytes() == png_bytes('red')
+
+
+def test_batch_shares_assets_between_documents(tmp_path):
+    image_path = tmp_path / 'logo.png'
+    image_path.write_bytes(png_bytes('green'))
+    input_dir = tmp_path / 'docs'
+    input_dir.mkdir()
+    for name in ('a', 'b'):
+        doc = Document()
+        doc.add_paragraph(f'文档{name}')
+        doc.add_picture(str(image_path), width=Inches(1))
+        doc.save(input_dir / f'{name}.docx')
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+
+    for engine in w2h.ENGINES:
+        converter = w2h.WordToFileConverter(engine=engine, extract_images=True)
+        assert converter.batch_convert_word_files(str(input_dir), 'html', str(output_dir / engine), workers=2) == 2
+
+        assets = list((output_dir / engine / w2h.ASSETS_FOLDER).iterdir())
+        assert len(assets) == 1 and assets[0].read_bytes() == png_bytes('green')
+        html = (output_dir / engine / 'b.html').read_text(encoding='utf-8')
+        assert f'<img src="{w2h.ASSETS_FOLDER}/{assets[0].name}" width="96" height="48"' in html
@@ -0,0 +1,34 @@
+import gzip
+import os
+
+import pytest
+
+import Word_To_Html_Or_Js as w2h
+
+
+def test_output_replaces_files_only_on_success(tmp_path):
+    path = tmp_path / 'doc.js'
+
+    with w2h.OutputWriter(path, precompress=True) as f:
+        f.write('const CONTENT_DATA = `hello`;')
+        assert not path.exists()
+        assert not (tmp_path / 'doc.js.gz').exists()
+
+    assert path.read_text(encoding='utf-8') == 'const CONTENT_DATA = `hello`;'
+    assert gzip.decompress((tmp_path / 'doc.js.gz').read_bytes()).decode('utf-8') == path.read_text(encoding='utf-8')
+    assert sorted(os.listdir(tmp_path)) == ['doc.js', 'doc.js.gz']
+
+
+def test_failed_write_keeps_previous_output_and_removes_temp_files(tmp_path):
+    path = tmp_path / 'doc.html'
+    with w2h.OutputWriter(path, precompress=True) as f:
+        f.write('old')
+
+    with pytest.raises(RuntimeError):
+        with w2h.OutputWriter(path, precompress=True) as f:
+            f.write('half')
+            raise RuntimeError('render failed')
+
+    assert path.read_text(encoding='utf-8') == 'old'
+    assert gzip.decompress((tmp_path / 'doc.html.gz').read_bytes()) == b'old'
+    assert sorted(os.listdir(tmp_path)) == ['doc.html', 'doc.html.gz']
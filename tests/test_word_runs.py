@@ -0,0 +1,57 @@
+from docx import Document
+
+import Word_To_Html_Or_Js as w2h
+
+PLAIN = w2h.RunFormat(None, False, False, False, None, None)
+BOLD = PLAIN._replace(bold=True)
+RED = PLAIN._replace(color='FF0000')
+
+
+def test_adjacent_runs_with_same_format_are_merged():
+    converter = w2h.WordToFileConverter()
+
+    runs = [('Hel', BOLD), ('lo', BOLD), (' world', PLAIN), ('!', PLAIN)]
+
+    assert converter.merge_runs(runs) == [('Hello', BOLD), (' world!', PLAIN)]
+
+
+def test_runs_with_different_formats_stay_separate():
+    converter = w2h.WordToFileConverter()
+
+    runs = [('a', BOLD), ('b', RED), ('c', BOLD)]
+
+    assert converter.merge_runs(runs) == runs
+
+
+def test_whitespace_runs_join_neighbouring_spans():
+    converter = w2h.WordToFileConverter()
+
+    runs = [('  ', RED), ('word', BOLD), (' ', PLAIN), ('next', RED), ('\t', BOLD), ('', RED)]
+
+    # 段首空白并入后一个span，中间和段尾的空白并入前一个span，空run直接丢弃
+    assert converter.merge_runs(runs) == [('  word ', BOLD), ('next\t', RED)]
+
+
+def test_whitespace_only_paragraph_produces_nothing():
+    converter = w2h.WordToFileConverter()
+
+    assert converter.merge_runs([(' ', BOLD), ('', PLAIN), ('  ', RED)]) == []
+
+
+def test_render_keeps_spaces_between_words_only_when_normalizing(tmp_path):
+    doc = Document()
+    paragraph = doc.add_paragraph()
+    paragraph.add_run('one').bold = True
+    paragraph.add_run(' ')
+    paragraph.add_run('two').bold = True
+    doc.save(tmp_path / 'doc.docx')
+
+    converter = w2h.WordToFileConverter()
+    assert converter.convert_word_to_file(str(tmp_path / 'doc.docx'), 'html', str(tmp_path))
+    html = (tmp_path / 'doc.html').read_text(encoding='utf-8')
+    assert 'one two' in html and html.count('<span') == 1
+
+    legacy = w2h.WordToFileConverter(normalize_runs=False)
+    assert legacy.convert_word_to_file(str(tmp_path / 'doc.docx'), 'html', str(tmp_path))
+    html = (tmp_path / 'doc.html').read_text(encoding='utf-8')
+    assert 'one two' not in html and html.count('<span') == 2
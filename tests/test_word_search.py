@@ -0,0 +1,68 @@
+import json
+
+from docx import Document
+
+import Word_To_Html_Or_Js as w2h
+
+
+def make_document(path, title):
+    doc = Document()
+    doc.add_paragraph('前言 Preface')
+    doc.add_heading(title, 1)
+    doc.add_paragraph('搜索引擎 Search engine')
+    doc.add_heading('细节', 2)
+    doc.add_paragraph('索引 search')
+    doc.save(path)
+
+
+def test_tokenize_splits_cjk_bigrams_and_lowercases_words():
+    assert w2h.tokenize_search_text('搜索引擎 Hello, WORLD 字') == {
+        '搜索', '索引', '引擎', 'hello', 'world', '字'}
+    assert w2h.tokenize_search_text('  ') == set()
+
+
+def test_search_index_maps_terms_to_paragraphs_and_sections(tmp_path):
+    make_document(tmp_path / 'doc.docx', '概述')
+    converter = w2h.WordToFileConverter(search_index=True)
+
+    assert converter.convert_word_to_file(str(tmp_path / 'doc.docx'), 'html', str(tmp_path))
+
+    index = json.loads((tmp_path / 'doc.search.json').read_text(encoding='utf-8'))
+    assert index['document'] == 'doc'
+    assert [section[1:] for section in index['sections']] == [
+        ['doc', 'doc.html'], ['概述', 'doc.html'], ['细节', 'doc.html']]
+    assert index['paragraphs'] == [0, 1, 1, 2, 2]
+    assert index['terms']['search'] == [2, 4]
+    assert index['terms']['索引'] == [2, 4]
+    assert index['terms']['preface'] == [0]
+
+
+def test_search_index_points_to_split_pages(tmp_path):
+    make_document(tmp_path / 'doc.docx', '概述')
+    converter = w2h.WordToFileConverter(search_index=True, split_level=1)
+
+    assert converter.convert_word_to_file(str(tmp_path / 'doc.docx'), 'html', str(tmp_path))
+
+    index = json.loads((tmp_path / 'doc.search.json').read_text(encoding='utf-8'))
+    pages = [section[2] for section in index['sections']]
+    assert pages[0] == f'doc.{w2h.START_SECTION_ID}.html'
+    # 标题2不拆分页面，仍属于标题1所在的页面
+    assert pages[1] == pages[2] != pages[0]
+    for page in pages:
+        assert (tmp_path / page).exists()
+
+
+def test_batch_writes_combined_index(tmp_path):
+    input_dir = tmp_path / 'docs'
+    input_dir.mkdir()
+    make_document(input_dir / 'a.docx', '甲')
+    make_document(input_dir / 'b.docx', '乙')
+    output_dir = tmp_path / 'out'
+    converter = w2h.WordToFileConverter(search_index=True)
+
+    assert converter.batch_convert_word_files(str(input_dir), 'js', str(output_dir), workers=1) == 2
+
+    combined = json.loads((output_dir / w2h.COMBINED_SEARCH_INDEX).read_text(encoding='utf-8'))
+    assert [document['document'] for document in combined['documents']] == ['a', 'b']
+    assert combined['terms']['search'] == [[0, 2], [0, 4], [1, 2], [1, 4]]
+    assert combined['terms']['甲'] == [[0, 1]]
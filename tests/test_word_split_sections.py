@@ -0,0 +1,131 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+from docx import Document
+
+import Word_To_Html_Or_Js as w2h
+
+# 在同一个JS上下文中依次执行目录页和按需加载的章节文件，模拟浏览器中的单个页面
+LOADER_HARNESS = r"""
+const vm = require('vm');
+const fs = require('fs');
+const path = require('path');
+const [dir, index, hashes] = process.argv.slice(2);
+
+const documentListeners = {};
+const windowListeners = {};
+const content = {
+    innerHTML: '',
+    className: 'content-container',
+    style: { cssText: '' },
+    children: [],
+    appendChild(element) { this.children.push(element); },
+    querySelectorAll() {
+        const links = [];
+        for (const match of this.innerHTML.matchAll(/<a href="([^"]*)" data-src="([^"]*)"/g)) {
+            links.push({ getAttribute: (name) => name === 'href' ? match[1] : match[2] });
+        }
+        return links;
+    },
+};
+const document = {
+    currentScript: { src: 'https://example.com/docs/' + index },
+    getElementById: (id) => id === 'word-content' ? content : null,
+    createElement: (tag) => ({ tag, innerHTML: '' }),
+    addEventListener: (name, listener) => { documentListeners[name] = listener; },
+    head: {
+        appendChild(script) {
+            const file = script.src.replace('https://example.com/docs/', '');
+            vm.runInContext(fs.readFileSync(path.join(dir, file), 'utf8'), context);
+            script.onload();
+        },
+    },
+};
+const window = { location: { hash: '' }, addEventListener: (name, listener) => { windowListeners[name] = listener; } };
+const context = vm.createContext({ document, window });
+
+vm.runInContext(fs.readFileSync(path.join(dir, index), 'utf8'), context);
+documentListeners.DOMContentLoaded();
+const shown = {};
+for (const hash of JSON.parse(hashes)) {
+    window.location.hash = '#' + hash;
+    windowListeners.hashchange();
+    shown[hash] = content.children[0].innerHTML;
+}
+console.log(JSON.stringify(shown));
+"""
+
+
+def make_document(path):
+    doc = Document()
+    doc.add_paragraph('前言内容')
+    doc.add_heading('第一章', 1)
+    doc.add_paragraph('第一章正文 `反引号` ${模板}')
+    doc.add_heading('第二章', 1)
+    doc.add_paragraph('第二章正文')
+    doc.save(path)
+
+
+def convert(tmp_path, output_type, **options):
+    make_document(tmp_path / 'book.docx')
+    output_dir = tmp_path / 'out'
+    converter = w2h.WordToFileConverter(split_level=1, **options)
+    assert converter.convert_word_to_file(str(tmp_path / 'book.docx'), output_type, str(output_dir))
+    return output_dir, json.loads((output_dir / 'book.sections.json').read_text(encoding='utf-8'))
+
+
+def test_sections_are_produced_while_paragraphs_are_read():
+    converter = w2h.WordToFileConverter(split_level=1)
+    consumed = []
+
+    def paragraphs():
+        for html, anchor, level in [('前言', None, None), ('一', 'h1', 1), ('正文', None, None),
+                                    ('1.1', 'h2', 2), ('二', 'h3', 1)]:
+            consumed.append(html)
+            yield w2h.RenderedParagraph(f'<p>{html}</p>', html, level, anchor)
+
+    sections = converter.split_sections('doc', paragraphs())
+    assert next(sections)['id'] == w2h.START_SECTION_ID and consumed == ['前言', '一']
+    section = next(sections)
+    assert (section['id'], len(section['paragraphs'])) == ('h1', 3)
+    assert [section['id'] for section in sections] == ['h3']
+    assert list(converter.split_sections('doc', iter([]))) == []
+
+
+def test_js_sections_do_not_redeclare_content_data(tmp_path):
+    output_dir, manifest = convert(tmp_path, 'js')
+
+    for section in manifest['sections']:
+        source = (output_dir / section['file']).read_text(encoding='utf-8')
+        assert 'CONTENT_DATA' not in source
+        assert f"CONTENT_SECTIONS[{json.dumps(section['id'])}]" in source
+        assert f'data-src=\\"{section["file"]}\\"' in (output_dir / 'book.js').read_text(encoding='utf-8')
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='需要node执行生成的JS')
+@pytest.mark.parametrize('minify', [False, True])
+def test_js_toc_loads_each_section_on_demand(tmp_path, minify):
+    output_dir, manifest = convert(tmp_path, 'js', minify=minify)
+    harness = tmp_path / 'harness.js'
+    harness.write_text(LOADER_HARNESS, encoding='utf-8')
+    ids = [section['id'] for section in manifest['sections']]
+
+    result = subprocess.run(['node', str(harness), str(output_dir), 'book.js', json.dumps(ids + ids[:1])],
+                            capture_output=True, text=True, encoding='utf-8', check=True)
+    shown = json.loads(result.stdout)
+
+    assert ids[0] == w2h.START_SECTION_ID
+    assert '前言内容' in shown[ids[0]]
+    assert '第一章正文 `反引号` ${模板}' in shown[ids[1]]
+    assert '第二章正文' in shown[ids[2]] and '第一章正文' not in shown[ids[2]]
+
+
+def test_html_toc_links_to_section_pages(tmp_path):
+    output_dir, manifest = convert(tmp_path, 'html')
+    index = (output_dir / 'book.html').read_text(encoding='utf-8')
+
+    for section in manifest['sections']:
+        assert (output_dir / section['file']).exists()
+        assert f'href="{section["file"]}' in index
@@ -0,0 +1,124 @@
+import xml.etree.ElementTree as ET
+
+from docx import Document
+from docx.shared import Pt
+
+import Word_To_Html_Or_Js as w2h
+
+STYLES_XML = f"""<w:styles xmlns:w="{w2h.W_NS}">
+  <w:docDefaults>
+    <w:rPrDefault><w:rPr><w:sz w:val="21"/><w:rFonts w:ascii="Calibri" w:eastAsia="SimSun"/></w:rPr></w:rPrDefault>
+    <w:pPrDefault><w:pPr><w:jc w:val="both"/></w:pPr></w:pPrDefault>
+  </w:docDefaults>
+  <w:style w:type="paragraph" w:default="1" w:styleId="Normal">
+    <w:name w:val="Normal"/>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Base">
+    <w:name w:val="Base"/>
+    <w:pPr><w:jc w:val="center"/></w:pPr>
+    <w:rPr><w:b/><w:color w:val="FF0000"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Derived">
+    <w:name w:val="Derived"/>
+    <w:basedOn w:val="Base"/>
+    <w:rPr><w:sz w:val="32"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Heading2">
+    <w:name w:val="heading 2"/>
+    <w:basedOn w:val="Normal"/>
+  </w:style>
+  <w:style w:type="character" w:styleId="Emphasis">
+    <w:name w:val="Emphasis"/>
+    <w:rPr><w:i/><w:b w:val="0"/></w:rPr>
+  </w:style>
+  <w:style w:type="character" w:styleId="Strong">
+    <w:name w:val="Strong"/>
+    <w:rPr><w:b/><w:rFonts w:eastAsia="SimHei"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="LoopA"><w:basedOn w:val="LoopB"/></w:style>
+  <w:style w:type="paragraph" w:styleId="LoopB"><w:basedOn w:val="LoopA"/></w:style>
+</w:styles>"""
+
+
+def element(xml):
+    return ET.fromstring(f'<w:root xmlns:w="{w2h.W_NS}">{xml}</w:root>')[0]
+
+
+def make_resolver():
+    return w2h.StyleResolver(ET.fromstring(STYLES_XML))
+
+
+def test_run_format_follows_defaults_styles_and_direct_formatting():
+    resolver = make_resolver()
+
+    plain = resolver.resolve_run('Derived', element('<w:r><w:t>x</w:t></w:r>'))
+    assert plain == w2h.RunFormat(16.0, True, False, False, 'ff0000', 'Calibri', 'SimSun')
+
+    # 样式中的关闭值不改变继承结果
+    emphasised = resolver.resolve_run('Derived', element(
+        '<w:r><w:rPr><w:rStyle w:val="Emphasis"/></w:rPr><w:t>x</w:t></w:r>'))
+    assert (emphasised.bold, emphasised.italic, emphasised.font_size_pt) == (True, True, 16.0)
+
+    # 字符样式的粗体与段落样式的粗体取反，中日韩文字体独立继承
+    strong = resolver.resolve_run('Derived', element(
+        '<w:r><w:rPr><w:rStyle w:val="Strong"/></w:rPr><w:t>x</w:t></w:r>'))
+    assert (strong.bold, strong.font_name, strong.east_asia_font) == (False, 'Calibri', 'SimHei')
+    assert resolver.resolve_run('Normal', element(
+        '<w:r><w:rPr><w:rStyle w:val="Strong"/></w:rPr><w:t>x</w:t></w:r>')).bold
+
+    # 直接格式设置最终值
+    direct = resolver.resolve_run('Derived', element(
+        '<w:r><w:rPr><w:rStyle w:val="Strong"/><w:b/><w:sz w:val="20"/></w:rPr><w:t>x</w:t></w:r>'))
+    assert (direct.bold, direct.italic, direct.font_size_pt) == (True, False, 10.0)
+    direct_off = resolver.resolve_run('Derived', element(
+        '<w:r><w:rPr><w:b w:val="0"/></w:rPr><w:t>x</w:t></w:r>'))
+    assert not direct_off.bold
+
+
+def test_format_styles_list_both_fonts_and_differences_from_container():
+    converter = w2h.WordToFileConverter()
+    run_format = w2h.RunFormat(12.0, False, True, False, None, 'Calibri', 'SimSun')
+
+    assert converter.get_format_styles(run_format) == [
+        "font-style:italic", "font-family:'Calibri','SimSun'"]
+    base = w2h.RunFormat(12.0, True, False, False, None, 'Calibri', 'SimSun')
+    assert converter.get_format_styles(run_format, base) == [
+        "font-weight:normal", "font-style:italic"]
+
+
+def test_document_defaults_are_emitted_once_on_the_container(tmp_path):
+    doc = Document()
+    doc.styles.element.find(f'{{{w2h.W_NS}}}docDefaults').find(
+        f'{{{w2h.W_NS}}}rPrDefault').find(f'{{{w2h.W_NS}}}rPr').find(
+        f'{{{w2h.W_NS}}}rFonts').set(f'{{{w2h.W_NS}}}eastAsia', 'SimSun')
+    doc.add_paragraph('默认格式')
+    doc.add_paragraph().add_run('小四').font.size = Pt(12)
+    doc.save(tmp_path / 'doc.docx')
+
+    for engine in w2h.ENGINES:
+        converter = w2h.WordToFileConverter(engine=engine)
+        assert converter.convert_word_to_file(str(tmp_path / 'doc.docx'), 'html', str(tmp_path / engine))
+        html = (tmp_path / engine / 'doc.html').read_text(encoding='utf-8')
+
+        assert '<div id="word-content" class="content-container num-11" ' \
+               'style="font-family:\'SimSun\'">' in html
+        assert '默认格式' in html and 'class="num-11"' not in html
+        assert '<span class="small-four">小四</span>' in html
+
+
+def test_paragraph_alignment_and_heading_level_inherit():
+    resolver = make_resolver()
+
+    derived = element('<w:p><w:pPr><w:pStyle w:val="Derived"/></w:pPr></w:p>')
+    assert resolver.paragraph_alignment(derived) == 'center'
+    assert resolver.paragraph_alignment(element('<w:p/>')) == 'justify'
+
+    heading = element('<w:p><w:pPr><w:pStyle w:val="Heading2"/></w:pPr></w:p>')
+    assert resolver.heading_level(heading, resolver.paragraph_style_id(heading)) == 2
+    assert resolver.heading_level(derived, 'Derived') is None
+
+
+def test_based_on_cycle_terminates():
+    resolver = make_resolver()
+
+    assert resolver.style_chain('LoopA') == ({}, None, None)